@@ -0,0 +1,88 @@
+""":mod:`settei.__main__` --- Command line interface
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+.. code-block:: bash
+
+   python -m settei compile config.toml --class myapp:AppConfig \\
+                            -o settings_snapshot.py
+
+See also :mod:`settei.snapshot`.
+
+.. versionadded:: 0.7.4
+
+"""
+import argparse
+import pathlib
+import sys
+import typing
+
+from pytoml import TomlError
+
+from .snapshot import compile_snapshot, render_snapshot
+from .utils import import_hook
+
+__all__ = 'main',
+
+
+def compile_command(args: argparse.Namespace) -> int:
+    try:
+        cls = import_hook(args.class_path)
+    except (ImportError, AttributeError) as e:
+        print('error: failed to import {0}: {1}'.format(args.class_path, e),
+              file=sys.stderr)
+        return 2
+    try:
+        configuration = cls.from_path(args.config)
+    except (OSError, UnicodeDecodeError, TomlError) as e:
+        print('error: failed to load {0!s}: {1}'.format(args.config, e),
+              file=sys.stderr)
+        return 2
+    document, values, errors = compile_snapshot(configuration)
+    for error in errors:
+        print('error: {0}: {1}'.format(type(error).__name__, error),
+              file=sys.stderr)
+    if errors:
+        return 1
+    try:
+        source = render_snapshot(args.class_path, document, values,
+                                 source=args.config)
+    except ValueError as e:
+        print('error: {0}'.format(e), file=sys.stderr)
+        return 1
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with args.output.open('w') as f:
+            f.write(source)
+    return 0
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m settei')
+    subparsers = parser.add_subparsers(dest='command')
+    compile_parser = subparsers.add_parser(
+        'compile',
+        help='resolve a configuration into an importable snapshot module'
+    )
+    compile_parser.add_argument('config', type=pathlib.Path,
+                                help='the TOML configuration file')
+    compile_parser.add_argument(
+        '--class', dest='class_path', required=True,
+        help='the import path of the configuration class, '
+             'e.g. myapp:AppConfig'
+    )
+    compile_parser.add_argument(
+        '-o', '--output', type=pathlib.Path,
+        help='the path of the snapshot module to write.  '
+             'standard output by default'
+    )
+    compile_parser.set_defaults(function=compile_command)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help(sys.stderr)
+        return 2
+    return args.function(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,24 +4,37 @@
 .. versionadded:: 0.2.0
 
 """
+import abc
 import collections
 import collections.abc
 import enum
+import fnmatch
 import functools
+import hashlib
 import os
 import pathlib
 import re
 import textwrap
+import threading
+import types
 import typing
 import warnings
 
-from pytoml import load
-from typeguard import typechecked
-
-from settei.parse_env import EnvReader
-
-__all__ = ('ConfigError', 'ConfigKeyError', 'ConfigTypeError',
-           'Configuration', 'ConfigValueError', 'ConfigWarning',
+from settei.document import (DigestCache, FrozenDict, Overlay, PathIndex,
+                             SectionIndex, diff, freeze, merge_trees,
+                             override_tree, share_unchanged)
+from settei.environ import PrefixedEnvironment, as_environment
+from settei.parse_env import EnvReader, derive_parser
+from settei.sources import Source
+from settei.utils import cached_property
+from settei.validation import (_get_origin_and_args, check_argument_type,
+                               compile_validator, typechecked)
+
+__all__ = ('ConfigCallbackError', 'ConfigError', 'ConfigKeyError',
+           'ConfigLoadError', 'ConfigTypeError', 'ConfigValidationError',
+           'Configuration', 'ConfigurationMeta', 'ConfigValueError',
+           'ConfigWarning',
+           'LoadResult', 'Section', 'ValidationReport',
            'config_object_property', 'config_property', 'get_union_types')
 ParseFunctionType = typing.Union[
     typing.Callable[[str, ], typing.Any],
@@ -58,6 +71,107 @@ else:
             return type_.__args__
 
 
+def _is_enum(type_) -> bool:
+    # Parameterized generics like typing.List[int] are not classes.
+    return isinstance(type_, type) and \
+        getattr(type_, '__origin__', None) is None and \
+        issubclass(type_, enum.Enum)
+
+
+def _isinstance(value, cls) -> bool:
+    return isinstance(value, cls)
+
+
+def _convert_enum(cls: type, value):
+    if isinstance(value, cls):
+        return value
+    try:
+        return cls(value)
+    except ValueError:
+        raise ConfigTypeError(
+            'Invalid value {0} in {1!r}. Candidates are: {2}'.format(
+                value, cls, ', '.join(cls.__members__)
+            )
+        )
+
+
+def _compile_enum_converter(type_, nested: bool = False):
+    # Compile a function converting enum values nested in containers,
+    # e.g. typing.Mapping[str, SomeEnum].  Top-level enums are converted
+    # by config_property.convert_native_type() instead.  It returns None
+    # if there's nothing to convert, so that most properties pay nothing.
+    if _is_enum(type_):
+        return functools.partial(_convert_enum, type_) if nested else None
+    union_types = get_union_types(type_)
+    if union_types is not None:
+        members = [(compile_validator(t), _compile_enum_converter(t, True))
+                   for t in union_types]
+        if not any(c for _, c in members):
+            return None
+
+        def convert_union(value):
+            if any(v(value) for v, _ in members):
+                return value
+            for validator, convert in members:
+                if convert is None:
+                    continue
+                try:
+                    converted = convert(value)
+                except ConfigTypeError:
+                    continue
+                if validator(converted):
+                    return converted
+            return value
+        return convert_union
+    origin, args = _get_origin_and_args(type_)
+    if not isinstance(origin, type) or \
+            any(isinstance(arg, typing.TypeVar) for arg in args):
+        return None
+    if issubclass(origin, collections.abc.Mapping) and len(args) == 2:
+        convert_key = _compile_enum_converter(args[0], True)
+        convert_value = _compile_enum_converter(args[1], True)
+        if convert_key is None and convert_value is None:
+            return None
+        convert_key = convert_key or (lambda k: k)
+        convert_value = convert_value or (lambda v: v)
+
+        def convert_mapping(value):
+            if not isinstance(value, collections.abc.Mapping):
+                return value
+            converted = {convert_key(k): convert_value(v)
+                         for k, v in value.items()}
+            if isinstance(value, FrozenDict):
+                return FrozenDict(converted)
+            return converted
+        return convert_mapping
+    elif issubclass(origin, tuple) and args and args[-1] is not Ellipsis \
+            and args != ((),):
+        converters = [_compile_enum_converter(t, True) or (lambda v: v)
+                      for t in args]
+
+        def convert_tuple(value):
+            if not isinstance(value, tuple) or \
+                    len(value) != len(converters):
+                return value
+            return tuple(c(v) for c, v in zip(converters, value))
+        return convert_tuple
+    elif issubclass(origin, collections.abc.Iterable) and \
+            not issubclass(origin, (str, bytes)) and args:
+        convert_item = _compile_enum_converter(args[0], True)
+        if convert_item is None:
+            return None
+
+        def convert_collection(value):
+            if isinstance(value, (str, bytes, collections.abc.Mapping)) or \
+                    not isinstance(value, collections.abc.Iterable):
+                return value
+            container = type(value) \
+                if isinstance(value, (list, tuple, set, frozenset)) else list
+            return container(map(convert_item, value))
+        return convert_collection
+    return None
+
+
 class config_property:
     """Declare configuration key with type hints, default value, and
     docstring.
@@ -95,6 +209,15 @@ class config_property:
                       given. for your convenience see :mod:`settei.parse_env`
                       as well.
     :type parse_env: :class:`collections.abc.Callable`
+    :param file_ref: keyword only argument.
+                     whether to accept references to files like
+                     ``"file:/etc/tls/server.key"`` instead of values.
+                     the referred file is read lazily, and becomes
+                     :class:`bytes` or :class:`memoryview` if ``cls`` is
+                     one of them, otherwise :class:`str`.
+                     see also :class:`~settei.files.FileReference`.
+                     :const:`False` by default
+    :type file_ref: :class:`bool`
 
     .. versionchanged:: 0.4.0
 
@@ -148,24 +271,48 @@ class config_property:
        the same time.  Firstly settei get a configuration from toml,
        then scan an environment variable.
 
+    .. versionadded:: 0.7.4
+
+       Added ``file_ref`` parameter.
+
     """
 
     delimiter = '__'
     ASTERISK_CHAR = 'ASTERISK'
     LIST_CHAR = 'SETTEIENVLIST'
+    FILE_REF_PREFIX = 'file:'
+
+    #: (:class:`int`) The maximum number of
+    #: :class:`~settei.files.FileReference` objects cached by a property
+    #: with ``file_ref=True``, in least recently used order.
+    #:
+    #: .. versionadded:: 0.7.4
+    FILE_REF_CACHE_SIZE = 32
 
-    @typechecked
     def __init__(self, key: str, cls, docstring: str = None,
                  *,
                  default_warning: bool = False,
                  lookup_env: bool = True,
                  parse_env: typing.Optional[ParseFunctionType] = None,
+                 file_ref: bool = False,
                  **kwargs) -> None:
+        # Declarations run at import time, so they are checked by hand
+        # instead of @typechecked which would import typeguard eagerly.
+        check_argument_type('key', key, str)
+        check_argument_type('docstring', docstring, str, optional=True)
+        check_argument_type('default_warning', default_warning, bool)
+        check_argument_type('lookup_env', lookup_env, bool)
+        check_argument_type('parse_env', parse_env, callable, optional=True)
+        check_argument_type('file_ref', file_ref, bool)
         self.key = key
         self.cls = cls
         self.__doc__ = docstring
         self.lookup_env = lookup_env
         self.parse_env = parse_env
+        self.file_ref = file_ref
+        self._file_references = collections.OrderedDict()
+        self._file_references_lock = threading.Lock()
+        self._validator = None
         if 'default_func' in kwargs:
             if 'default' in kwargs:
                 raise TypeError('default_func and default are mutually '
@@ -173,12 +320,14 @@ class config_property:
             self.default_set = True
             self.default_value = True
             self.default_func = kwargs['default_func']
+            self._default = self.default_func
             self.default_warning = default_warning
         elif 'default' in kwargs:
             default = kwargs['default']
             self.default_set = True
             self.default_value = False
             self.default_func = lambda _: default
+            self._default = default
             self.default_warning = default_warning
         elif default_warning:
             raise TypeError('default_warning is only available when default '
@@ -187,18 +336,83 @@ class config_property:
             self.default_set = False
             self.default_value = False
             self.default_func = None
+            self._default = None
             self.default_warning = False
 
     def __get__(self, obj, cls: typing.Optional[type] = None):
         if obj is None:
             return self
-        default, value = self.get_raw_value(obj)
+        return self._get(obj)
+
+    def _get(self, obj, env_tree: typing.Optional[typing.Mapping] = None):
+        default, value = self.get_raw_value(obj, env_tree)
         if not default:
+            if self.file_ref:
+                value = self.dereference_file(value)
             value = self.convert_native_type(value)
             self.typecheck(value)
         return value
 
+    def check(self, obj,
+              env_tree: typing.Optional[typing.Mapping] = None) -> None:
+        """Validate the value of the given ``obj``'s property.  It's used by
+        :meth:`Configuration.validate()`.
+
+        :param obj: the configuration to validate
+        :type obj: :class:`Configuration`
+        :param env_tree: optional tree of environment variables made once
+                         for every property, instead of making one from
+                         the property's variables
+        :type env_tree: :class:`typing.Mapping`
+        :raise ConfigError: when the value is missing or invalid
+
+        .. versionadded:: 0.7.4
+
+        """
+        self._get(obj, env_tree)
+
+    def dereference_file(self, value):
+        """Read the file if the given ``value`` refers to a file like
+        ``"file:/etc/tls/server.key"``.  Otherwise ``value`` is returned
+        as it is.
+
+        .. versionadded:: 0.7.4
+
+        """
+        if not (isinstance(value, str) and
+                value.startswith(self.FILE_REF_PREFIX)):
+            return value
+        path = value[len(self.FILE_REF_PREFIX):]
+        references = self._file_references
+        with self._file_references_lock:
+            try:
+                reference = references[path]
+            except KeyError:
+                from .files import FileReference
+                reference = references[path] = FileReference(path)
+                while len(references) > self.FILE_REF_CACHE_SIZE:
+                    references.popitem(last=False)
+            else:
+                references.move_to_end(path)
+        try:
+            return reference.load(self.cls)
+        except (OSError, UnicodeDecodeError) as e:
+            raise ConfigValueError(
+                '{0} configuration refers to {1!r} which cannot be read: '
+                '{2}'.format(self.key, path, e)
+            ) from e
+
     def _value_from_dict(self, obj):
+        if isinstance(obj, Configuration):
+            index = obj.path_index
+            if index is not None:
+                # Don't fall back to environment variables through
+                # EnvReader.__getitem__(); they're parsed by
+                # _value_from_env() instead.
+                if self.key in index:
+                    return True, index[self.key]
+                return False, None
+            obj = obj.conf
         value = obj
         for key in self.key.split('.'):
             try:
@@ -278,49 +492,72 @@ class config_property:
                 z = z[k]
         return rs
 
-    def _value_from_env(self, obj):
+    def _value_from_env(self, obj, env_tree=None):
+        if env_tree is not None:
+            r = env_tree
+            for k in self.key.split('.'):
+                if not isinstance(r, collections.abc.Mapping) or k not in r:
+                    return None
+                r = r[k]
+            return self._parse_env_value(r)
         env_name = self._make_env_name(self.key)
         group_key = env_name + self.delimiter
+        source = as_environment(getattr(obj, 'environ', None))
         environ = {
-            k: v
-            for k, v in os.environ.items()
-            if k.startswith(group_key) or k == env_name
+            k: source[k] for k in source.keys_with_prefix(group_key)
         }
+        if env_name in source:
+            environ[env_name] = source[env_name]
         if environ:
             e = self._transform_env_to_dict(environ)
             r = e
             for k in self.key.split('.'):
                 r = r[k]
-            if self.parse_env:
-                try:
-                    r = self.parse_env(r)
-                except Exception as e:
-                    raise ConfigValueError(
-                        'having a trouble for parsing an environment var.'
-                    ) from e
-            return r
+            return self._parse_env_value(r)
         else:
             return None
 
-    def get_raw_value(self, obj) -> typing.Tuple[bool, object]:
-        def dict_merge(dct, merge_dct):
-            dct = dct or {}
-            for k, v in merge_dct.items():
-                if k in dct and isinstance(dct[k], dict):
-                    dict_merge(dct[k], merge_dct[k])
-                else:
-                    dct[k] = merge_dct[k]
-            return dct
+    def _parse_env_value(self, r):
+        parse_env = self.env_parser
+        if parse_env:
+            try:
+                r = parse_env(r)
+            except Exception as e:
+                raise ConfigValueError(
+                    'having a trouble for parsing an environment var.'
+                ) from e
+        return r
+
+    @cached_property
+    def env_parser(self) -> typing.Optional[ParseFunctionType]:
+        """(:class:`collections.abc.Callable`) The function to parse
+        environment variables.  If ``parse_env`` is omitted, it's derived from
+        the declared type by :func:`~settei.parse_env.derive_parser()`
+        once per property.
+
+        .. versionadded:: 0.7.4
+
+        """
+        if self.parse_env is not None:
+            return self.parse_env
+        return derive_parser(self.cls)
 
+    def get_raw_value(
+        self, obj, env_tree: typing.Optional[typing.Mapping] = None
+    ) -> typing.Tuple[bool, object]:
         raw_value = None
         found, value = self._value_from_dict(obj)
         if found:
             raw_value = False, value
         if self.lookup_env:
-            env_val = self._value_from_env(obj)
+            env_val = self._value_from_env(obj, env_tree)
             if env_val is not None:
-                if raw_value and isinstance(value, dict):
-                    raw_value = False, dict_merge(env_val, value)
+                if raw_value and \
+                        isinstance(value, collections.abc.Mapping) and \
+                        isinstance(env_val, collections.abc.Mapping):
+                    # A new table is made; neither the document nor
+                    # the environment is mutated.
+                    raw_value = False, merge_trees(env_val, value)
                 elif raw_value is None:
                     raw_value = False, env_val
         if raw_value is None and self.default_set:
@@ -340,18 +577,11 @@ class config_property:
 
     def convert_native_type(self, value) -> typing.Any:
         cls = get_union_types(self.cls) or self.cls
-        if isinstance(cls, type) and issubclass(cls, enum.Enum):
-            try:
-                return cls(value)
-            except ValueError:
-                raise ConfigTypeError(
-                    'Invalid value {0} in {1!r}. Candidates are: {2}'.format(
-                        value, cls, ', '.join(cls.__members__)
-                    )
-                )
-        elif isinstance(cls, collections.abc.Iterable):
-            enums = filter(lambda i: issubclass(i, enum.Enum), cls)
-            non_enums = filter(lambda i: not issubclass(i, enum.Enum), cls)
+        if _is_enum(cls):
+            return _convert_enum(cls, value)
+        elif isinstance(cls, tuple):
+            enums = filter(_is_enum, cls)
+            non_enums = filter(lambda i: not _is_enum(i), cls)
             candidates = []
             for e in enums:
                 try:
@@ -360,7 +590,7 @@ class config_property:
                     pass
             if not candidates:
                 if non_enums:
-                    return value
+                    pass  # enums nested in other types are converted below
                 else:
                     raise ConfigTypeError(
                         'No matching value {0} for types: {1}'.format(
@@ -375,12 +605,45 @@ class config_property:
                         value, ', '.join([repr(r) for r in candidates])
                     )
                 )
+        converter = self.enum_converter
+        if converter is not None:
+            return converter(value)
         return value
 
+    @cached_property
+    def default_digest(self) -> typing.Optional[str]:
+        # Defaults are identified without being made, since default_func
+        # may return a new object every time or have side effects.
+        if not self.default_set:
+            return None
+        elif not self.default_value:
+            try:
+                return DigestCache().digest(self._default)
+            except TypeError:
+                identity = type(self._default)
+        else:
+            identity = self._default
+        return '{0.__module__}.{0.__qualname__}'.format(identity)
+
+    @cached_property
+    def enum_converter(self) -> typing.Optional[
+        typing.Callable[[object], object]
+    ]:
+        # Enum values nested in containers, e.g. typing.List[SomeEnum].
+        return _compile_enum_converter(self.cls)
+
     def typecheck(self, value) -> None:
-        union_types = get_union_types(self.cls)
-        cls = self.cls if union_types is None else union_types
-        if not isinstance(value, cls):
+        validator = self._validator
+        if validator is None:
+            # Compiled on the first check instead of the declaration,
+            # so that declarations stay cheap at import time.
+            try:
+                validator = compile_validator(self.cls)
+            except TypeError:
+                # Whatever isinstance() takes, e.g. a tuple of classes.
+                validator = functools.partial(_isinstance, cls=self.cls)
+            self._validator = validator
+        if not validator(value):
             raise ConfigTypeError(
                 '{0} configuration must be {1}, not {2!r}'.format(
                     self.key, typing._type_repr(self.cls), value
@@ -585,7 +848,6 @@ class config_object_property(config_property):
         re.UNICODE
     )
 
-    @typechecked
     def __init__(self, key: str, cls, docstring: str = None,
                  recurse: bool = False, *, cached: bool = False,
                  lookup_env: bool = True,
@@ -594,6 +856,8 @@ class config_object_property(config_property):
         super().__init__(key=key, cls=cls, docstring=docstring,
                          lookup_env=lookup_env, parse_env=parse_env,
                          **kwargs)
+        check_argument_type('recurse', recurse, bool)
+        check_argument_type('cached', cached, bool)
         self.recurse = recurse
         self.cached = cached
 
@@ -632,6 +896,43 @@ class config_object_property(config_property):
 
         return value
 
+    def check(self, obj,
+              env_tree: typing.Optional[typing.Mapping] = None) -> None:
+        """Validate the expression of the given ``obj``'s property.
+        Unlike getting the property, the object is not made since it may
+        have side effects, e.g. connecting to a server.  Instead, its
+        ``class`` field is imported.
+
+        :param obj: the configuration to validate
+        :type obj: :class:`Configuration`
+        :raise ConfigError: when the expression is missing or invalid,
+                            or its class cannot be imported
+
+        .. versionadded:: 0.7.4
+
+        """
+        default, expression = self.get_raw_value(obj, env_tree)
+        if default:
+            return
+        if not isinstance(expression, collections.abc.Mapping) or \
+                'class' not in expression:
+            raise ConfigValueError(
+                '{0!r} field must be a mapping having "class" '
+                'field'.format(self.key)
+            )
+        try:
+            self.import_(expression['class'])
+        except (ImportError, AttributeError) as e:
+            raise ConfigValueError(
+                '{0!r} field refers to {1!r} which cannot be imported: '
+                '{2}'.format(self.key, expression['class'], e)
+            ) from e
+
+    @cached_property
+    def env_parser(self) -> typing.Optional[ParseFunctionType]:
+        # Environment variables make expressions, not objects of the type.
+        return self.parse_env
+
     def evaluate(self, expression) -> object:
         if not isinstance(expression, collections.abc.Mapping):
             return expression
@@ -709,6 +1010,26 @@ class ConfigTypeError(TypeError, ConfigError):
     """
 
 
+class ConfigLoadError(ConfigError):
+    """An exception class rises when some of configuration files loaded
+    together by :meth:`Configuration.load_many()` have failed.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    def __init__(self, errors: typing.Sequence['LoadResult']) -> None:
+        super().__init__(
+            'failed to load {0} file(s): {1}'.format(
+                len(errors),
+                ', '.join(str(r.path) for r in errors)
+            )
+        )
+        #: (:class:`typing.Sequence`\ [:class:`LoadResult`]) The results
+        #: having :attr:`~LoadResult.error`.
+        self.errors = errors
+
+
 class ConfigWarning(RuntimeWarning):
     """Warning category which raised when a default configuration is used
     instead due to missing required configuration.
@@ -716,7 +1037,213 @@ class ConfigWarning(RuntimeWarning):
     """
 
 
-class Configuration(EnvReader):
+class LoadResult(collections.namedtuple('LoadResult',
+                                        'path configuration error')):
+    """The result of each file loaded by
+    :meth:`Configuration.iter_load_many()`.  Either :attr:`configuration` or
+    :attr:`error` is :const:`None`.
+
+    .. attribute:: path
+
+       (:class:`pathlib.Path`) The loaded file path.
+
+    .. attribute:: configuration
+
+       (:class:`Configuration`) The loaded configuration.
+
+    .. attribute:: error
+
+       (:class:`Exception`) The error occurred during loading the file.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+
+class ConfigValidationError(ConfigError):
+    """An exception class rises when some properties have failed to be
+    validated by :meth:`Configuration.validate()`.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    def __init__(self, report: 'ValidationReport') -> None:
+        super().__init__(
+            '{0} invalid configuration(s): {1}'.format(
+                len(report.errors),
+                '; '.join('{0}: {1}'.format(name, e)
+                          for name, e in report.errors.items())
+            )
+        )
+        #: (:class:`ValidationReport`) The report of the validation.
+        self.report = report
+
+    @property
+    def errors(self) -> typing.Mapping[str, Exception]:
+        """(:class:`typing.Mapping`\\ [:class:`str`, :exc:`Exception`])
+        The errors of each property.
+
+        """
+        return self.report.errors
+
+
+class ConfigCallbackError(ConfigError):
+    """An exception class rises when some callbacks subscribed through
+    :meth:`Configuration.on_change()` have failed.  The new document has
+    been swapped in regardless, and every other callback has been called.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    def __init__(self, errors: typing.Sequence[Exception]) -> None:
+        super().__init__(
+            '{0} callback(s) failed: {1}'.format(
+                len(errors),
+                '; '.join('{0}: {1}'.format(type(e).__name__, e)
+                          for e in errors)
+            )
+        )
+        #: (:class:`typing.Sequence`\\ [:exc:`Exception`]) The errors
+        #: raised by the callbacks.
+        self.errors = errors
+
+
+class ValidationReport(collections.namedtuple('ValidationReport',
+                                              'errors timings')):
+    """The result of :meth:`Configuration.validate()`.
+
+    .. attribute:: errors
+
+       (:class:`typing.Mapping`\\ [:class:`str`, :exc:`Exception`])
+       The errors of invalid properties by their attribute names.
+
+    .. attribute:: timings
+
+       (:class:`typing.Mapping`\\ [:class:`str`, :class:`float`])
+       The seconds taken to validate each property by their attribute names.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    @property
+    def elapsed(self) -> float:
+        """(:class:`float`) The total seconds taken to validate."""
+        return sum(self.timings.values())
+
+
+def _ancestor_paths(paths: typing.Iterable[str]) -> typing.Set[str]:
+    ancestors = set()
+    for path in paths:
+        parts = path.split('.')
+        for i in range(1, len(parts)):
+            ancestors.add('.'.join(parts[:i]))
+    return ancestors
+
+
+def _snapshot_document(document: typing.Mapping[str, object]) -> \
+        typing.Mapping[str, object]:
+    # Only sources which may change under the hood are copied; documents
+    # already in memory and unchanged overlay bases are kept as they are.
+    if isinstance(document, Overlay):
+        base = _snapshot_document(document.base)
+        if base is document.base:
+            return document
+        return Overlay(base, document.overrides)
+    elif not isinstance(document, Source):
+        return document
+    elif document.document is not None:
+        return document.document
+    return _copy_tables(document)
+
+
+def _copy_tables(table: typing.Mapping[str, object]) -> \
+        typing.Mapping[str, object]:
+    # Values are immutable, so only tables are copied.
+    return {
+        k: _copy_tables(v) if isinstance(v, collections.abc.Mapping) else v
+        for k, v in table.items()
+    }
+
+
+def _load_document(path: pathlib.Path) -> typing.Mapping[str, object]:
+    # It has to be a module-level function to be sent to worker processes.
+    from pytoml import load
+    if not path.is_file():
+        raise FileNotFoundError('file not found: {!s}'.format(path))
+    with path.open() as f:
+        return load(f)
+
+
+#: The sentinel value for omitted ``default`` arguments.
+_MISSING = object()
+
+#: Guards lazily made locks of :class:`Configuration` instances.
+_LOCK_GUARD = threading.Lock()
+
+
+class ConfigurationMeta(abc.ABCMeta):
+    """The metaclass of :class:`Configuration`.  It makes a registry of
+    :class:`config_property` descriptors for every class when it's defined,
+    merged along its MRO including mixins.  Properties are ordered as
+    they are declared.
+
+    .. attribute:: config_properties
+
+       (:class:`typing.Mapping`\\ [:class:`str`, :class:`config_property`])
+       The read-only mapping of attribute names to their descriptors.
+
+    .. attribute:: config_properties_by_key
+
+       (:class:`typing.Mapping`\\ [:class:`str`, :class:`typing.Sequence`\\
+       [:class:`config_property`]]) The read-only mapping of dotted key paths
+       to the descriptors declared with them.
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    @classmethod
+    def __prepare__(mcs, name, bases, **kwargs):
+        # Class namespaces are not ordered before Python 3.6.
+        return collections.OrderedDict()
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        cls = super().__new__(mcs, name, bases, dict(namespace), **kwargs)
+        cls._config_property_names = tuple(
+            k for k, v in namespace.items() if isinstance(v, config_property)
+        )
+        # Values derived from the document (e.g. web_config of presets)
+        # are dropped on reloads.
+        cls._cached_property_names = frozenset(
+            attr
+            for klass in cls.__mro__
+            for attr, value in vars(klass).items()
+            if isinstance(value, cached_property)
+        )
+        properties = collections.OrderedDict()
+        for klass in reversed(cls.__mro__):
+            attrs = vars(klass)
+            for attr in list(properties):
+                if attr in attrs and \
+                        not isinstance(attrs[attr], config_property):
+                    del properties[attr]  # shadowed by a non-property
+            # Mixins which are not made by this metaclass are scanned.
+            for attr in attrs.get('_config_property_names', attrs):
+                value = attrs[attr]
+                if isinstance(value, config_property):
+                    properties[attr] = value
+        by_key = collections.OrderedDict()
+        for prop in properties.values():
+            by_key[prop.key] = by_key.get(prop.key, ()) + (prop,)
+        cls.config_properties = types.MappingProxyType(properties)
+        cls.config_properties_by_key = types.MappingProxyType(by_key)
+        return cls
+
+
+class Configuration(EnvReader, metaclass=ConfigurationMeta):
     """Application instance with its settings e.g. database.  It implements
     read-only :class:`~collections.abc.Mapping` protocol as well, so you
     can treat it as a dictionary of string keys.
@@ -729,6 +1256,12 @@ class Configuration(EnvReader):
 
     """
 
+    #: (:class:`int`) The maximum number of prior documents kept in
+    #: :attr:`history` for :meth:`rollback()`.  Subclasses can override it.
+    #:
+    #: .. versionadded:: 0.7.4
+    history_size = 10
+
     @property
     def config(self) -> 'Configuration':
         warnings.warn(
@@ -738,31 +1271,786 @@ class Configuration(EnvReader):
         )
         return self
 
+    @property
+    def path_index(self) -> typing.Optional[PathIndex]:
+        """(:class:`~settei.document.PathIndex`) The flattened index of
+        the document.  It's built on the first access, and rebuilt when
+        the document is replaced, e.g., a
+        :class:`~settei.sources.RemoteSource` is refreshed.  It's
+        :const:`None` if the document is read lazily, e.g.,
+        :class:`~settei.sources.DirectorySource`.
+
+        .. versionadded:: 0.7.4
+
+        """
+        document = self.conf
+        if isinstance(document, Source):
+            document = document.document
+            if document is None:
+                return None
+        index = self.__dict__.get('_path_index')
+        if index is None or index.document is not document:
+            index = self._path_index = PathIndex(document)
+        return index
+
+    def get_path(self, path: str, default=_MISSING):
+        """Look up the value of the given dotted key ``path``, e.g.
+        ``config.get_path('database.pool.size')`` instead of
+        ``config['database']['pool']['size']``.  Paths in the document are
+        looked up through :attr:`path_index` in :math:`O(1)`; others are
+        looked up level by level, falling back to environment variables.
+
+        :param path: the dotted key path
+        :type path: :class:`str`
+        :param default: optional value to return if ``path`` is missing
+        :return: the value
+        :raise ConfigKeyError: when ``path`` is missing and ``default`` is
+                               not given
+
+        .. versionadded:: 0.7.4
+
+        """
+        index = self.path_index
+        if index is not None and path in index:
+            return index[path]
+        value = self
+        try:
+            for key in path.split('.'):
+                value = value[key]
+        except (KeyError, TypeError):
+            if default is _MISSING:
+                raise ConfigKeyError(path)
+            return default
+        return value
+
+    def get_many(self, paths: typing.Iterable[str],
+                 default=_MISSING) -> typing.Sequence[object]:
+        """Look up many dotted key ``paths`` at once.  See also
+        :meth:`get_path()`.
+
+        :param paths: the dotted key paths
+        :type paths: :class:`typing.Iterable`\\ [:class:`str`]
+        :param default: optional value for missing paths
+        :return: the values in the same order as ``paths``
+        :rtype: :class:`typing.Sequence`
+        :raise ConfigKeyError: when any of ``paths`` is missing and
+                               ``default`` is not given
+
+        .. versionadded:: 0.7.4
+
+        """
+        return [self.get_path(path, default) for path in paths]
+
+    def derive(self, overrides: typing.Mapping[str, object]) -> \
+            'Configuration':
+        """Make a configuration which overrides some values of this
+        configuration, e.g., per tenant or per request::
+
+            tenant_config = config.derive({'database.pool.size': 20})
+
+        The derived configuration shares every unchanged table with this
+        configuration, and stores only the overridden ones in an
+        :class:`~settei.document.Overlay`.  Reads of unchanged values fall
+        through to this configuration's document in :math:`O(depth)`.
+        Environment variables are shared as well.
+
+        :param overrides: the mapping of dotted key paths (or nested tables)
+                          to override
+        :type overrides: :class:`typing.Mapping`\\ [:class:`str`,
+                         :class:`object`]
+        :return: the derived configuration of the same type
+        :rtype: :class:`Configuration`
+
+        .. versionadded:: 0.7.4
+
+        """
+        tree = override_tree(overrides)
+        conf = self.conf
+        if isinstance(conf, Overlay):
+            # Stack on the same base instead of overlays on overlays,
+            # so that reads don't get slower as configurations are derived.
+            conf = Overlay(conf.base, merge_trees(conf.overrides, tree))
+        else:
+            conf = Overlay(conf, tree)
+        # __init__() is bypassed since the environment has already been
+        # resolved (e.g. env_prefix) and caches must not be inherited.
+        derived = type(self).__new__(type(self))
+        derived.conf = conf
+        derived.froms = self.froms
+        derived.environ = self.environ
+        derived._children = {}
+        derived._derived = True
+        return derived
+
+    def section(self, path: str, cls: typing.Optional[type] = None) -> \
+            'Section':
+        """Make a read-only view of the table at the given dotted key
+        ``path``.  See also :class:`Section`.
+
+        :param path: the dotted key path of the section, e.g. ``'database'``
+        :type path: :class:`str`
+        :param cls: optional subclass of :class:`Section` which declares
+                    properties relative to the section
+        :type cls: :class:`type`
+        :return: the section view
+        :rtype: :class:`Section`
+
+        .. versionadded:: 0.7.4
+
+        """
+        if cls is None:
+            cls = Section
+        elif not (isinstance(cls, type) and issubclass(cls, Section)):
+            raise TypeError('cls must be a subclass of {0.__module__}.'
+                            '{0.__qualname__}, not {1!r}'.format(Section, cls))
+        return cls(self, path)
+
+    def validate(self) -> ValidationReport:
+        """Validate every declared property at once, e.g., right after
+        deployment, instead of failing on the first access hours later.
+        The document is shared, and environment variables of every
+        property are read and merged into a tree once for the whole pass.
+        Objects of
+        :class:`config_object_property` are not made; their ``class``
+        fields are imported instead.
+
+        :return: the report having timings of each property
+        :rtype: :class:`ValidationReport`
+        :raise ConfigValidationError: when any of the properties is invalid.
+                                      errors of every property are collected
+                                      into it.  other errors than
+                                      :exc:`ConfigError`, :exc:`ValueError`,
+                                      and :exc:`TypeError`, e.g. bugs of
+                                      ``default_func``, are not collected
+                                      but propagated
+
+        .. versionadded:: 0.7.4
+
+        """
+        import copy
+        import time
+        probe = copy.copy(self)
+        probe.environ = self.environ.snapshot()
+        probe._children = {}
+        env_tree = self._environ_tree(probe.environ)
+        errors = collections.OrderedDict()
+        timings = collections.OrderedDict()
+        for name, prop in type(self).config_properties.items():
+            started = time.perf_counter()
+            try:
+                prop.check(probe, env_tree)
+            except (ConfigError, ValueError, TypeError) as e:
+                errors[name] = e
+            timings[name] = time.perf_counter() - started
+        report = ValidationReport(errors, timings)
+        if errors:
+            raise ConfigValidationError(report)
+        return report
+
+    def on_change(
+        self, pattern: str,
+        callback: typing.Callable[['Configuration', typing.Sequence[str]],
+                                  None]
+    ) -> typing.Callable[[], None]:
+        """Subscribe to changes of the properties whose keys match
+        the given ``pattern`` when the document is replaced by
+        :meth:`reload()`::
+
+            config.on_change('database.*', reconnect)
+
+        The ``callback`` is called once per :meth:`reload()` with
+        the configuration and the sorted keys matching ``pattern``, after
+        the new document is swapped in.  Keys are of the changed
+        properties, the changed paths, and the tables containing them,
+        e.g. ``'logging'`` for a change of ``'logging.root'``.  It's not
+        called if none of them changed.  Callbacks are called outside
+        the lock, so that they can reload the configuration again.
+
+        Sections and derived configurations (see :meth:`derive()`) cannot
+        be subscribed to; subscribe to the configuration they're made from
+        instead.
+
+        :param pattern: the glob pattern of dotted key paths,
+                        e.g. ``'database.*'``
+        :type pattern: :class:`str`
+        :param callback: the function to call
+        :type callback: :class:`typing.Callable`
+        :return: the function to unsubscribe
+        :rtype: :class:`typing.Callable`\\ [[], :const:`None`]
+        :raise TypeError: when it's a section or a derived configuration
+
+        .. versionadded:: 0.7.4
+
+        """
+        check_argument_type('pattern', pattern, str)
+        if not callable(callback):
+            raise TypeError('callback must be callable, not ' +
+                            repr(callback))
+        elif self.__dict__.get('_derived'):
+            raise TypeError('derived configurations do not follow reloads '
+                            'of their origin; subscribe to the origin '
+                            'configuration instead')
+        subscription = pattern, callback
+        with self._reload_lock:
+            self._subscriptions = self.__dict__.get('_subscriptions', ()) + (
+                subscription,
+            )
+
+        def unsubscribe() -> None:
+            with self._reload_lock:
+                self._subscriptions = tuple(
+                    s for s in self.__dict__.get('_subscriptions', ())
+                    if s is not subscription
+                )
+        return unsubscribe
+
+    @property
+    def _reload_lock(self) -> threading.Lock:
+        lock = self.__dict__.get('_lock')
+        if lock is None:
+            with _LOCK_GUARD:
+                lock = self.__dict__.get('_lock')
+                if lock is None:
+                    lock = self._lock = threading.Lock()
+        return lock
+
+    def reload(self, conf: typing.Mapping[str, object]) -> typing.Sequence[
+        str
+    ]:
+        """Replace the document with the given new one, e.g., after
+        the configuration file is edited.  The new document is swapped in
+        atomically, so that readers see either the old one or the new one
+        as a whole.
+
+        Tables and values of the new document equal to the old ones are
+        replaced by the old ones through
+        :func:`~settei.document.share_unchanged()`.  Changes are then found
+        by :func:`~settei.document.diff()`, which skips the shared tables.
+        Cached objects of :class:`config_object_property` are dropped only
+        if their values changed, whereas values of
+        :class:`~settei.utils.cached_property` (e.g.
+        :attr:`~settei.presets.flask.WebConfiguration.web_config`) are
+        all dropped on any change.  Callbacks subscribed through
+        :meth:`on_change()` are then called in a batch.
+
+        The old document is kept in :attr:`history` so that it can be
+        restored by :meth:`rollback()`.
+
+        :param conf: the new document
+        :type conf: :class:`typing.Mapping`\\ [:class:`str`,
+                    :class:`object`]
+        :return: the sorted dotted key paths of changed values
+        :rtype: :class:`typing.Sequence`\\ [:class:`str`]
+
+        .. versionadded:: 0.7.4
+
+        """
+        if not isinstance(conf, (Source, FrozenDict)):
+            conf = dict(conf)
+        with self._reload_lock:
+            changes = self._swap(share_unchanged(self.conf, conf),
+                                 record=True)
+        self._notify(changes)
+        return changes
+
+    @property
+    def history(self) -> typing.Sequence[typing.Mapping[str, object]]:
+        """(:class:`typing.Sequence`\\ [:class:`typing.Mapping`]) The prior
+        documents replaced by :meth:`reload()`, from the oldest to
+        the latest.  Up to :attr:`history_size` documents are kept.
+        Consecutive documents share their unchanged tables, so that each
+        of them costs only its difference.
+        Lazily read sources such as
+        :class:`~settei.sources.DirectorySource` are copied when they're
+        replaced, so that rolling back doesn't depend on files which may
+        have been overwritten.
+
+        .. versionadded:: 0.7.4
+
+        """
+        return tuple(self.__dict__.get('_history', ()))
+
+    def rollback(self, n: int = 1) -> typing.Sequence[str]:
+        """Restore the ``n``-th latest prior document in :attr:`history`,
+        e.g., after a bad configuration is pushed, without reading files
+        again.  The ``n`` latest documents are removed from
+        :attr:`history`.  Like :meth:`reload()`, it's swapped in atomically,
+        cached objects are dropped only if their values differ, and
+        callbacks subscribed through :meth:`on_change()` are called.
+
+        :param n: how many versions to go back.  1 by default
+        :type n: :class:`int`
+        :return: the sorted dotted key paths of changed values
+        :rtype: :class:`typing.Sequence`\\ [:class:`str`]
+        :raise ValueError: when there are less than ``n`` prior documents
+
+        .. versionadded:: 0.7.4
+
+        """
+        check_argument_type('n', n, int)
+        with self._reload_lock:
+            history = self.__dict__.get('_history', ())
+            if not 1 <= n <= len(history):
+                raise ValueError(
+                    'n must be between 1 and {0} (the number of prior '
+                    'documents), not {1!r}'.format(len(history), n)
+                )
+            for _ in range(n - 1):
+                history.pop()
+            changes = self._swap(history.pop(), record=False)
+        self._notify(changes)
+        return changes
+
+    def _swap(self, conf: typing.Mapping[str, object],
+              record: bool) -> typing.Sequence[str]:
+        old = self.conf
+        if isinstance(old, Source) and old.document is not None:
+            old = old.document
+        new = conf.document if isinstance(conf, Source) and \
+            conf.document is not None else conf
+        changes = diff(old, new)
+        if not changes:
+            return changes
+        attrs = self.__dict__
+        if record:
+            history = attrs.get('_history')
+            if history is None:
+                history = attrs['_history'] = collections.deque(
+                    maxlen=type(self).history_size
+                )
+            # Lazy sources read files which may be overwritten later,
+            # so their current contents are copied instead.
+            history.append(_snapshot_document(old))
+        self.conf = conf
+        changed_keys = self._changed_keys(changes)
+        for name, prop in type(self).config_properties.items():
+            if prop.key in changed_keys:
+                # Drop cached objects and values baked by snapshots.
+                attrs.pop('  cache_{!s}'.format(prop.key), None)
+                attrs.pop(name, None)
+        # Which keys cached properties depend on is unknown, so all of
+        # them are dropped.
+        for name in type(self)._cached_property_names:
+            attrs.pop(name, None)
+        return changes
+
+    def _notify(self, changes: typing.Sequence[str]) -> None:
+        # Called after the lock is released, so that callbacks can reload
+        # the configuration again, and slow ones don't block reloading.
+        subscriptions = self.__dict__.get('_subscriptions', ())
+        if not changes or not subscriptions:
+            return
+        names = set(self._changed_keys(changes))
+        names.update(changes)
+        names.update(_ancestor_paths(changes))
+        names = sorted(names)
+        errors = []
+        for pattern, callback in subscriptions:
+            keys = fnmatch.filter(names, pattern)
+            if keys:
+                try:
+                    callback(self, keys)
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise ConfigCallbackError(errors) from errors[0]
+
+    def _changed_keys(self, changes: typing.Sequence[str]) -> typing.List[
+        str
+    ]:
+        # A property is affected by a change of its own path, its ancestors
+        # (e.g. a replaced table), or its descendants.
+        changed = set(changes)
+        touched = _ancestor_paths(changes)
+        keys = []
+        for key in type(self).config_properties_by_key:
+            if key in changed or key in touched:
+                keys.append(key)
+                continue
+            parts = key.split('.')
+            if any('.'.join(parts[:i]) in changed
+                   for i in range(1, len(parts))):
+                keys.append(key)
+        keys.sort()
+        return keys
+
+    def fingerprint(self, path: typing.Optional[str] = None) -> str:
+        """Compute a stable digest of the effective configuration, e.g.,
+        to confirm that every node of a fleet runs the same configuration,
+        or to use it as a cache key.  It covers the document, environment
+        variables of declared properties, and defaults of declared
+        properties missing from both of them.  Defaults are not made to be
+        hashed; ``default_func`` is identified by its qualified name, and
+        so are the types of ``default`` values which cannot be hashed by
+        :class:`~settei.document.DigestCache`.
+
+        Digests of tables are cached by :class:`~settei.document.DigestCache`
+        so that after :meth:`reload()` only the changed paths are rehashed.
+
+        :param path: optional dotted key path of a section to fingerprint,
+                     e.g. ``'database'``.  it covers only the section and
+                     properties declared under it
+        :type path: :class:`str`
+        :return: the hex digest
+        :rtype: :class:`str`
+
+        .. versionadded:: 0.7.4
+
+        """
+        h = hashlib.sha256(self._document_digest(path).encode())
+        prefix = '' if path is None else path + '.'
+        environ = self.environ
+        for key, props in sorted(type(self).config_properties_by_key.items()):
+            if path is not None and key != path and \
+                    not key.startswith(prefix):
+                continue
+            for prop in props:
+                names = []
+                if prop.lookup_env:
+                    env_name = prop._make_env_name(key)
+                    names = list(environ.keys_with_prefix(
+                        env_name + prop.delimiter
+                    ))
+                    if env_name in environ:
+                        names.append(env_name)
+                    names.sort()
+                for name in names:
+                    h.update('env:{0}={1}\0'.format(
+                        name, environ[name]
+                    ).encode('utf-8'))
+                if prop.default_set and not names and \
+                        not prop._value_from_dict(self)[0]:
+                    h.update('default:{0}={1}\0'.format(
+                        key, prop.default_digest
+                    ).encode('utf-8'))
+        return h.hexdigest()
+
+    def _document_digest(self, path: typing.Optional[str]) -> str:
+        digests = self.__dict__.get('_digests')
+        if digests is None:
+            digests = self.__dict__.setdefault('_digests', DigestCache())
+        document = self.conf
+        if isinstance(document, Source) and document.document is not None:
+            document = document.document
+        digest = digests.digest(document)
+        if path is None:
+            return digest
+        value = document
+        for key in path.split('.'):
+            if not isinstance(value, collections.abc.Mapping) or \
+                    key not in value:
+                return ''
+            value = value[key]
+        return digests.digest(value, prune=False)
+
+    @classmethod
+    def _environ_tree(cls, environ) -> typing.Optional[typing.Mapping]:
+        # Merge the environment variables of every property into a tree.
+        props = [prop for props in cls.config_properties_by_key.values()
+                 for prop in props if prop.lookup_env]
+        if not props:
+            return None
+        variables = {}
+        for prop in props:
+            env_name = prop._make_env_name(prop.key)
+            for k in environ.keys_with_prefix(env_name + prop.delimiter):
+                variables[k] = environ[k]
+            if env_name in environ:
+                variables[env_name] = environ[env_name]
+        try:
+            return props[0]._transform_env_to_dict(variables)
+        except Exception:
+            # Conflicting variables, e.g. both DATABASE and DATABASE__URL;
+            # each property reads its own variables to report its error.
+            return None
+
     @classmethod
-    def from_file(cls, file) -> 'Configuration':
+    def from_file(
+        cls, file, *,
+        environ: typing.Optional[typing.Mapping[str, str]] = None,
+        frozen: bool = False
+    ) -> 'Configuration':
         """Load settings from the given ``file`` and instantiate an
         :class:`Configuration` instance from that.
 
         :param file: the file object that contains TOML settings
+        :param environ: keyword only argument.  the mapping of environment
+                        variables to look up.  :data:`os.environ` by default
+        :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+        :param frozen: keyword only argument.  whether to deeply freeze
+                       the document.  see also :func:`settei.document.freeze()`
+        :type frozen: :class:`bool`
         :return: an instantiated configuration
         :rtype: :class:`Configuration`
 
+        .. versionadded:: 0.7.4
+
+           Added ``environ`` and ``frozen`` parameters.
+
         """
-        return cls(load(file))
+        from pytoml import load
+        document = load(file)
+        if frozen:
+            document = freeze(document)
+        return cls(document, environ=environ)
 
     @classmethod
     @typechecked
-    def from_path(cls, path: pathlib.Path) -> 'Configuration':
+    def from_path(
+        cls, path: pathlib.Path, *,
+        environ: typing.Optional[typing.Mapping[str, str]] = None,
+        frozen: bool = False
+    ) -> 'Configuration':
         """Load settings from the given ``path`` and instantiate an
         :class:`Configuration` instance from that.
 
         :param path: the file path that contains TOML settings
         :type path: :class:`pathlib.Path`
+        :param environ: keyword only argument.  the mapping of environment
+                        variables to look up.  :data:`os.environ` by default
+        :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+        :param frozen: keyword only argument.  whether to deeply freeze
+                       the document.  see also :func:`settei.document.freeze()`
+        :type frozen: :class:`bool`
         :return: an instantiated configuration
         :rtype: :class:`Configuration`
 
+        .. versionadded:: 0.7.4
+
+           Added ``environ`` and ``frozen`` parameters.
+
         """
         if not path.is_file():
             raise FileNotFoundError('file not found: {!s}'.format(path))
         with path.open() as f:
-            return cls.from_file(f)
+            return cls.from_file(f, environ=environ, frozen=frozen)
+
+    @classmethod
+    def from_directory(cls, path: typing.Union[str, pathlib.Path],
+                       **kwargs) -> 'Configuration':
+        """Instantiate a :class:`Configuration` which reads settings from
+        the given directory tree, e.g., Kubernetes ConfigMaps or Secrets
+        mounted as volumes.  Each file becomes a key, and its content
+        becomes a value.  See also :class:`~settei.sources.DirectorySource`.
+
+        :param path: the root directory path
+        :type path: :class:`pathlib.Path`
+        :param \\*\\*kwargs: keyword arguments passed to
+                             :class:`~settei.sources.DirectorySource`
+        :return: an instantiated configuration
+        :rtype: :class:`Configuration`
+
+        .. versionadded:: 0.7.4
+
+        """
+        from .sources import DirectorySource
+        return cls(DirectorySource(path, **kwargs))
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'Configuration':
+        """Instantiate a :class:`Configuration` which reads settings from
+        the given HTTP configuration service.  The document is refreshed
+        in the background.  See also :class:`~settei.sources.RemoteSource`.
+
+        :param url: the url of the configuration document
+        :type url: :class:`str`
+        :param \\*\\*kwargs: keyword arguments passed to
+                             :class:`~settei.sources.RemoteSource`
+        :return: an instantiated configuration
+        :rtype: :class:`Configuration`
+
+        .. versionadded:: 0.7.4
+
+        """
+        from .sources import RemoteSource
+        return cls(RemoteSource(url, **kwargs))
+
+    @classmethod
+    def iter_load_many(
+        cls, paths: typing.Iterable[typing.Union[str, pathlib.Path]],
+        executor=None, *, max_pending: typing.Optional[int] = None
+    ) -> typing.Iterator[LoadResult]:
+        """Load many configuration files concurrently, and yield their
+        results in the same order as ``paths``.  Files are parsed by
+        the given ``executor``; since parsing TOML is CPU-bound,
+        :class:`concurrent.futures.ProcessPoolExecutor` is used by default.
+
+        Only up to ``max_pending`` files are loaded ahead of the consumer,
+        so that the memory usage stays bounded even for thousands of files.
+        Errors are yielded as :attr:`LoadResult.error` instead of being
+        raised, so that a broken file doesn't stop the others.
+
+        :param paths: the file paths that contain TOML settings
+        :type paths: :class:`typing.Iterable`\\ [:class:`pathlib.Path`]
+        :param executor: optional :class:`concurrent.futures.Executor` to
+                         parse files.  if omitted a new process pool is made
+                         and shut down at the end
+        :type executor: :class:`concurrent.futures.Executor`
+        :param max_pending: the maximum number of files being loaded ahead.
+                            twice the number of CPUs by default
+        :type max_pending: :class:`int`
+        :return: the results of each file
+        :rtype: :class:`typing.Iterator`\\ [:class:`LoadResult`]
+
+        .. versionadded:: 0.7.4
+
+        """
+        import concurrent.futures
+        if max_pending is None:
+            max_pending = (os.cpu_count() or 1) * 2
+        elif max_pending < 1:
+            raise ValueError('max_pending must be greater than zero')
+        own_executor = executor is None
+        if own_executor:
+            executor = concurrent.futures.ProcessPoolExecutor()
+        pending = collections.deque()
+        try:
+            for path in paths:
+                path = pathlib.Path(path)
+                pending.append(
+                    (path, executor.submit(_load_document, path))
+                )
+                if len(pending) >= max_pending:
+                    yield cls._load_result(*pending.popleft())
+            while pending:
+                yield cls._load_result(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown()
+
+    @classmethod
+    def _load_result(cls, path: pathlib.Path, future) -> LoadResult:
+        try:
+            return LoadResult(path, cls(future.result()), None)
+        except Exception as e:
+            return LoadResult(path, None, e)
+
+    @classmethod
+    def load_many(
+        cls, paths: typing.Iterable[typing.Union[str, pathlib.Path]],
+        executor=None, *, max_pending: typing.Optional[int] = None
+    ) -> typing.Sequence['Configuration']:
+        """Load many configuration files concurrently.  It's a shortcut of
+        :meth:`iter_load_many()` which collects all instances at once.
+
+        :param paths: the file paths that contain TOML settings
+        :type paths: :class:`typing.Iterable`\\ [:class:`pathlib.Path`]
+        :param executor: optional :class:`concurrent.futures.Executor` to
+                         parse files.  if omitted a new process pool is made
+                         and shut down at the end
+        :type executor: :class:`concurrent.futures.Executor`
+        :param max_pending: the maximum number of files being loaded ahead.
+                            twice the number of CPUs by default
+        :type max_pending: :class:`int`
+        :return: the instantiated configurations in the same order as
+                 ``paths``
+        :rtype: :class:`typing.Sequence`\\ [:class:`Configuration`]
+        :raise ConfigLoadError: when any of the files failed to load.
+                                errors of every file are collected into it
+
+        .. versionadded:: 0.7.4
+
+        """
+        results = list(cls.iter_load_many(paths, executor,
+                                          max_pending=max_pending))
+        errors = [r for r in results if r.error is not None]
+        if errors:
+            raise ConfigLoadError(errors)
+        return [r.configuration for r in results]
+
+
+class Section(Configuration):
+    """A read-only view of a table in the ``parent`` configuration.  It
+    shares the parent's document and environment instead of copying them,
+    so that it's made in :math:`O(1)` and follows reloads of the parent.
+    Keys and environment variables are resolved relative to the section::
+
+        class DatabaseSection(Section):
+            url = config_property('url', str)  # database.url, DATABASE__URL
+
+        database = config.section('database', DatabaseSection)
+        connect(database.url, **database.get_path('options', {}))
+
+    Usually it's made by :meth:`Configuration.section()`.
+
+    :param parent: the parent configuration
+    :type parent: :class:`Configuration`
+    :param path: the dotted key path of the section, e.g. ``'database'``
+    :type path: :class:`str`
+
+    .. versionadded:: 0.7.4
+
+    """
+
+    def __init__(self, parent: Configuration, path: str) -> None:
+        # EnvReader.__init__() is not called since it copies the document.
+        #: (:class:`Configuration`) The parent configuration.
+        self.parent = parent
+        #: (:class:`str`) The dotted key path of the section.
+        self.path = path
+        self.froms = None
+        env_prefix = path.replace('.', self.DELIMITER).upper() + \
+            self.DELIMITER
+        if parent.froms is not None:
+            env_prefix = parent.froms + self.DELIMITER + env_prefix
+        self.environ = PrefixedEnvironment(parent.environ, env_prefix)
+        self._children = {}
+
+    def derive(self, overrides: typing.Mapping[str, object]) -> 'Section':
+        # Overrides are relative to the section; the parent is derived
+        # so that the section keeps sharing the parent's storage.
+        parent = self.parent.derive({
+            self.path + '.' + path: value
+            for path, value in overrides.items()
+        })
+        return parent.section(self.path, type(self))
+
+    def _document_digest(self, path: typing.Optional[str]) -> str:
+        # Digests are cached by the parent, which owns the document.
+        return self.parent._document_digest(
+            self.path if path is None else self.path + '.' + path
+        )
+
+    def reload(self, conf: typing.Mapping[str, object]) -> typing.Sequence[
+        str
+    ]:
+        raise TypeError('sections are views of their parent; '
+                        'reload the parent configuration instead')
+
+    def rollback(self, n: int = 1) -> typing.Sequence[str]:
+        raise TypeError('sections are views of their parent; '
+                        'roll back the parent configuration instead')
+
+    def on_change(
+        self, pattern: str,
+        callback: typing.Callable[['Configuration', typing.Sequence[str]],
+                                  None]
+    ) -> typing.Callable[[], None]:
+        raise TypeError('sections are views of their parent; '
+                        'subscribe to the parent configuration instead')
+
+    @property
+    def conf(self) -> typing.Mapping[str, object]:
+        value = self.parent.get_path(self.path, None)
+        if isinstance(value, EnvReader) or \
+                not isinstance(value, collections.abc.Mapping):
+            # Environment variables are looked up through self.environ.
+            return {}
+        return value
+
+    @property
+    def path_index(self) -> typing.Optional[SectionIndex]:
+        index = self.parent.path_index
+        if index is None:
+            return None
+        view = self.__dict__.get('_path_index')
+        if view is None or view.index is not index:
+            view = self._path_index = SectionIndex(index, self.path)
+        return view
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r}, {2!r})'.format(
+            type(self), self.parent, self.path
+        )
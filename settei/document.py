@@ -0,0 +1,621 @@
+""":mod:`settei.document` --- Indexes of configuration documents
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Looking up a dotted key path like ``'database.pool.size'`` walks nested
+tables level by level.  :class:`PathIndex` flattens a document once so that
+every path is looked up in :math:`O(1)`.
+:meth:`Configuration.get_path() <settei.base.Configuration.get_path>` and
+:class:`~settei.base.config_property` use it under the hood.
+
+:class:`Overlay` stacks overridden values on a document without copying it,
+which is used by :meth:`Configuration.derive()
+<settei.base.Configuration.derive>`.
+
+:func:`freeze()` makes a deeply immutable document, which is safe to share
+across threads and configurations, and is wrapped by
+:class:`~settei.base.Configuration` without copying::
+
+    config = AppConfig.from_path(path, frozen=True)
+
+:class:`DigestCache` hashes documents incrementally, which is used by
+:meth:`Configuration.fingerprint() <settei.base.Configuration.fingerprint>`.
+
+.. versionadded:: 0.7.4
+
+"""
+import collections.abc
+import datetime
+import enum
+import hashlib
+import sys
+import threading
+import typing
+
+from .sources import Source
+
+__all__ = ('DigestCache', 'FrozenDict', 'Overlay', 'PathIndex',
+           'SectionIndex', 'diff', 'flatten', 'freeze', 'merge_trees',
+           'override_tree', 'share_unchanged')
+
+
+class FrozenDict(dict):
+    """An immutable and hashable :class:`dict`.  It's a subclass of
+    :class:`dict` so that it can be read as fast as :class:`dict`, and
+    properties declared as :class:`dict` accept it.  Methods changing it
+    raise :exc:`TypeError`.
+
+    Its values should be immutable as well to be hashable; use
+    :func:`freeze()` to make one from a nested document.
+
+    """
+
+    __slots__ = '_hash',
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{0.__qualname__} is immutable'.format(type(self)))
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = \
+        update = __ior__ = _immutable
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __copy__(self) -> 'FrozenDict':
+        return self
+
+    def __deepcopy__(self, memo) -> 'FrozenDict':
+        return self
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1})'.format(
+            type(self), dict.__repr__(self)
+        )
+
+
+def freeze(value):
+    """Deeply freeze the given ``value``.  Mappings become
+    :class:`FrozenDict`, lists and tuples become :class:`tuple`, and sets
+    become :class:`frozenset`.  Already frozen :class:`FrozenDict` is
+    returned as it is without being traversed.
+
+    >>> freeze({'a': [1, 2], 'b': {'c'}})
+    settei.document.FrozenDict({'a': (1, 2), 'b': frozenset({'c'})})
+
+    .. note::
+
+       Since arrays become tuples, properties reading them should be
+       declared as :class:`typing.Sequence` rather than :class:`list`.
+
+    :param value: the value to freeze
+    :return: the frozen value
+
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    elif isinstance(value, collections.abc.Mapping):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+def flatten(document: typing.Mapping[str, object]) -> typing.Iterator[
+    typing.Tuple[str, object]
+]:
+    """Yield every dotted key path of the given ``document`` with its value,
+    including nested tables themselves.  Keys containing dots are skipped
+    since they cannot be told apart from nested keys.
+
+    >>> dict(flatten({'a': {'b': 1}}))
+    {'a': {'b': 1}, 'a.b': 1}
+
+    :param document: the nested mapping to flatten
+    :type document: :class:`typing.Mapping`
+    :return: pairs of dotted key paths and their values
+    :rtype: :class:`typing.Iterator`\\ [:class:`typing.Tuple`\\
+            [:class:`str`, :class:`object`]]
+
+    """
+    stack = [('', document)]
+    while stack:
+        prefix, table = stack.pop()
+        for key, value in table.items():
+            if not isinstance(key, str) or '.' in key:
+                continue
+            path = prefix + key
+            yield path, value
+            if isinstance(value, collections.abc.Mapping):
+                stack.append((path + '.', value))
+
+
+class PathIndex:
+    """The flattened index of dotted key paths of a ``document``.  It's
+    built once, and doesn't follow changes of the ``document`` made in
+    place.  Replace the document with a new one and make a new index
+    instead.
+
+    :param document: the nested mapping to index
+    :type document: :class:`typing.Mapping`
+
+    """
+
+    def __init__(self, document: typing.Mapping[str, object]) -> None:
+        #: (:class:`typing.Mapping`) The indexed document.
+        self.document = document
+        self._paths = dict(flatten(document))
+
+    def __getitem__(self, path: str):
+        return self._paths[path]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def get(self, path: str, default=None):
+        """Look up the value of the given dotted key ``path``.
+
+        :param path: the dotted key path, e.g. ``'database.url'``
+        :type path: :class:`str`
+        :param default: the value to return if ``path`` is missing
+        :return: the value
+
+        """
+        return self._paths.get(path, default)
+
+    def __sizeof__(self) -> int:
+        # Dotted keys are made by the index, so they're its own.
+        return object.__sizeof__(self) + sys.getsizeof(self._paths) + sum(
+            sys.getsizeof(path) for path in self._paths
+        )
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}(<{1} paths>)'.format(
+            type(self), len(self._paths)
+        )
+
+
+class SectionIndex:
+    """A view of a :class:`PathIndex` relative to the given ``path``.
+    It makes no copy.  It's used by :class:`~settei.base.Section`.
+
+    :param index: the index of the whole document
+    :type index: :class:`PathIndex`
+    :param path: the dotted key path of the section, e.g. ``'database'``
+    :type path: :class:`str`
+
+    """
+
+    def __init__(self, index: PathIndex, path: str) -> None:
+        #: (:class:`PathIndex`) The index of the whole document.
+        self.index = index
+        self.prefix = path + '.'
+
+    def __getitem__(self, path: str):
+        return self.index[self.prefix + path]
+
+    def __contains__(self, path: str) -> bool:
+        return self.prefix + path in self.index
+
+    def get(self, path: str, default=None):
+        """Look up the value of the given dotted key ``path`` relative to
+        the section.
+
+        :param path: the relative dotted key path, e.g. ``'url'``
+        :type path: :class:`str`
+        :param default: the value to return if ``path`` is missing
+        :return: the value
+
+        """
+        return self.index.get(self.prefix + path, default)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r}, {2!r})'.format(
+            type(self), self.index, self.prefix[:-1]
+        )
+
+
+def override_tree(overrides: typing.Mapping[str, object]) -> typing.Mapping[
+    str, object
+]:
+    """Expand dotted key paths of the given ``overrides`` into nested
+    dictionaries.
+
+    >>> override_tree({'a.b': 1, 'a.c': 2, 'd': 3})
+    {'a': {'b': 1, 'c': 2}, 'd': 3}
+
+    :param overrides: the mapping of dotted key paths to values
+    :type overrides: :class:`typing.Mapping`\\ [:class:`str`,
+                     :class:`object`]
+    :return: the nested dictionaries
+    :rtype: :class:`typing.Mapping`
+
+    """
+    tree = {}
+    for path, value in overrides.items():
+        *parents, last = path.split('.')
+        node = tree
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        if isinstance(value, collections.abc.Mapping) and \
+                isinstance(node.get(last), dict):
+            node[last] = merge_trees(node[last], value)
+        else:
+            node[last] = value
+    return tree
+
+
+def merge_trees(a: typing.Mapping[str, object],
+                b: typing.Mapping[str, object]) -> typing.Mapping[str, object]:
+    """Deeply merge two nested mappings into a new one.  Values of ``b``
+    take precedence over ``a``.  Neither is mutated, and tables not in
+    ``b`` are shared rather than being copied.
+
+    >>> merge_trees({'a': {'b': 1, 'c': 2}}, {'a': {'c': 3}})
+    {'a': {'b': 1, 'c': 3}}
+
+    :param a: the base mapping
+    :type a: :class:`typing.Mapping`
+    :param b: the mapping to merge
+    :type b: :class:`typing.Mapping`
+    :return: the merged mapping
+    :rtype: :class:`typing.Mapping`
+
+    """
+    result = dict(a)
+    for key, value in b.items():
+        if isinstance(value, collections.abc.Mapping) and \
+                isinstance(result.get(key), collections.abc.Mapping):
+            result[key] = merge_trees(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class Overlay(Source):
+    """A read-only mapping which stacks ``overrides`` on a ``base`` document
+    without copying it.  Tables in both are merged; unchanged tables of
+    the ``base`` are shared as they are, so that the memory usage is
+    proportional to the ``overrides``, not the ``base``.
+
+    :param base: the base document
+    :type base: :class:`typing.Mapping`
+    :param overrides: the nested overridden values.
+                      see also :func:`override_tree()`
+    :type overrides: :class:`typing.Mapping`
+
+    """
+
+    def __init__(self, base: typing.Mapping[str, object],
+                 overrides: typing.Mapping[str, object]) -> None:
+        #: (:class:`typing.Mapping`) The base document.
+        self.base = base
+        #: (:class:`typing.Mapping`) The nested overridden values.
+        self.overrides = overrides
+        self._children = {}
+
+    def __getitem__(self, key: str):
+        try:
+            override = self.overrides[key]
+        except KeyError:
+            return self.base[key]
+        if not isinstance(override, collections.abc.Mapping):
+            return override
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        base = self.base.get(key)
+        if isinstance(base, collections.abc.Mapping):
+            override = Overlay(base, override)
+        # Nested overlays are cached, so their number is bounded by
+        # the overrides.
+        self._children[key] = override
+        return override
+
+    def __contains__(self, key) -> bool:
+        return key in self.overrides or key in self.base
+
+    def __iter__(self) -> typing.Iterator[str]:
+        yield from self.base
+        for key in self.overrides:
+            if key not in self.base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(
+            1 for key in self.overrides if key not in self.base
+        )
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}(<base>, {1!r})'.format(
+            type(self), self.overrides
+        )
+
+
+def _same(a, b) -> bool:
+    if a is b:
+        return True
+    elif isinstance(a, FrozenDict) and isinstance(b, FrozenDict):
+        # Hashes of frozen tables are cached, so different tables are
+        # usually told apart without comparing them.
+        try:
+            return hash(a) == hash(b) and a == b
+        except TypeError:
+            # Frozen tables containing arrays, e.g. interned ones.
+            return a == b
+    return False
+
+
+def diff(a: typing.Mapping[str, object],
+         b: typing.Mapping[str, object]) -> typing.List[str]:
+    """Find the dotted key paths of values which differ between two
+    documents.  Tables shared by both (e.g. unchanged tables of
+    :class:`Overlay` or :class:`~settei.tenants.Interner`) or equal frozen
+    tables are skipped without being traversed.
+
+    >>> diff({'a': {'b': 1, 'c': 2}, 'd': 3}, {'a': {'b': 1, 'c': 4}, 'e': 5})
+    ['a.c', 'd', 'e']
+
+    :param a: the old document
+    :type a: :class:`typing.Mapping`
+    :param b: the new document
+    :type b: :class:`typing.Mapping`
+    :return: the sorted paths of changed, added, and removed values.
+             if a table is added or removed, only its path is included
+    :rtype: :class:`typing.List`\\ [:class:`str`]
+
+    """
+    changes = []
+    stack = [('', a, b)]
+    while stack:
+        prefix, old, new = stack.pop()
+        for key in old:
+            path = prefix + str(key)
+            if key not in new:
+                changes.append(path)
+                continue
+            old_value = old[key]
+            new_value = new[key]
+            if _same(old_value, new_value):
+                continue
+            elif isinstance(old_value, collections.abc.Mapping) and \
+                    isinstance(new_value, collections.abc.Mapping):
+                stack.append((path + '.', old_value, new_value))
+            elif old_value != new_value:
+                changes.append(path)
+        changes.extend(prefix + str(key) for key in new if key not in old)
+    changes.sort()
+    return changes
+
+
+def share_unchanged(old: typing.Mapping[str, object],
+                    new: typing.Mapping[str, object]) -> typing.Mapping[
+    str, object
+]:
+    """Make a document equal to ``new`` which reuses every table, array,
+    and value of ``old`` equal to the one at the same path of ``new``.
+    It makes documents of consecutive versions share their unchanged
+    parts, so that keeping both costs only their difference, and
+    :func:`diff()` between them skips the shared parts.  Neither of them
+    is mutated.
+
+    >>> old = {'a': {'b': 1}, 'c': {'d': 2}}
+    >>> new = share_unchanged(old, {'a': {'b': 1}, 'c': {'d': 3}})
+    >>> new['a'] is old['a']
+    True
+    >>> new
+    {'a': {'b': 1}, 'c': {'d': 3}}
+
+    :param old: the old document
+    :type old: :class:`typing.Mapping`
+    :param new: the new document
+    :type new: :class:`typing.Mapping`
+    :return: the document equal to ``new``.  it's ``old`` itself
+             if they're equal
+    :rtype: :class:`typing.Mapping`
+
+    """
+    return _share(old, new)
+
+
+def _share(old, new):
+    if old is new:
+        return old
+    elif isinstance(old, Source) or isinstance(new, Source):
+        # Sources are lazy views which can change; they're not shared.
+        return new
+    elif isinstance(old, collections.abc.Mapping) and \
+            isinstance(new, collections.abc.Mapping):
+        table = {}
+        reused = replaced = False
+        for key, value in new.items():
+            if key in old:
+                shared = _share(old[key], value)
+                if shared is old[key]:
+                    reused = True
+                else:
+                    replaced = True
+                table[key] = shared
+            else:
+                replaced = True
+                table[key] = value
+        if not reused:
+            return new
+        elif not replaced and len(old) == len(new) and \
+                type(old) is type(new):
+            return old
+        return FrozenDict(table) if isinstance(new, FrozenDict) else table
+    elif type(old) is type(new) and old == new:
+        return old
+    return new
+
+
+def _encode(data: bytes) -> bytes:
+    # Length-prefixed, so that concatenated parts are never ambiguous.
+    return str(len(data)).encode() + b':' + data
+
+
+def _encode_offset(value) -> str:
+    offset = value.utcoffset()
+    return '' if offset is None else '{0:+d}'.format(
+        offset // datetime.timedelta(microseconds=1)
+    )
+
+
+def _encode_scalar(value) -> bytes:
+    # Every scalar is encoded canonically rather than by repr(), which
+    # could contain memory addresses (e.g. tzinfo of offset datetimes).
+    if value is None:
+        return b'null'
+    elif isinstance(value, enum.Enum):
+        return 'enum:{0.__module__}.{0.__qualname__}.{1}'.format(
+            type(value), value.name
+        ).encode('utf-8')
+    elif isinstance(value, bool):
+        return b'bool:true' if value else b'bool:false'
+    elif isinstance(value, int):
+        return b'int:' + int.__repr__(value).encode()
+    elif isinstance(value, float):
+        return b'float:' + float.__repr__(value).encode()
+    elif isinstance(value, str):
+        return b'str:' + value.encode('utf-8', 'surrogatepass')
+    elif isinstance(value, (bytes, bytearray)):
+        return b'bytes:' + bytes(value)
+    elif isinstance(value, datetime.datetime):
+        return 'datetime:{0}{1}'.format(
+            value.replace(tzinfo=None).isoformat(), _encode_offset(value)
+        ).encode()
+    elif isinstance(value, datetime.date):
+        return 'date:{0}'.format(value.isoformat()).encode()
+    elif isinstance(value, datetime.time):
+        return 'time:{0}{1}'.format(
+            value.replace(tzinfo=None).isoformat(), _encode_offset(value)
+        ).encode()
+    raise TypeError(
+        'cannot compute a stable digest of {0!r}; only tables, arrays, sets, '
+        'strings, bytes, numbers, booleans, None, enums, and dates/times '
+        'are supported'.format(value)
+    )
+
+
+class DigestCache:
+    """Compute stable SHA-256 digests of documents.  Unlike :func:`hash()`,
+    digests are the same across processes and machines, so that they can
+    be compared over a fleet.
+
+    Digests of tables and arrays are cached by their identity, so that
+    when a document is replaced by one sharing unchanged tables (e.g.
+    :class:`Overlay`, :func:`merge_trees()`, or
+    :meth:`Configuration.reload() <settei.base.Configuration.reload>` with
+    tables of the old document) only the changed paths are rehashed.
+    Therefore documents must be replaced rather than mutated in place;
+    :func:`freeze()` guarantees it.
+
+    The cache holds only the tables reachable from the document given
+    last time, so it doesn't grow as documents are replaced.
+
+    Values are encoded canonically; e.g. dates and times by their ISO 8601
+    forms and UTC offsets.  Values of other types than TOML's ones,
+    :const:`None`, :class:`bytes`, sets, and :class:`enum.Enum` members
+    are refused with :exc:`TypeError`, since their :func:`repr()` may
+    differ across processes.
+
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def digest(self, value, *, prune: bool = True) -> str:
+        """Compute the hex digest of the given ``value``.
+
+        :param value: the document or the value to hash
+        :param prune: whether to drop cached digests of tables
+                      unreachable from ``value``.  :const:`False` to hash
+                      a subtree of the document given last time
+        :type prune: :class:`bool`
+        :return: the hex digest
+        :rtype: :class:`str`
+
+        """
+        with self._lock:
+            old = self._entries
+            entry = old.get(id(value))
+            if entry is not None and entry[0] is value:
+                return entry[1].decode()
+            new = {} if prune else old
+            result = self._digest(value, old, new)
+            self._entries = new
+        return result.decode() if isinstance(value, (
+            collections.abc.Mapping, list, tuple
+        )) else hashlib.sha256(result).hexdigest()
+
+    def _digest(self, value, old, new) -> bytes:
+        if isinstance(value, (collections.abc.Mapping, list, tuple)):
+            entry = old.get(id(value))
+            if entry is not None and entry[0] is value:
+                if new is not old:
+                    self._retain(entry, old, new)
+                return entry[1]
+            children = []
+            if isinstance(value, collections.abc.Mapping):
+                h = hashlib.sha256(b'table')
+                parts = []
+                for k, v in value.items():
+                    parts.append((str(k), self._digest(v, old, new)))
+                    children.append(v)
+                parts.sort()
+                for k, part in parts:
+                    h.update(_encode(k.encode('utf-8')))
+                    h.update(_encode(part))
+            else:
+                h = hashlib.sha256(b'array')
+                for v in value:
+                    h.update(_encode(self._digest(v, old, new)))
+                    children.append(v)
+            digest = h.hexdigest().encode()
+            new[id(value)] = value, digest, tuple(
+                id(c) for c in children
+                if isinstance(c, (collections.abc.Mapping, list, tuple))
+            )
+            return digest
+        elif isinstance(value, (set, frozenset)):
+            # Iteration order of sets differs across processes.
+            return b'set:' + b','.join(sorted(
+                _encode(self._digest(v, old, new)) for v in value
+            ))
+        return _encode_scalar(value)
+
+    def _retain(self, entry, old, new) -> None:
+        # Keep the digests of unchanged descendants as well, since they
+        # could be shared by a later document without their parent.
+        stack = [entry]
+        while stack:
+            entry = stack.pop()
+            value, _, children = entry
+            new[id(value)] = entry
+            for child in children:
+                if child not in new:
+                    stack.append(old[child])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}(<{1} tables>)'.format(
+            type(self), len(self._entries)
+        )
@@ -0,0 +1,160 @@
+""":mod:`settei.dotenv` --- Loading ``.env`` files without touching environ
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+``.env`` files are used to set environment variables for local development
+and CI.  Loading them into :data:`os.environ` makes them leak into
+subprocesses, and makes every environment scan slower.  Instead,
+:func:`load_dotenv()` makes a private mapping which can be given to
+:class:`~settei.base.Configuration` as its environment::
+
+    environ = load_dotenv('.env')
+    config = AppConfig.from_path(pathlib.Path('config.toml'),
+                                 environ=environ)
+
+The mapping is a :class:`~settei.environ.FrozenEnvironment`, so that
+configurations look up variables through its sorted index, and cache
+their nested readers.  It can be shared by many configuration instances.
+
+The following syntax is supported:
+
+.. code-block:: bash
+
+   # comments and blank lines are ignored
+   DATABASE__URL=postgresql://localhost/app
+   export WEB__DEBUG=true          # "export" prefix and inline comments
+   WEB__SECRET_KEY='single quoted values are taken literally'
+   WORKER__ON_LOADED="double quoted values can have escapes\\tlike this,
+   and span multiple lines"
+
+.. versionadded:: 0.7.4
+
+"""
+import io
+import pathlib
+import re
+import typing
+
+from .environ import FrozenEnvironment
+
+__all__ = 'DotEnvSyntaxError', 'iter_dotenv', 'load_dotenv'
+
+
+LINE_PATTERN = re.compile(r'''
+    ^ \s*
+    (?: export \s+ )?
+    (?P<key> [A-Za-z_][A-Za-z0-9_.]* )
+    \s* = \s*
+    (?P<value> .*? )
+    \s* $
+''', re.VERBOSE | re.DOTALL)
+
+ESCAPES = {
+    'n': '\n', 'r': '\r', 't': '\t', '"': '"', '\\': '\\', '$': '$',
+}
+
+
+class DotEnvSyntaxError(ValueError):
+    """An exception class rises when a ``.env`` file has an invalid line."""
+
+    def __init__(self, message: str, lineno: int) -> None:
+        super().__init__('line {0}: {1}'.format(lineno, message))
+        #: (:class:`int`) The line number where the error occurred.
+        self.lineno = lineno
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(0)),
+                  value, flags=re.DOTALL)
+
+
+def _find_closing_quote(value: str, quote: str) -> int:
+    i = 1
+    while True:
+        i = value.find(quote, i)
+        if i < 0 or quote == "'":
+            return i
+        backslashes = 0
+        while value[i - 1 - backslashes] == '\\':
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return i
+        i += 1
+
+
+def iter_dotenv(lines: typing.Iterable[str]) -> typing.Iterator[
+    typing.Tuple[str, str]
+]:
+    """Parse ``.env`` lines and yield pairs of keys and values.  It reads
+    ``lines`` lazily, so that it can stream a large file.
+
+    :param lines: the lines of a ``.env`` file, e.g., a file object
+    :type lines: :class:`typing.Iterable`\\ [:class:`str`]
+    :return: pairs of keys and values
+    :rtype: :class:`typing.Iterator`\\ [:class:`typing.Tuple`\\
+            [:class:`str`, :class:`str`]]
+    :raise DotEnvSyntaxError: when there's an invalid line
+
+    """
+    lines = iter(lines)
+    lineno = 0
+    for line in lines:
+        lineno += 1
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        match = LINE_PATTERN.match(line.rstrip('\r\n'))
+        if not match:
+            raise DotEnvSyntaxError('invalid line: ' + repr(line), lineno)
+        key, value = match.group('key', 'value')
+        if value[:1] in ('"', "'"):
+            quote = value[0]
+            start = lineno
+            end = _find_closing_quote(value, quote)
+            while end < 0:
+                try:
+                    next_line = next(lines)
+                except StopIteration:
+                    raise DotEnvSyntaxError(
+                        'unterminated quoted value of ' + key, start
+                    )
+                lineno += 1
+                value += '\n' + next_line.rstrip('\r\n')
+                end = _find_closing_quote(value, quote)
+            rest = value[end + 1:].strip()
+            if rest and not rest.startswith('#'):
+                raise DotEnvSyntaxError(
+                    'unexpected characters after the quoted value of ' + key,
+                    lineno
+                )
+            value = value[1:end]
+            if quote == '"':
+                value = _unescape(value)
+        else:
+            comment = re.search(r'(?:^|\s)#', value)
+            if comment:
+                value = value[:comment.start()].rstrip()
+        yield key, value
+
+
+def load_dotenv(
+    file: typing.Union[str, pathlib.Path, io.TextIOBase],
+    encoding: str = 'utf-8'
+) -> FrozenEnvironment:
+    """Load a ``.env`` file into a new mapping.  Unlike other ``.env``
+    loaders, it doesn't touch :data:`os.environ` at all.  When a key appears
+    more than once, the last one wins.
+
+    :param file: the path or file object of a ``.env`` file
+    :type file: :class:`pathlib.Path`, :class:`io.TextIOBase`
+    :param encoding: the encoding of the file.  ``'utf-8'`` by default.
+                     ignored if ``file`` is a file object
+    :type encoding: :class:`str`
+    :return: the immutable mapping of environment variables
+    :rtype: :class:`~settei.environ.FrozenEnvironment`
+    :raise DotEnvSyntaxError: when there's an invalid line
+
+    """
+    if isinstance(file, (str, pathlib.Path)):
+        with open(str(file), encoding=encoding) as f:
+            return FrozenEnvironment(dict(iter_dotenv(f)))
+    return FrozenEnvironment(dict(iter_dotenv(file)))
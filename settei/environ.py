@@ -0,0 +1,210 @@
+""":mod:`settei.environ` --- Environment variable sources
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:class:`~settei.base.Configuration` looks up environment variables through
+an :class:`Environment`, which is given as ``environ`` option when it's
+instantiated.  :class:`LiveEnvironment` over :data:`os.environ` is used by
+default.
+
+:class:`FrozenEnvironment` is a copy taken at a moment, e.g., at startup.
+Configurations using it never rescan the process environment, and
+they are isolated from later changes of :data:`os.environ`::
+
+    environ = FrozenEnvironment()  # a snapshot of os.environ
+    config = AppConfig.from_path(path, environ=environ)
+
+.. versionadded:: 0.7.4
+
+"""
+import bisect
+import collections.abc
+import os
+import typing
+
+__all__ = ('Environment', 'FrozenEnvironment', 'LiveEnvironment',
+           'PrefixedEnvironment', 'as_environment')
+
+
+class Environment(collections.abc.Mapping):
+    """The interface of environment variable sources.  In addition to
+    :class:`~collections.abc.Mapping` protocol, subclasses can override
+    :meth:`keys_with_prefix()` to look up keys efficiently.
+
+    """
+
+    def keys_with_prefix(self, prefix: str) -> typing.Sequence[str]:
+        """Find the variable names starting with the given ``prefix``.
+        The default implementation scans every variable.
+
+        :param prefix: the prefix of the variable names to find
+        :type prefix: :class:`str`
+        :return: the variable names
+        :rtype: :class:`typing.Sequence`\\ [:class:`str`]
+
+        """
+        return [k for k in self if k.startswith(prefix)]
+
+    def snapshot(self) -> 'FrozenEnvironment':
+        """Take a frozen copy of the current variables.
+
+        :return: the frozen copy
+        :rtype: :class:`FrozenEnvironment`
+
+        """
+        return FrozenEnvironment(self)
+
+    def with_prefix(self, prefix: str) -> 'FrozenEnvironment':
+        """Take a frozen copy of only the variables starting with
+        the given ``prefix``, and strip the prefix from their names.
+        Lookups on the result cost proportionally to the number of
+        the prefixed variables, not the whole environment.
+
+        :param prefix: the prefix of the variable names, e.g. ``'MYAPP__'``
+        :type prefix: :class:`str`
+        :return: the frozen copy without the prefix
+        :rtype: :class:`FrozenEnvironment`
+
+        """
+        start = len(prefix)
+        return FrozenEnvironment({
+            k[start:]: self[k] for k in self.keys_with_prefix(prefix)
+        })
+
+
+class LiveEnvironment(Environment):
+    """Look up the given mapping, :data:`os.environ` by default, every time.
+    It reflects changes of the mapping, but every prefix lookup scans the
+    whole mapping.
+
+    :param environ: the mapping of environment variables.
+                    :data:`os.environ` by default
+    :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+
+    """
+
+    def __init__(
+        self, environ: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> None:
+        self.environ = os.environ if environ is None else environ
+
+    def __getitem__(self, key: str) -> str:
+        return self.environ[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.environ
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.environ)
+
+    def __len__(self) -> int:
+        return len(self.environ)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1})'.format(
+            type(self), 'os.environ' if self.environ is os.environ
+            else '<{0} variables>'.format(len(self.environ))
+        )
+
+
+class FrozenEnvironment(Environment):
+    """An immutable copy of environment variables.  Variable names are
+    indexed in sorted order, so that :meth:`keys_with_prefix()` takes
+    :math:`O(\\log n + k)` time instead of scanning every variable.
+
+    :param environ: the mapping of environment variables to copy.
+                    :data:`os.environ` by default
+    :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+
+    """
+
+    def __init__(
+        self, environ: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> None:
+        self._variables = dict(os.environ if environ is None else environ)
+        self._keys = sorted(self._variables)
+
+    def __getitem__(self, key: str) -> str:
+        return self._variables[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._variables
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys_with_prefix(self, prefix: str) -> typing.Sequence[str]:
+        keys = self._keys
+        start = bisect.bisect_left(keys, prefix)
+        # Every key starting with prefix is less than prefix + U+10FFFF.
+        end = bisect.bisect_left(keys, prefix + '\U0010ffff', start)
+        return keys[start:end]
+
+    def snapshot(self) -> 'FrozenEnvironment':
+        return self
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}(<{1} variables>)'.format(
+            type(self), len(self._keys)
+        )
+
+
+class PrefixedEnvironment(Environment):
+    """A live view of the variables starting with the given ``prefix`` in
+    the ``environ``, without the prefix.  Unlike
+    :meth:`Environment.with_prefix()` it makes no copy, so that it can be
+    made in :math:`O(1)`.  It's used by :class:`~settei.base.Section`.
+
+    :param environ: the environment to look up
+    :type environ: :class:`Environment`
+    :param prefix: the prefix of the variable names, e.g. ``'DATABASE__'``
+    :type prefix: :class:`str`
+
+    """
+
+    def __init__(self, environ: Environment, prefix: str) -> None:
+        self.environ = environ
+        self.prefix = prefix
+
+    def __getitem__(self, key: str) -> str:
+        return self.environ[self.prefix + key]
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.prefix + key in self.environ
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.keys_with_prefix(''))
+
+    def __len__(self) -> int:
+        return len(self.environ.keys_with_prefix(self.prefix))
+
+    def keys_with_prefix(self, prefix: str) -> typing.Sequence[str]:
+        start = len(self.prefix)
+        return [
+            k[start:]
+            for k in self.environ.keys_with_prefix(self.prefix + prefix)
+        ]
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r}, {2!r})'.format(
+            type(self), self.environ, self.prefix
+        )
+
+
+def as_environment(
+    environ: typing.Optional[typing.Mapping[str, str]]
+) -> Environment:
+    """Normalize the given mapping to an :class:`Environment`.
+
+    :param environ: the mapping of environment variables.  if it's
+                    :const:`None` :data:`os.environ` is used
+    :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+    :return: the normalized environment
+    :rtype: :class:`Environment`
+
+    """
+    if isinstance(environ, Environment):
+        return environ
+    return LiveEnvironment(environ)
@@ -0,0 +1,149 @@
+""":mod:`settei.files` --- Lazy references to files
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+TLS certificates, private keys, and large blobs are usually kept out of
+configuration files.  :class:`~settei.base.config_property` declared with
+``file_ref=True`` accepts values like ``"file:/etc/tls/server.key"``
+instead of the content itself, and reads the referred file through
+:class:`FileReference`.
+
+.. versionadded:: 0.7.4
+
+"""
+import mmap
+import pathlib
+import threading
+import typing
+
+__all__ = 'FileReference',
+
+
+class FileReference:
+    """A lazy reference to a file.  The file is read on the first access,
+    and cached until it changes on disk (its inode, modification time,
+    or size changes).  Files larger than ``mmap_threshold`` are memory-mapped
+    instead of being read into memory, so that :meth:`as_memoryview()` doesn't
+    make any copy.
+
+    .. note::
+
+       Memory-mapped files should be replaced atomically (e.g. writing
+       a new file and renaming it) rather than being overwritten in place,
+       since truncating a memory-mapped file makes reading it crash.
+
+    :param path: the file path
+    :type path: :class:`pathlib.Path`
+    :param mmap_threshold: the minimum size in bytes of files to be
+                           memory-mapped.  1 MiB by default
+    :type mmap_threshold: :class:`int`
+
+    """
+
+    def __init__(self, path: typing.Union[str, pathlib.Path], *,
+                 mmap_threshold: int = 1024 * 1024) -> None:
+        self.path = pathlib.Path(path)
+        self.mmap_threshold = mmap_threshold
+        self._lock = threading.Lock()
+        self._signature = None
+        self._buffer = None
+        self._converted = {}
+
+    def _load(self) -> typing.Union[bytes, mmap.mmap]:
+        stat = self.path.stat()
+        signature = stat.st_ino, stat.st_mtime_ns, stat.st_size
+        if signature == self._signature:
+            return self._buffer
+        with self._lock:
+            if signature == self._signature:
+                return self._buffer
+            with self.path.open('rb') as f:
+                if stat.st_size >= self.mmap_threshold and stat.st_size:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    buffer = f.read()
+            # The previous mmap is not closed explicitly, since memoryviews
+            # returned before may still refer to it.
+            self._buffer = buffer
+            self._converted = {}
+            self._signature = signature
+            return buffer
+
+    @property
+    def mmapped(self) -> bool:
+        """(:class:`bool`) Whether the file is memory-mapped."""
+        return isinstance(self._load(), mmap.mmap)
+
+    def as_memoryview(self) -> memoryview:
+        """Get the content as a read-only :class:`memoryview` without
+        copying it.
+
+        :return: the content of the file
+        :rtype: :class:`memoryview`
+
+        """
+        return memoryview(self._load())
+
+    def as_bytes(self) -> bytes:
+        """Get the content as :class:`bytes`.  Memory-mapped files are
+        copied once and cached.
+
+        :return: the content of the file
+        :rtype: :class:`bytes`
+
+        """
+        buffer = self._load()
+        if isinstance(buffer, bytes):
+            return buffer
+        converted = self._converted
+        try:
+            return converted[bytes]
+        except KeyError:
+            result = converted[bytes] = buffer[:]
+            return result
+
+    def as_text(self, encoding: str = 'utf-8') -> str:
+        """Get the content as decoded :class:`str`.  The decoded string is
+        cached as well.
+
+        :param encoding: the encoding of the file.  ``'utf-8'`` by default
+        :type encoding: :class:`str`
+        :return: the content of the file
+        :rtype: :class:`str`
+
+        """
+        buffer = self._load()
+        converted = self._converted
+        try:
+            return converted[encoding]
+        except KeyError:
+            result = converted[encoding] = str(buffer, encoding)
+            return result
+
+    def load(self, cls: type, encoding: str = 'utf-8') -> typing.Union[
+        bytes, str, memoryview
+    ]:
+        """Get the content in the form of the given ``cls``.  If ``cls`` is
+        :class:`memoryview` or :class:`bytes` (or their
+        :class:`~typing.Union`) it returns the same type, otherwise decoded
+        :class:`str`.
+
+        :param cls: the type to load as
+        :type cls: :class:`type`
+        :param encoding: the encoding used for decoding to :class:`str`.
+                         ``'utf-8'`` by default
+        :type encoding: :class:`str`
+        :return: the content of the file
+
+        """
+        from .base import get_union_types
+        types = get_union_types(cls) or (cls,)
+        if memoryview in types:
+            return self.as_memoryview()
+        elif bytes in types:
+            return self.as_bytes()
+        return self.as_text(encoding)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r})'.format(
+            type(self), str(self.path)
+        )
@@ -4,14 +4,21 @@
 .. versionadded:: 0.5.6
 
 """
+import array
 import collections
-import os
+import enum
+import functools
 import typing
 import uuid
 
-from typeguard import typechecked
+from .document import FrozenDict
+from .environ import FrozenEnvironment, PrefixedEnvironment, as_environment
+from .sources import Source
+from .validation import check_argument_type, typechecked
 
-__all__ = 'EnvReader', 'parse_bool', 'parse_float', 'parse_int', 'parse_uuid'
+__all__ = ('PARSERS', 'EnvReader', 'derive_parser', 'parse_bool',
+           'parse_csv', 'parse_float', 'parse_int', 'parse_json', 'parse_list',
+           'parse_mapping', 'parse_uuid')
 
 
 @typechecked
@@ -81,17 +88,401 @@ def parse_uuid(v: str) -> uuid.UUID:
     return uuid.UUID(v)
 
 
+def _compile_item_parser(parse_item) -> typing.Tuple[
+    typing.Optional[typing.Callable[[str], typing.Any]], bool
+]:
+    # Return the item parser and whether it needs items to be stripped.
+    # Builtin int() and float() strip whitespaces by themselves, and they
+    # parse items in C when they are mapped over a list.
+    if parse_item is None:
+        return None, True
+    check_argument_type('parse_item', parse_item, callable)
+    if parse_item in (int, parse_int):
+        return int, False
+    elif parse_item in (float, parse_float):
+        return float, False
+    elif parse_item in (parse_bool, parse_uuid):
+        # Items are always strings; skip runtime type checks.
+        return _unwrap(parse_item), True
+    elif isinstance(parse_item, type):
+        return PARSERS.get(parse_item, parse_item), True
+    return parse_item, True
+
+
+def _compile_container(container: type, typecode: typing.Optional[str]):
+    if typecode is not None:
+        array.array(typecode)  # raise ValueError early on a bad typecode
+        return functools.partial(array.array, typecode)
+    elif container not in (list, tuple):
+        raise TypeError('container must be list or tuple, not ' +
+                        repr(container))
+    return container
+
+
+def _compile_sequence_parser(split, parse_item, container, typecode):
+    parse, strip = _compile_item_parser(parse_item)
+    make = _compile_container(container, typecode)
+
+    def parse_sequence(v: typing.Union[str, typing.Iterable[str]]):
+        items = split(v) if isinstance(v, str) else v
+        if strip:
+            items = [item.strip() for item in items]
+        return make(items if parse is None else map(parse, items))
+    return parse_sequence
+
+
+def parse_list(parse_item: typing.Optional[
+    typing.Callable[[str], typing.Any]
+] = None, *, separator: str = ',', container: type = list,
+        typecode: typing.Optional[str] = None) -> typing.Callable[
+    [typing.Union[str, typing.Iterable[str]]], typing.Sequence
+]:
+    """Make a parser of lists.  The parser takes a string separated by
+    ``separator`` (e.g. ``WEB__PORTS=80,443``) or a list made from
+    ``SETTEIENVLIST`` variables, and parses each item by ``parse_item``::
+
+        ports = config_property('web.ports', typing.Sequence[int],
+                                parse_env=parse_list(parse_int))
+
+    The parser is compiled once.  :func:`parse_int`, :func:`parse_float`,
+    :class:`int`, and :class:`float` items take a fast path which parses
+    a whole list at once, and they can be packed into an
+    :class:`array.array` through ``typecode``::
+
+        parse_list(parse_int, typecode='l')  # array('l', [80, 443])
+
+    :param parse_item: optional function to parse each item.
+                       items are left as strings if omitted
+    :type parse_item: :class:`collections.abc.Callable`
+    :param separator: keyword only argument.  the separator of items.
+                      ``','`` by default
+    :type separator: :class:`str`
+    :param container: keyword only argument.  :class:`list` (default) or
+                      :class:`tuple`
+    :type container: :class:`type`
+    :param typecode: keyword only argument.  the :mod:`array` typecode to
+                     pack items into an :class:`array.array` instead of
+                     ``container``
+    :type typecode: :class:`str`
+    :return: the parser
+    :rtype: :class:`collections.abc.Callable`
+
+    .. versionadded:: 0.7.4
+
+    """
+    def split(v: str) -> typing.List[str]:
+        return v.split(separator) if v.strip() else []
+    return _compile_sequence_parser(split, parse_item, container, typecode)
+
+
+def parse_csv(parse_item: typing.Optional[
+    typing.Callable[[str], typing.Any]
+] = None, *, delimiter: str = ',', container: type = list,
+        typecode: typing.Optional[str] = None) -> typing.Callable[
+    [typing.Union[str, typing.Iterable[str]]], typing.Sequence
+]:
+    """Similar to :func:`parse_list()` except it takes a CSV row, so that
+    items can be quoted to contain delimiters, e.g.
+    ``"a, b",c`` becomes ``['a, b', 'c']``.
+
+    :param parse_item: optional function to parse each item.
+                       items are left as strings if omitted
+    :type parse_item: :class:`collections.abc.Callable`
+    :param delimiter: keyword only argument.  the delimiter of items.
+                      ``','`` by default
+    :type delimiter: :class:`str`
+    :param container: keyword only argument.  :class:`list` (default) or
+                      :class:`tuple`
+    :type container: :class:`type`
+    :param typecode: keyword only argument.  the :mod:`array` typecode to
+                     pack items into an :class:`array.array` instead of
+                     ``container``
+    :type typecode: :class:`str`
+    :return: the parser
+    :rtype: :class:`collections.abc.Callable`
+
+    .. versionadded:: 0.7.4
+
+    """
+    import csv
+
+    def split(v: str) -> typing.List[str]:
+        return next(csv.reader([v], delimiter=delimiter), [])
+    return _compile_sequence_parser(split, parse_item, container, typecode)
+
+
+def parse_mapping(parse_key: typing.Optional[
+    typing.Callable[[str], typing.Any]
+] = None, parse_value: typing.Optional[
+    typing.Callable[[str], typing.Any]
+] = None, *, separator: str = ',', key_separator: str = '=') -> \
+        typing.Callable[[typing.Union[str, typing.Mapping[str, str]]],
+                        typing.Mapping]:
+    """Make a parser of mappings.  The parser takes a string like
+    ``a=1,b=2`` or a mapping made from nested variables
+    (e.g. ``WEIGHTS__A=1`` and ``WEIGHTS__B=2``), and parses each key and
+    value by ``parse_key`` and ``parse_value``::
+
+        weights = config_property(
+            'weights', typing.Mapping[str, float],
+            parse_env=parse_mapping(parse_value=parse_float)
+        )
+
+    :param parse_key: optional function to parse each key
+    :type parse_key: :class:`collections.abc.Callable`
+    :param parse_value: optional function to parse each value
+    :type parse_value: :class:`collections.abc.Callable`
+    :param separator: keyword only argument.  the separator of items.
+                      ``','`` by default
+    :type separator: :class:`str`
+    :param key_separator: keyword only argument.  the separator between
+                          keys and values.  ``'='`` by default
+    :type key_separator: :class:`str`
+    :return: the parser
+    :rtype: :class:`collections.abc.Callable`
+    :raise ValueError: when an item lacks ``key_separator``
+
+    .. versionadded:: 0.7.4
+
+    """
+    key, _ = _compile_item_parser(parse_key)
+    value, _ = _compile_item_parser(parse_value)
+
+    def split(v: str) -> typing.Iterator[typing.Tuple[str, str]]:
+        for item in v.split(separator):
+            if not item.strip():
+                continue
+            k, sep, v = item.partition(key_separator)
+            if not sep:
+                raise ValueError(
+                    '{0!r} lacks {1!r}'.format(item, key_separator)
+                )
+            yield k.strip(), v.strip()
+
+    def parse_mapping(v: typing.Union[str, typing.Mapping[str, str]]):
+        items = split(v) if isinstance(v, str) else v.items()
+        return {
+            k if key is None else key(k): v if value is None else value(v)
+            for k, v in items
+        }
+    return parse_mapping
+
+
+def parse_json(type_=None) -> typing.Callable[[str], typing.Any]:
+    """Make a parser of JSON values, e.g.
+    ``WEB__WEIGHTS='{"a": 1.0, "b": 2.0}'``.  If ``type_`` is given, parsed
+    values are validated by :func:`~settei.validation.compile_validator()`.
+
+    :param type_: optional type to validate parsed values
+    :return: the parser
+    :rtype: :class:`collections.abc.Callable`
+    :raise ValueError: when the value is not a valid JSON or not of
+                       the ``type_``
+
+    .. versionadded:: 0.7.4
+
+    """
+    import json
+    from .validation import compile_validator
+    validator = None if type_ is None else compile_validator(type_)
+
+    def parse_json(v: str):
+        result = json.loads(v)
+        if validator is not None and not validator(result):
+            raise ValueError('{0!r} is not {1}'.format(
+                result, typing._type_repr(type_)
+            ))
+        return result
+    return parse_json
+
+
+def _unwrap(parser: typing.Callable[[str], object]) -> typing.Callable[
+    [str], object
+]:
+    # Parsers are plain functions unless the validation mode is strict.
+    return getattr(parser, '__wrapped__', parser)
+
+
+#: (:class:`typing.Mapping`\\ [:class:`type`,
+#: :class:`collections.abc.Callable`]) The dispatch table of
+#: :func:`derive_parser()` for scalar types.  Parsers are unwrapped from
+#: runtime type checks since their arguments are always strings.
+#:
+#: .. versionadded:: 0.7.4
+PARSERS = {
+    bool: _unwrap(parse_bool),
+    float: _unwrap(parse_float),
+    int: _unwrap(parse_int),
+    uuid.UUID: _unwrap(parse_uuid),
+}
+
+
+def _derive_enum_parser(cls: typing.Type[enum.Enum]):
+    members = {str(member.value): member for member in cls}
+
+    def parse_enum(v: str) -> enum.Enum:
+        try:
+            return members[v]
+        except KeyError:
+            return cls[v]  # by its name
+    return parse_enum
+
+
+def _derive_union_parser(types: typing.Sequence[type]):
+    parsers = [derive_parser(t) for t in types if t is not type(None)]
+    # If a member type takes strings as they are (e.g. str) failures are
+    # not errors.
+    fallback = not all(parsers)
+    parsers = [p for p in parsers if p is not None]
+    if not parsers:
+        return None
+
+    def parse_union(v: str):
+        error = None
+        for parser in parsers:
+            try:
+                return parser(v)
+            except (KeyError, ValueError) as e:
+                error = e
+        if fallback:
+            return v
+        raise error
+    return parse_union
+
+
+def _derive_collection_parser(origin: type, element_type):
+    parse_element = derive_parser(element_type)
+    if parse_element is None:
+        return None
+    container = origin if origin in (list, tuple, set, frozenset) else None
+
+    def parse_collection(v):
+        if isinstance(v, str):
+            return v  # not a list made from environment variables
+        return (container or type(v))(map(parse_element, v))
+    return parse_collection
+
+
+def derive_parser(type_) -> typing.Optional[
+    typing.Callable[[typing.Any], typing.Any]
+]:
+    """Derive a parser of environment variables from the given ``type_``.
+    :class:`~settei.base.config_property` uses it when ``parse_env`` is
+    omitted.  The following types are supported:
+
+    - scalar types in :data:`PARSERS`: :class:`bool`, :class:`float`,
+      :class:`int`, and :class:`uuid.UUID`
+    - :class:`enum.Enum` types, by their values or names
+    - :data:`typing.Optional` and :data:`typing.Union` of the above.
+      parsers of the members are tried in order
+    - collections of the above, e.g. ``typing.List[int]``, made from
+      ``SETTEIENVLIST`` or ``ASTERISK`` variables
+
+    :param type_: the type to parse to
+    :return: the parser, or :const:`None` if ``type_`` needs no parsing
+    :rtype: :class:`collections.abc.Callable`
+
+    .. versionadded:: 0.7.4
+
+    """
+    from .base import get_union_types
+    from .validation import _get_origin_and_args
+    try:
+        return PARSERS[type_]
+    except (KeyError, TypeError):
+        pass
+    if isinstance(type_, type) and \
+            getattr(type_, '__origin__', None) is None:
+        if issubclass(type_, enum.Enum):
+            return _derive_enum_parser(type_)
+        return None
+    union_types = get_union_types(type_)
+    if union_types is not None:
+        return _derive_union_parser(union_types)
+    origin, args = _get_origin_and_args(type_)
+    if isinstance(origin, type) and args and \
+            issubclass(origin, collections.abc.Iterable) and \
+            not issubclass(origin, (str, bytes, collections.abc.Mapping)):
+        if issubclass(origin, tuple) and \
+                not (len(args) == 2 and args[1] is Ellipsis):
+            return None  # fixed-length tuples
+        return _derive_collection_parser(origin, args[0])
+    return None
+
+
 class EnvReader(collections.abc.Mapping):
+    """Read-only mapping which looks up environment variables for keys
+    missing in ``conf``.
+
+    :param conf: the configuration mapping
+    :type conf: :class:`typing.Mapping`
+    :param froms: the prefix of environment variable names to look up
+    :type froms: :class:`str`
+    :param environ: keyword only argument.  the mapping of environment
+                    variables to look up.  :data:`os.environ` by default.
+                    plain mappings are wrapped by
+                    :class:`~settei.environ.LiveEnvironment`.
+                    see also :mod:`settei.environ` and
+                    :func:`settei.dotenv.load_dotenv()`
+    :type environ: :class:`~settei.environ.Environment`,
+                   :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+
+    If ``environ`` is a :class:`~settei.environ.FrozenEnvironment`, child
+    readers of nested keys are cached, so that deep lookups like
+    ``reader['a']['b']['c']`` don't scan variables again.
+
+    .. versionadded:: 0.7.4
+
+       Added ``environ`` parameter.
+
+    """
+
     DELIMITER = '__'
     ASTERISK_CHAR = 'ASTERISK'
     LIST_CHAR = 'SETTEIENVLIST'
 
+    #: (:class:`str`) The optional prefix of environment variable names,
+    #: e.g. ``'MYAPP'``.  If it's set only variables starting with the prefix
+    #: and :attr:`DELIMITER` (e.g. ``MYAPP__DATABASE__URL``) are considered,
+    #: and they are looked up without the prefix (e.g. ``database.url``).
+    #:
+    #: If ``environ`` is a :class:`~settei.environ.FrozenEnvironment`,
+    #: the prefixed variables are copied and indexed once when it's
+    #: instantiated, so that lookups cost proportionally to the number of
+    #: them, not the whole environment.  Otherwise variables are looked up
+    #: through a live :class:`~settei.environ.PrefixedEnvironment` view,
+    #: so that later changes of the environment are reflected as they are
+    #: without the prefix.
+    #:
+    #: .. versionadded:: 0.7.4
+    env_prefix = None
+
     def __init__(
         self, conf: typing.Mapping[str, object] = {},
-        froms: typing.Optional[str] = None, **kwargs
+        froms: typing.Optional[str] = None, *,
+        environ: typing.Optional[typing.Mapping[str, str]] = None, **kwargs
     ):
-        self.conf = dict(conf, **kwargs)
+        if isinstance(conf, (Source, FrozenDict)) and not kwargs:
+            # Sources are live views, and frozen documents never change,
+            # so they should not be copied.
+            self.conf = conf
+        else:
+            self.conf = dict(conf, **kwargs)
         self.froms = froms
+        environ = as_environment(environ)
+        if self.env_prefix:
+            prefix = self.env_prefix.upper()
+            if not prefix.endswith(self.DELIMITER):
+                prefix += self.DELIMITER
+            if isinstance(environ, FrozenEnvironment):
+                environ = environ.with_prefix(prefix)
+            else:
+                environ = PrefixedEnvironment(environ, prefix)
+        #: (:class:`~settei.environ.Environment`) The environment variables
+        #: to look up.  If :attr:`env_prefix` is set, it contains only
+        #: the prefixed variables without the prefix.
+        self.environ = environ
+        self._children = {}
 
     def __iter__(self):
         return self.conf.__iter__()
@@ -107,71 +498,104 @@ class EnvReader(collections.abc.Mapping):
             os_key = upper_key = key.upper()
             if self.froms is not None:
                 os_key = self.DELIMITER.join([self.froms, upper_key])
-            if os_key in os.environ:
-                result = os.environ[os_key]
+            environ = self.environ
+            if os_key in environ:
+                result = environ[os_key]
             else:
+                try:
+                    return self._children[os_key]
+                except KeyError:
+                    pass
                 lookup_key = '{}{}'.format(os_key, self.DELIMITER)
-                env_keys = [
-                    k
-                    for k in os.environ
-                    if k.startswith(lookup_key)
-                ]
-                if env_keys and any(
-                    len(key.split(self.DELIMITER)) >= 2
-                    for key in env_keys
-                ):
-                    results = self._transform_asterisk_and_list(
-                        upper_key, env_keys
-                    )
-                    if not results:
-                        return EnvReader(froms=os_key)
-                    return results
+                if environ.keys_with_prefix(lookup_key):
+                    results = self._assemble_sequence(lookup_key)
+                    if results:
+                        return results
+                    child = EnvReader(froms=os_key, environ=environ)
+                    if isinstance(environ, FrozenEnvironment):
+                        # Frozen environments never change, so child
+                        # readers can be shared by later lookups.
+                        self._children[os_key] = child
+                    return child
         if not result:
             raise KeyError(key)
         return result
 
-    def _transform_asterisk_and_list(
-        self, upper_key: str, env_keys: typing.List[str],
+    def _assemble_sequence(
+        self, lookup_key: str
+    ) -> typing.Union[None, typing.List, typing.Tuple]:
+        # Only variables right under the key can make a list or a tuple;
+        # deeper ones belong to child readers.  Lists take precedence over
+        # tuples.
+        for marker in (self.LIST_CHAR, self.ASTERISK_CHAR):
+            prefix = lookup_key + marker + self.DELIMITER
+            env_keys = self.environ.keys_with_prefix(prefix)
+            if env_keys:
+                start = len(prefix)
+                entries = [
+                    (env_key, env_key[start:].split(self.DELIMITER))
+                    for env_key in env_keys
+                ]
+                return self._build_sequence(marker, entries, 0)
+        return None
+
+    def _build_sequence(
+        self, marker: str,
+        entries: typing.Sequence[typing.Tuple[str, typing.List[str]]],
+        depth: int,
     ) -> typing.Union[typing.List, typing.Tuple]:
-        list_results = []
-        asterisk_results = []
-        for env_key in env_keys:
-            keys = env_key.split(self.DELIMITER)
-            key_index = keys.index(upper_key)
-
-            result = self._value_from_env(keys[key_index:], env_key, True)
-            if keys[key_index + 1] == self.LIST_CHAR:
-                list_results.append((keys[key_index + 2], result))
-            elif keys[key_index + 1] == self.ASTERISK_CHAR:
-                asterisk_results.append((keys[key_index + 2], result))
-        return self._convert_sorted_results(list_results) or \
-            tuple(self._convert_sorted_results(asterisk_results))
-
-    def _convert_sorted_results(
-        self, results: typing.List[typing.Tuple[int, typing.Any]],
-    ) -> typing.List[typing.Any]:
-        return [r[1] for r in sorted(results, key=lambda x: x[0])]
-
-    def _value_from_env(
-        self, keys: typing.List[str], env_key: str, unpacked: bool = False,
-    ) -> typing.Union[str, typing.List, typing.Tuple]:
-        asterisk_indexes = [
-            i for i, key in enumerate(keys)
-            if key == self.ASTERISK_CHAR
-        ]
-        list_indexes = [
-            i for i, key in enumerate(keys)
-            if key == self.LIST_CHAR
-        ]
-        if not (asterisk_indexes or list_indexes):
-            return os.environ[env_key]
-
-        result = self._value_from_env(keys[1:], env_key)
-        if not unpacked and keys[1] == self.ASTERISK_CHAR:
-            return (result,)
-        elif not unpacked and keys[1] == self.LIST_CHAR:
-            return [result]
-        return result
+        # Group variables by their index at the depth in a single pass.
+        groups = {}
+        for env_key, parts in entries:
+            index = parts[depth]
+            if not index.isdecimal():
+                raise ValueError(
+                    'invalid index {0!r} in the environment variable {1}; '
+                    'it must be a non-negative integer'.format(index, env_key)
+                )
+            groups.setdefault(int(index), []).append((env_key, parts))
+        size = len(groups)
+        if max(groups) < size:
+            # Indices are dense (0 to n - 1), so they can be placed without
+            # sorting.
+            indices = range(size)
+        else:
+            indices = sorted(groups)
+        items = [self._build_item(groups[i], depth + 1) for i in indices]
+        return items if marker == self.LIST_CHAR else tuple(items)
+
+    def _build_item(
+        self, entries: typing.Sequence[typing.Tuple[str, typing.List[str]]],
+        depth: int,
+    ) -> typing.Any:
+        leaves = [env_key for env_key, parts in entries if len(parts) == depth]
+        if leaves:
+            if len(entries) > 1:
+                raise ValueError(
+                    'duplicate or conflicting environment variables for '
+                    'the same index: {0}'.format(
+                        ', '.join(sorted(k for k, _ in entries))
+                    )
+                )
+            return self.environ[leaves[0]]
+        heads = {parts[depth] for _, parts in entries}
+        markers = heads & {self.LIST_CHAR, self.ASTERISK_CHAR}
+        if markers:
+            if len(heads) > 1:
+                raise ValueError(
+                    'conflicting environment variables for the same index: '
+                    '{0}'.format(', '.join(sorted(k for k, _ in entries)))
+                )
+            return self._build_sequence(markers.pop(), entries, depth + 1)
+        groups = {}
+        for env_key, parts in entries:
+            groups.setdefault(parts[depth].lower(), []).append(
+                (env_key, parts)
+            )
+        return {
+            key: self._build_item(group, depth + 1)
+            for key, group in groups.items()
+        }
 
     def __repr__(self) -> str:
         return '{0.__module__}.{0.__qualname__}({1!r})'.format(
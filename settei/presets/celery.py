@@ -8,14 +8,9 @@ import re
 import typing
 import warnings
 
-from celery import Celery
-from celery.schedules import crontab
-from celery.utils.imports import symbol_by_name
-from kombu.utils import cached_property
-from typeguard import typechecked
-
 from ..base import ConfigWarning, config_property
-from ..utils import import_hook
+from ..utils import cached_property, import_hook
+from ..validation import ValidationMode, get_validation_mode
 from .logging import LoggingConfiguration
 
 __all__ = 'SCHEDULE_EXPR_PATTERN', 'WorkerConfiguration',
@@ -111,6 +106,8 @@ class WorkerConfiguration(LoggingConfiguration):
         .. versionadded:: 0.2.2
 
         """
+        from celery.schedules import crontab
+        from celery.utils.imports import symbol_by_name
         raw_config = self.get('worker', {})
         try:
             table = raw_config['celerybeat_schedule']
@@ -182,8 +179,7 @@ class WorkerConfiguration(LoggingConfiguration):
         )
         return celery_config
 
-    @typechecked
-    def on_worker_loaded(self, app: Celery):
+    def on_worker_loaded(self, app):
         """Trigger the ``worker.on_loaded`` hooks.
         You should invoke this function when the Celery app is ready
         with the Celery app as argument.
@@ -235,6 +231,13 @@ class WorkerConfiguration(LoggingConfiguration):
            Hooks list added
 
         """
+        if get_validation_mode() is ValidationMode.strict:
+            from celery import Celery
+            if not isinstance(app, Celery):
+                raise TypeError(
+                    'type of argument "app" must be celery.Celery; got {0} '
+                    'instead'.format(typing._type_repr(type(app)))
+                )
         self.configure_logging()
 
         on_loaded = self.get('worker').get('on_loaded', [])
@@ -7,12 +7,9 @@
 import collections.abc
 import typing
 
-from typeguard import typechecked
-from werkzeug.datastructures import ImmutableDict
-from werkzeug.utils import cached_property
-
 from ..base import config_property
-from ..utils import import_hook
+from ..utils import cached_property, import_hook
+from ..validation import typechecked
 from .logging import LoggingConfiguration
 
 __all__ = 'WebConfiguration',
@@ -54,6 +51,7 @@ class WebConfiguration(LoggingConfiguration):
         web that will go to :attr:`flask.Flask.config <Flask.config>`.
 
         """
+        from werkzeug.datastructures import ImmutableDict
         web_config = self.get('web', {})
         if not isinstance(web_config, collections.abc.Mapping):
             web_config = {}
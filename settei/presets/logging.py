@@ -26,8 +26,6 @@ configured through TOML file e.g.:
    stream = "ext://sys.stderr"
 
 """
-import logging.config
-
 from ..base import Configuration
 
 __all__ = 'LoggingConfiguration',
@@ -38,6 +36,7 @@ class LoggingConfiguration(Configuration):
 
     def configure_logging(self) -> None:
         """Configure :mod:`logging`."""
+        import logging.config
         try:
             conf = self['logging']
         except KeyError:
@@ -0,0 +1,256 @@
+""":mod:`settei.snapshot` --- Precompiled configuration snapshots
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Resolving a :class:`~settei.base.Configuration` involves parsing TOML,
+scanning environment variables, and type checks.  For apps deployed as
+container images these can be done once at build time: a *snapshot* is
+a plain Python module which contains every resolved value, so that it can
+be loaded without any parsing.
+
+Snapshots are made by ``compile`` command:
+
+.. code-block:: bash
+
+   python -m settei compile config.toml --class myapp:AppConfig \\
+                            -o settings_snapshot.py
+
+Then the app can import the configuration from the snapshot module::
+
+    from settings_snapshot import configuration
+
+Environment variables present at build time are captured into the snapshot
+as well, and environment variables at runtime are ignored.  Values which
+cannot be represented as Python literals (e.g. objects made by
+:class:`~settei.base.config_object_property`) are resolved from
+the snapshot document when they are accessed, like ordinary configurations.
+
+.. versionadded:: 0.7.4
+
+"""
+import ast
+import collections.abc
+import datetime
+import enum
+import pathlib
+import typing
+import uuid
+
+from .base import ConfigError, Configuration, config_object_property
+from .environ import FrozenEnvironment
+from .utils import import_hook
+from .version import VERSION
+
+__all__ = ('compile_snapshot', 'load_snapshot', 'render_snapshot',
+           'render_snapshot_value')
+
+
+def load_snapshot(class_path: str,
+                  document: typing.Mapping[str, object],
+                  values: typing.Mapping[str, object]) -> Configuration:
+    """Instantiate a configuration from the snapshot data.  It's what
+    generated snapshot modules call; you don't need to call it by yourself.
+
+    :param class_path: the import path of the configuration class,
+                       e.g. ``'myapp:AppConfig'``
+    :type class_path: :class:`str`
+    :param document: the configuration document with resolved
+                     environment variables
+    :type document: :class:`typing.Mapping`
+    :param values: the resolved values of the configuration properties
+                   by their attribute names
+    :type values: :class:`typing.Mapping`
+    :return: the instantiated configuration
+    :rtype: :class:`~settei.base.Configuration`
+
+    """
+    cls = import_hook(class_path)
+    # Environment variables were already captured into the document at
+    # build time, so the process environment is not scanned again.
+    configuration = cls(document, environ=FrozenEnvironment({}))
+    # config_property is a non-data descriptor, so instance attributes
+    # shadow it; resolved values are never computed again.
+    configuration.__dict__.update(values)
+    return configuration
+
+
+def _set_path(document: typing.MutableMapping[str, object],
+              key: str, value, copied: typing.Set[int]) -> None:
+    # Tables along the path are copied on the first write instead of
+    # deep-copying the whole document, which may contain values that
+    # cannot be copied, and which are shared with the configuration.
+    *parents, last = key.split('.')
+    for k in parents:
+        child = document.get(k)
+        if not isinstance(child, collections.abc.Mapping):
+            child = document[k] = {}
+            copied.add(id(child))
+        elif id(child) not in copied:
+            child = document[k] = dict(child)
+            copied.add(id(child))
+        document = child
+    document[last] = value
+
+
+def compile_snapshot(configuration: Configuration) -> typing.Tuple[
+    typing.Mapping[str, object],
+    typing.Mapping[str, object],
+    typing.Sequence[ConfigError]
+]:
+    """Resolve and validate every declared configuration property of
+    the given ``configuration``.
+
+    :param configuration: the configuration to resolve
+    :type configuration: :class:`~settei.base.Configuration`
+    :return: a triple of the document with resolved environment variables,
+             the mapping of attribute names to resolved values representable
+             as Python literals, and a sequence of errors
+    :rtype: :class:`typing.Tuple`
+
+    """
+    document = dict(configuration)
+    copied = {id(document)}
+    values = {}
+    errors = []
+    properties = type(configuration).config_properties
+    for name, prop in sorted(properties.items()):
+        try:
+            default, raw_value = prop.get_raw_value(configuration)
+            if isinstance(prop, config_object_property):
+                # Objects are not made at build time since they may have
+                # side effects, e.g. connecting to a server.  Their
+                # expressions are checked instead.
+                prop.check(configuration)
+            else:
+                value = getattr(configuration, name)
+        except ConfigError as e:
+            errors.append(e)
+            continue
+        if not default:
+            _set_path(document, prop.key, raw_value, copied)
+        if isinstance(prop, config_object_property) or prop.file_ref:
+            # Referred files are read at runtime; secrets should not be
+            # baked into snapshots.
+            continue
+        try:
+            render_snapshot_value(value)
+        except ValueError:
+            continue
+        values[name] = value
+    return document, values, errors
+
+
+def render_snapshot_value(value) -> str:
+    """Render the given ``value`` to a Python expression.
+
+    :param value: the value to render
+    :return: the Python expression
+    :rtype: :class:`str`
+    :raise ValueError: when the value cannot be represented
+
+    """
+    if value is None or isinstance(value, (bool, str, bytes)):
+        return repr(value)
+    elif isinstance(value, enum.Enum) and \
+            '.' not in type(value).__qualname__:
+        return 'import_hook({0!r})({1})'.format(
+            '{0.__module__}:{0.__qualname__}'.format(type(value)),
+            render_snapshot_value(value.value)
+        )
+    elif isinstance(value, (int, float)):
+        r = repr(value)
+        try:
+            ok = ast.literal_eval(r) == value
+        except ValueError:
+            ok = False
+        if ok:
+            return r
+    elif isinstance(value, uuid.UUID):
+        return 'uuid.UUID({0!r})'.format(str(value))
+    elif isinstance(value, datetime.datetime):
+        return 'datetime.datetime({0})'.format(_render_time_args(
+            value, value.year, value.month, value.day, value.hour,
+            value.minute, value.second, value.microsecond
+        ))
+    elif isinstance(value, datetime.date):
+        return 'datetime.date({0.year}, {0.month}, {0.day})'.format(value)
+    elif isinstance(value, datetime.time):
+        return 'datetime.time({0})'.format(_render_time_args(
+            value, value.hour, value.minute, value.second, value.microsecond
+        ))
+    elif isinstance(value, dict):
+        return '{{{0}}}'.format(', '.join(
+            '{0}: {1}'.format(render_snapshot_value(k),
+                              render_snapshot_value(v))
+            for k, v in value.items()
+        ))
+    elif isinstance(value, list):
+        return '[{0}]'.format(', '.join(map(render_snapshot_value, value)))
+    elif isinstance(value, tuple):
+        return '({0}{1})'.format(', '.join(map(render_snapshot_value, value)),
+                                 ',' if len(value) == 1 else '')
+    raise ValueError('cannot represent {0!r} as a Python expression'.format(
+        value
+    ))
+
+
+def _render_time_args(value: typing.Union[datetime.datetime, datetime.time],
+                      *args: int) -> str:
+    rendered = ', '.join(map(str, args))
+    offset = value.utcoffset()
+    if offset is not None:
+        rendered += ', tzinfo=datetime.timezone({0!r})'.format(offset)
+    return rendered
+
+
+def render_snapshot(class_path: str,
+                    document: typing.Mapping[str, object],
+                    values: typing.Mapping[str, object],
+                    source: typing.Optional[pathlib.Path] = None) -> str:
+    """Render a snapshot module source code.
+
+    :param class_path: the import path of the configuration class,
+                       e.g. ``'myapp:AppConfig'``
+    :type class_path: :class:`str`
+    :param document: the configuration document with resolved
+                     environment variables
+    :type document: :class:`typing.Mapping`
+    :param values: the resolved values of the configuration properties
+                   by their attribute names
+    :type values: :class:`typing.Mapping`
+    :param source: the path of the configuration file.  it's only
+                   for the docstring of the module
+    :type source: :class:`pathlib.Path`
+    :return: the Python source code of the snapshot module
+    :rtype: :class:`str`
+    :raise ValueError: when the document cannot be represented
+
+    """
+    lines = [
+        '"""Configuration snapshot of {0}{1} generated by settei {2}.'.format(
+            class_path,
+            '' if source is None else ' from {0!s}'.format(source),
+            VERSION
+        ),
+        '',
+        'Do not edit this file by hand, but compile it again instead.',
+        '',
+        '"""',
+        'import datetime  # noqa: F401',
+        'import uuid  # noqa: F401',
+        '',
+        'from settei.snapshot import load_snapshot',
+        'from settei.utils import import_hook  # noqa: F401',
+        '',
+        '__all__ = \'configuration\',',
+        '',
+        'CLASS = {0!r}'.format(class_path),
+        'DOCUMENT = {0}'.format(render_snapshot_value(document)),
+        'VALUES = {{{0}}}'.format(', '.join(
+            '{0!r}: {1}'.format(name, render_snapshot_value(value))
+            for name, value in sorted(values.items())
+        )),
+        '',
+        'configuration = load_snapshot(CLASS, DOCUMENT, VALUES)',
+        '',
+    ]
+    return '\n'.join(lines)
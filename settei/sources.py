@@ -0,0 +1,451 @@
+""":mod:`settei.sources` --- Configuration sources other than TOML files
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Sources are read-only mappings which read their values from somewhere
+on demand.  Unlike ordinary mappings, :class:`~settei.base.Configuration`
+wraps sources without copying them, so that it can reflect their changes.
+
+.. versionadded:: 0.7.4
+
+"""
+import collections.abc
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+import urllib.parse
+
+__all__ = 'DirectorySource', 'RemoteSource', 'Source'
+
+
+class Source(collections.abc.Mapping):
+    """The base class of configuration sources.  Subclasses have to
+    implement :class:`~collections.abc.Mapping` protocol.
+
+    """
+
+    @property
+    def document(self) -> typing.Optional[typing.Mapping[str, object]]:
+        """(:class:`typing.Mapping`) The whole current document if it's
+        in memory, or :const:`None` if it's read lazily.  A new document
+        has to be a new object rather than being mutated in place, so that
+        caches keyed by its identity (e.g.
+        :class:`~settei.document.PathIndex`) notice changes.
+
+        """
+        return None
+
+
+class DirectorySource(Source):
+    """Map a directory tree onto a nested mapping; each file name becomes
+    a key and its content becomes a value, and each subdirectory becomes
+    a nested mapping.  It's how Kubernetes ConfigMaps and Secrets mounted
+    as volumes look like::
+
+        /etc/config/
+            debug             # "true"
+            database/
+                url           # "postgresql://..."
+                pool_size     # "10"
+
+    The above directory becomes the following mapping::
+
+        {
+            'debug': 'true',
+            'database': {'url': 'postgresql://...', 'pool_size': '10'},
+        }
+
+    Files are read on the first access, and cached until their modification
+    time changes.  Entries starting with ``.`` are ignored, which includes
+    ``..data`` and timestamped directories Kubernetes makes for atomic
+    updates.
+
+    When ``watch`` is :const:`True`, files are not checked on every access.
+    Instead, it checks the ``..data`` symbolic link at most once every
+    ``interval`` seconds, and drops all cached values when the link is
+    swapped.  It's cheaper than ``stat()``-ing each file on every access,
+    but only works with directories updated through atomic symbolic link
+    swaps like Kubernetes does.
+
+    Note that values are always strings as environment variables are.
+
+    :param path: the root directory path
+    :type path: :class:`pathlib.Path`
+    :param watch: whether to watch the ``..data`` symbolic link swaps instead
+                  of checking each file's modification time.
+                  :const:`False` by default
+    :type watch: :class:`bool`
+    :param interval: the minimum seconds between checks for symbolic link
+                     swaps.  only used when ``watch`` is :const:`True`
+    :type interval: :class:`float`
+    :param encoding: the encoding of files.  ``'utf-8'`` by default
+    :type encoding: :class:`str`
+    :param strip: whether to strip trailing newlines of file contents.
+                  :const:`True` by default
+    :type strip: :class:`bool`
+
+    """
+
+    #: (:class:`str`) The name of the symbolic link which Kubernetes swaps
+    #: on updates.
+    DATA_LINK = '..data'
+
+    def __init__(self, path: typing.Union[str, pathlib.Path], *,
+                 watch: bool = False, interval: float = 1.0,
+                 encoding: str = 'utf-8', strip: bool = True) -> None:
+        self.path = pathlib.Path(path)
+        self.watch = watch
+        self.interval = interval
+        self.encoding = encoding
+        self.strip = strip
+        self._root = self
+        self._children = {}
+        self._files = {}
+        self._lock = threading.Lock()
+        self._data_target = self._read_data_link()
+        self._checked_at = time.monotonic()
+        self._generation = 0
+
+    def _child(self, path: pathlib.Path) -> 'DirectorySource':
+        child = type(self).__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child.path = path
+        child._children = {}
+        child._files = {}
+        return child
+
+    def _read_data_link(self) -> typing.Optional[str]:
+        try:
+            return os.readlink(str(self.path / self.DATA_LINK))
+        except OSError:
+            return None
+
+    def _check_swap(self) -> None:
+        root = self._root
+        now = time.monotonic()
+        if now - root._checked_at < root.interval:
+            return
+        with root._lock:
+            root._checked_at = now
+            target = root._read_data_link()
+            if target != root._data_target:
+                root._data_target = target
+                root._generation += 1
+
+    def _entry(self, key: str) -> pathlib.Path:
+        if not isinstance(key, str) or not key or key.startswith('.') or \
+                '/' in key or os.sep in key:
+            raise KeyError(key)
+        return self.path / key
+
+    def __getitem__(self, key: str) -> typing.Union[str, 'DirectorySource']:
+        path = self._entry(key)
+        if self.watch:
+            self._check_swap()
+            generation = self._root._generation
+            try:
+                cached_generation, value = self._files[key]
+            except KeyError:
+                pass
+            else:
+                if cached_generation == generation:
+                    return value
+            try:
+                return self._read(key, path, generation)
+            except (FileNotFoundError, NotADirectoryError):
+                raise KeyError(key)
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise KeyError(key)
+        signature = stat.st_ino, stat.st_mtime_ns, stat.st_size
+        try:
+            cached_signature, value = self._files[key]
+        except KeyError:
+            pass
+        else:
+            if cached_signature == signature:
+                return value
+        return self._read(key, path, signature)
+
+    def _read(self, key: str, path: pathlib.Path, signature):
+        if path.is_dir():
+            try:
+                value = self._children[key]
+            except KeyError:
+                value = self._children[key] = self._child(path)
+        else:
+            with path.open(encoding=self.encoding) as f:
+                value = f.read()
+            if self.strip:
+                value = value.rstrip('\r\n')
+        self._files[key] = signature, value
+        return value
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._entry(key).exists()
+        except KeyError:
+            return False
+
+    def __iter__(self) -> typing.Iterator[str]:
+        try:
+            names = sorted(os.listdir(str(self.path)))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.startswith('.'):
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r})'.format(
+            type(self), str(self.path)
+        )
+
+
+class RemoteSource(Source):
+    """Read a configuration document from an HTTP configuration service.
+    The document can be TOML or JSON; it's decided by the ``Content-Type``
+    header of the response (JSON if it contains ``json``, TOML otherwise).
+
+    The document is refreshed by a background thread every ``interval``
+    seconds, so that reading the source never blocks on the network.
+    It reuses a persistent connection to the service, and makes conditional
+    requests with ``If-None-Match`` and ``If-Modified-Since`` headers so
+    that unchanged documents are not transferred again.
+
+    The constructor fetches the document synchronously.  If ``cache_path``
+    is given, the last good document is stored to the file with its
+    ``ETag`` and ``Last-Modified`` validators, and it's used only when
+    the service is unreachable, e.g., the service is down when the app
+    starts, and only if it was fetched from the same ``url``.  Later
+    refreshes of the cached document are conditional as well.
+
+    :param url: the url of the configuration document.
+                ``http`` and ``https`` are supported
+    :type url: :class:`str`
+    :param cache_path: optional file path to cache the last good document
+    :type cache_path: :class:`pathlib.Path`
+    :param interval: the seconds between refreshes.  60 seconds by default.
+                     if it's :const:`None` no background thread is made and
+                     :meth:`refresh()` has to be called manually
+    :type interval: :class:`float`
+    :param timeout: the seconds to wait for the service.  10 seconds
+                    by default
+    :type timeout: :class:`float`
+    :param headers: additional request headers, e.g., ``Authorization``
+    :type headers: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+    :raise ConnectionError: when neither the service nor the cache
+                            is available
+
+    """
+
+    def __init__(self, url: str, *,
+                 cache_path: typing.Union[str, pathlib.Path, None] = None,
+                 interval: typing.Optional[float] = 60.0,
+                 timeout: float = 10.0,
+                 headers: typing.Optional[typing.Mapping[str, str]] = None
+                 ) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise ValueError('unsupported url scheme: ' + repr(url))
+        self.url = url
+        self.cache_path = None if cache_path is None \
+            else pathlib.Path(cache_path)
+        self.interval = interval
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._scheme = parsed.scheme
+        self._netloc = parsed.netloc
+        self._request_path = parsed.path or '/'
+        if parsed.query:
+            self._request_path += '?' + parsed.query
+        self._connection = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._etag = None
+        self._last_modified = None
+        #: (:class:`Exception`) The error occurred during the last refresh.
+        #: :const:`None` if it succeeded.
+        self.last_error = None
+        self._document = None
+        self.refresh()
+        if self._document is None and not self._load_cache():
+            raise ConnectionError(
+                'failed to fetch {0} and no cache is available: '
+                '{1}'.format(url, self.last_error)
+            ) from self.last_error
+        if interval is not None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name='settei.sources.RemoteSource({0})'.format(url),
+                daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def document(self) -> typing.Mapping[str, object]:
+        """(:class:`typing.Mapping`) The last good document."""
+        return self._document
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def _connect(self):
+        import http.client
+        if self._scheme == 'https':
+            return http.client.HTTPSConnection(self._netloc,
+                                               timeout=self.timeout)
+        return http.client.HTTPConnection(self._netloc, timeout=self.timeout)
+
+    def _request(self):
+        headers = dict(self.headers)
+        if self._etag is not None:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified is not None:
+            headers['If-Modified-Since'] = self._last_modified
+        # A persistent connection may have been closed by the server since
+        # the last request; retry once with a new connection in that case.
+        for retry in (False, True):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request('GET', self._request_path,
+                                         headers=headers)
+                response = self._connection.getresponse()
+                return response, response.read()
+            except OSError:
+                self._connection.close()
+                self._connection = None
+                if retry:
+                    raise
+            except Exception:
+                self._connection.close()
+                self._connection = None
+                raise
+
+    def refresh(self) -> bool:
+        """Fetch the document from the service if it has changed.
+        Errors are not raised but stored to :attr:`last_error`, and
+        the last good document is kept.
+
+        :return: whether the document has changed
+        :rtype: :class:`bool`
+
+        """
+        with self._lock:
+            try:
+                response, body = self._request()
+                if response.status == 304:
+                    self.last_error = None
+                    return False
+                elif response.status != 200:
+                    raise ConnectionError(
+                        '{0} responded {1} {2}'.format(
+                            self.url, response.status, response.reason
+                        )
+                    )
+                content_type = response.getheader('Content-Type', '')
+                text = body.decode(self._charset(content_type))
+                document = self._parse(content_type, text)
+            except Exception as e:
+                self.last_error = e
+                return False
+            self._etag = response.getheader('ETag')
+            self._last_modified = response.getheader('Last-Modified')
+            self._document = document
+            self.last_error = None
+            self._store_cache(content_type, text)
+            return True
+
+    @staticmethod
+    def _charset(content_type: str) -> str:
+        for param in content_type.split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                return value.strip('"')
+        return 'utf-8'
+
+    @staticmethod
+    def _parse(content_type: str, text: str) -> typing.Mapping[str, object]:
+        if 'json' in content_type.lower():
+            document = json.loads(text)
+        else:
+            from pytoml import loads
+            document = loads(text)
+        if not isinstance(document, collections.abc.Mapping):
+            raise ValueError('the document must be a table, not ' +
+                             repr(document))
+        return document
+
+    def _load_cache(self) -> bool:
+        if self.cache_path is None:
+            return False
+        try:
+            with self.cache_path.open(encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('url') != self.url:
+                # The cache of another service is not this one's document.
+                return False
+            document = self._parse(cache['content_type'], cache['body'])
+        except (OSError, ValueError, KeyError, AttributeError):
+            return False
+        with self._lock:
+            # The next refresh is conditional, so that the document is not
+            # transferred again if it's the same as the cache.
+            self._etag = cache.get('etag')
+            self._last_modified = cache.get('last_modified')
+            self._document = document
+        return True
+
+    def _store_cache(self, content_type: str, text: str) -> None:
+        if self.cache_path is None:
+            return
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        try:
+            with tmp_path.open('w', encoding='utf-8') as f:
+                json.dump({'url': self.url, 'content_type': content_type,
+                           'etag': self._etag,
+                           'last_modified': self._last_modified,
+                           'body': text}, f)
+            os.replace(str(tmp_path), str(self.cache_path))
+        except OSError as e:
+            self.last_error = e
+
+    def close(self) -> None:
+        """Stop the background refreshes and close the connection."""
+        self._stop.set()
+        if self._thread is not None and \
+                self._thread is not threading.current_thread():
+            self._thread.join()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self) -> 'RemoteSource':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getitem__(self, key: str):
+        return self._document[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._document)
+
+    def __len__(self) -> int:
+        return len(self._document)
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}({1!r})'.format(
+            type(self), self.url
+        )
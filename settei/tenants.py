@@ -0,0 +1,401 @@
+""":mod:`settei.tenants` --- Registry of many tenants' configurations
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+When a service has thousands of tenants, each of them usually has its own
+configuration which differs from the others in only a few keys.
+:class:`TenantRegistry` loads their configurations on demand, and keeps
+only the recently used ones within a memory budget.  Identical keys and
+tables across tenants are stored only once by :class:`Interner`::
+
+    def load_tenant(tenant: str) -> typing.Mapping[str, object]:
+        with open('tenants/{0}.toml'.format(tenant)) as f:
+            return pytoml.load(f)
+
+    registry = TenantRegistry(load_tenant, AppConfig,
+                              memory_budget=256 * 1024 * 1024)
+    registry['acme'].database_url
+
+.. versionadded:: 0.7.4
+
+"""
+import collections
+import collections.abc
+import concurrent.futures
+import sys
+import threading
+import typing
+import weakref
+
+from .base import Configuration
+from .document import FrozenDict
+
+__all__ = 'Interner', 'TenantRegistry', 'TenantStats'
+
+
+#: The estimated bytes of a weak reference to an interned table or array
+#: and its slot in :class:`Interner`.
+_NODE_ENTRY_SIZE = sys.getsizeof(
+    weakref.KeyedRef(Configuration, None, None)
+) + 3 * 8
+
+#: The estimated bytes of the bookkeeping of an object in
+#: :class:`TenantRegistry`, i.e., ``[object, tenants, size]`` and its slot.
+_REFERENCE_SIZE = sys.getsizeof([None, 0, 0]) + 4 * 8
+
+
+def _sizeof_key(key: tuple) -> int:
+    # Interned values are counted on their own, so only tuples and ids
+    # of nodes are.
+    if key[0] == 'node' and type(key[1]) is int:
+        return sys.getsizeof(key) + sys.getsizeof(key[1])
+    return sys.getsizeof(key) + sum(
+        _sizeof_key(k) for k in key if type(k) is tuple
+    )
+
+
+class _Table(FrozenDict):
+    """Interned tables.  Unlike :class:`dict` they can be weakly referred.
+    They're frozen so that configurations wrap them without copying.
+    Their sizes include their keys in :class:`Interner`.
+
+    """
+
+    __slots__ = '__weakref__', '_key_size'
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + self._key_size
+
+
+class _Array(list):
+    """Interned arrays.  Unlike :class:`list` they can be weakly referred.
+    Their sizes include their keys in :class:`Interner`.
+
+    """
+
+    __slots__ = '__weakref__', '_key_size'
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + self._key_size
+
+
+class Interner:
+    """Hash-cons configuration documents, so that equal keys and equal
+    tables (or arrays) across documents become the same objects.  Interned
+    tables are weakly referred by the interner, so that they are freed
+    when no document uses them anymore.
+
+    Interned documents are shared among many configurations, so their
+    tables are :class:`~settei.document.FrozenDict` objects, which
+    configurations wrap without copying.  Arrays must not be mutated
+    either.
+
+    """
+
+    def __init__(self) -> None:
+        self._nodes = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def intern(self, document: typing.Mapping[str, object]) -> typing.Tuple[
+        typing.Mapping[str, object], int
+    ]:
+        """Intern the given ``document``.
+
+        :param document: the document to intern
+        :type document: :class:`typing.Mapping`
+        :return: a pair of the interned document and the number of bytes
+                 newly taken by it, i.e., the size of the tables not shared
+                 with documents interned before
+        :rtype: :class:`typing.Tuple`\\ [:class:`typing.Mapping`,
+                :class:`int`]
+
+        """
+        counter = [0]
+        with self._lock:
+            return self._intern(document, counter)[0], counter[0]
+
+    def _intern(self, value, counter: typing.List[int]):
+        # Return the interned value, and its structural key.  Keys of
+        # tables and arrays refer to their interned children by identity;
+        # the interned children live as long as their parents, so that
+        # their ids are not reused meanwhile.
+        if isinstance(value, collections.abc.Mapping):
+            items = []
+            keys = []
+            for k, v in value.items():
+                if isinstance(k, str):
+                    k = sys.intern(k)
+                v, key = self._intern(v, counter)
+                items.append((k, v))
+                keys.append((k, key))
+            return self._share(_Table, items, ('table', tuple(keys)),
+                               counter)
+        elif isinstance(value, list):
+            items = []
+            keys = []
+            for v in value:
+                v, key = self._intern(v, counter)
+                items.append(v)
+                keys.append(key)
+            return self._share(_Array, items, ('array', tuple(keys)),
+                               counter)
+        elif isinstance(value, str):
+            value = sys.intern(value)
+        try:
+            hash(value)
+        except TypeError:
+            return value, ('object', id(value))
+        # The type is a part of the key so that 1, 1.0, and True differ.
+        return value, (type(value), value)
+
+    def _share(self, cls: type, items, key, counter: typing.List[int]):
+        node = self._nodes.get(key)
+        if node is None:
+            node = cls(items)
+            node._key_size = _sizeof_key(key) + _NODE_ENTRY_SIZE
+            self._nodes[key] = node
+            counter[0] += sys.getsizeof(node)
+        return node, ('node', id(node))
+
+
+def _collect_objects(document: typing.Mapping[str, object]) -> typing.Tuple[
+    object, ...
+]:
+    # The distinct objects making up the document: tables, arrays, keys,
+    # and values.  Interned ones are shared by many documents.
+    objects = {id(document): document}
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, collections.abc.Mapping):
+            for k in node:
+                objects.setdefault(id(k), k)
+            values = node.values()
+        else:
+            values = node
+        for v in values:
+            if id(v) not in objects:
+                objects[id(v)] = v
+                if isinstance(v, (collections.abc.Mapping, list)):
+                    stack.append(v)
+    return tuple(objects.values())
+
+
+class TenantStats(collections.namedtuple('TenantStats',
+                                         'hits misses memory')):
+    """The usage statistics of a tenant in a :class:`TenantRegistry`.
+
+    .. attribute:: hits
+
+       (:class:`int`) The number of lookups served from memory.
+
+    .. attribute:: misses
+
+       (:class:`int`) The number of lookups which loaded the configuration.
+
+    .. attribute:: memory
+
+       (:class:`int`) The estimated bytes taken by the tenant's
+       configuration.  Objects shared with other tenants in memory are
+       divided evenly among them, so that the sum of every tenant's
+       memory is :attr:`TenantRegistry.memory`.  It's zero if the tenant
+       is not in memory.
+
+    """
+
+    @property
+    def hit_rate(self) -> float:
+        """(:class:`float`) The ratio of :attr:`hits` to all lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TenantRegistry(collections.abc.Mapping):
+    """The registry of tenants' configurations.  A configuration is loaded
+    through ``loader`` on the first lookup of its tenant, and kept in
+    memory until it becomes one of the least recently used ones beyond
+    ``memory_budget``.
+
+    Configurations are loaded outside the registry's lock, so that a slow
+    load doesn't block lookups of other tenants.  Concurrent lookups of
+    the same tenant wait for a single load.
+
+    Memory is estimated from the sizes of the distinct tables, arrays,
+    keys, and values of configurations in memory, and their
+    :class:`~settei.document.PathIndex` objects.  Objects shared by many
+    tenants are counted once, as long as any of them is in memory.
+
+    :param loader: the function which takes a tenant name and returns
+                   its configuration document
+    :type loader: :class:`collections.abc.Callable`
+    :param cls: the configuration class.  :class:`~settei.base.Configuration`
+                by default
+    :type cls: :class:`type`
+    :param memory_budget: keyword only argument.  the estimated bytes that
+                          configurations in memory can take.  64 MiB by
+                          default
+    :type memory_budget: :class:`int`
+    :param environ: keyword only argument.  the environment variables
+                    passed to configurations
+    :type environ: :class:`typing.Mapping`\\ [:class:`str`, :class:`str`]
+
+    """
+
+    def __init__(
+        self, loader: typing.Callable[[str], typing.Mapping[str, object]],
+        cls: type = Configuration, *, memory_budget: int = 64 * 1024 * 1024,
+        environ: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> None:
+        if not (isinstance(cls, type) and issubclass(cls, Configuration)):
+            raise TypeError('cls must be a subclass of {0.__module__}.'
+                            '{0.__qualname__}, not {1!r}'.format(
+                                Configuration, cls
+                            ))
+        self.loader = loader
+        self.cls = cls
+        self.memory_budget = memory_budget
+        self.environ = environ
+        self.interner = Interner()
+        self._lock = threading.RLock()
+        self._configurations = collections.OrderedDict()  # in LRU order
+        self._loading = {}
+        self._objects = {}
+        # The id of every object in memory to [object, tenants, size].
+        self._references = {}
+        self._memory = 0
+        self._hits = collections.Counter()
+        self._misses = collections.Counter()
+
+    def __getitem__(self, tenant: str) -> Configuration:
+        with self._lock:
+            try:
+                configuration = self._configurations[tenant]
+            except KeyError:
+                pass
+            else:
+                self._configurations.move_to_end(tenant)
+                self._hits[tenant] += 1
+                return configuration
+            future = self._loading.get(tenant)
+            loading = future is None
+            if loading:
+                future = self._loading[tenant] = concurrent.futures.Future()
+        if not loading:
+            configuration = future.result()
+            with self._lock:
+                self._hits[tenant] += 1
+            return configuration
+        try:
+            document = self.loader(tenant)
+            document, _ = self.interner.intern(document)
+            configuration = self.cls(document, environ=self.environ)
+            # The index is built here so that it's counted as well; unlike
+            # the document, each tenant has its own.
+            index = configuration.path_index
+            objects = _collect_objects(document) + (index,)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[tenant]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[tenant]
+            self._misses[tenant] += 1
+            self._discard(tenant)  # evicted and loaded again meanwhile
+            self._configurations[tenant] = configuration
+            self._acquire(tenant, objects)
+            self._evict()
+        future.set_result(configuration)
+        return configuration
+
+    def _acquire(self, tenant: str, objects: typing.Tuple[object, ...]) -> \
+            None:
+        self._objects[tenant] = objects
+        references = self._references
+        for obj in objects:
+            reference = references.get(id(obj))
+            if reference is None:
+                size = sys.getsizeof(obj) + _REFERENCE_SIZE
+                references[id(obj)] = [obj, 1, size]
+                self._memory += size
+            else:
+                reference[1] += 1
+
+    def _discard(self, tenant: str) -> bool:
+        if self._configurations.pop(tenant, None) is None:
+            return False
+        references = self._references
+        for obj in self._objects.pop(tenant):
+            reference = references[id(obj)]
+            reference[1] -= 1
+            if not reference[1]:
+                del references[id(obj)]
+                self._memory -= reference[2]
+        return True
+
+    def _evict(self) -> None:
+        # The most recently used one is never evicted.
+        while len(self._configurations) > 1 and \
+                self._memory > self.memory_budget:
+            self._discard(next(iter(self._configurations)))
+
+    def __contains__(self, tenant) -> bool:
+        """Whether the tenant's configuration is in memory.  It doesn't
+        load the configuration.
+
+        """
+        return tenant in self._configurations
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate the tenants in memory, from the least recently used."""
+        with self._lock:
+            return iter(list(self._configurations))
+
+    def __len__(self) -> int:
+        return len(self._configurations)
+
+    def evict(self, tenant: str) -> bool:
+        """Drop the tenant's configuration from memory, e.g., when it's
+        changed.  It will be loaded again on the next lookup.
+
+        :param tenant: the tenant name
+        :type tenant: :class:`str`
+        :return: whether the configuration was in memory
+        :rtype: :class:`bool`
+
+        """
+        with self._lock:
+            return self._discard(tenant)
+
+    @property
+    def memory(self) -> int:
+        """(:class:`int`) The estimated bytes taken by configurations in
+        memory.
+
+        """
+        return self._memory
+
+    def stats(self, tenant: str) -> TenantStats:
+        """Get the usage statistics of the tenant.
+
+        :param tenant: the tenant name
+        :type tenant: :class:`str`
+        :return: the statistics
+        :rtype: :class:`TenantStats`
+
+        """
+        with self._lock:
+            references = self._references
+            memory = sum(
+                references[id(obj)][2] / references[id(obj)][1]
+                for obj in self._objects.get(tenant, ())
+            )
+            return TenantStats(self._hits[tenant], self._misses[tenant],
+                               int(round(memory)))
+
+    def __repr__(self) -> str:
+        return '{0.__module__}.{0.__qualname__}(<{1} tenants>)'.format(
+            type(self), len(self._configurations)
+        )
@@ -12,3 +12,24 @@ def import_hook(module_path: str):
     func = getattr(module, func_name)
 
     return func
+
+
+class cached_property:
+    """Similar to :class:`property` except the computed value is cached on
+    the instance, so that it's computed only once.  It's a replacement of
+    the ones shipped by Werkzeug and Kombu, which made presets import those
+    packages only to define a class.
+
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+        self.__module__ = func.__module__
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.__name__] = self.func(obj)
+        return value
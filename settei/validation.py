@@ -0,0 +1,282 @@
+""":mod:`settei.validation` --- Runtime type checking modes
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Settei checks argument types of its functions at runtime, e.g.,
+:func:`~settei.parse_env.parse_int` or
+:meth:`~settei.base.Configuration.from_path`.  It's helpful while developing
+an app, but checks on hot functions like parsers for environment variables
+cost a lot.  The :class:`ValidationMode` decides how much checks are made:
+
+``strict``
+   Every check is made.  The default.
+
+``declaration-only``
+   Only arguments of declarations like :class:`~settei.base.config_property`
+   are checked.  Other functions become plain functions.
+
+``off``
+   No check is made at all.
+
+The mode can be set through :func:`set_validation_mode` or
+the :envvar:`SETTEI_VALIDATION` environment variable, e.g.:
+
+.. code-block:: bash
+
+   SETTEI_VALIDATION=declaration-only python app.py
+
+An unknown value of :envvar:`SETTEI_VALIDATION` is warned and ignored.
+Since functions are decorated when their modules are imported, set the mode
+before importing settei to make them plain functions.
+
+Note that it has nothing to do with checking configured values
+(e.g. :exc:`~settei.base.ConfigTypeError`); these are always checked,
+through validators made by :func:`compile_validator()`.
+
+.. versionadded:: 0.7.4
+
+"""
+import collections.abc
+import enum
+import functools
+import os
+import typing
+import warnings
+
+__all__ = ('ENVIRON_KEY', 'ValidationMode', 'check_argument_type',
+           'compile_validator', 'get_validation_mode', 'set_validation_mode',
+           'typechecked')
+
+#: (:class:`str`) The name of the environment variable to set the default
+#: :class:`ValidationMode`.
+ENVIRON_KEY = 'SETTEI_VALIDATION'
+
+
+class ValidationMode(enum.Enum):
+    """How much runtime type checks are made."""
+
+    #: Check every decorated function and declaration.
+    strict = 'strict'
+
+    #: Check only declarations like :class:`~settei.base.config_property`.
+    declaration_only = 'declaration-only'
+
+    #: No checks at all.
+    off = 'off'
+
+
+def _mode_from_environ() -> ValidationMode:
+    value = os.environ.get(ENVIRON_KEY, ValidationMode.strict.value)
+    try:
+        return ValidationMode(value)
+    except ValueError:
+        # A typo should not make every importer of settei crash.
+        warnings.warn(
+            '{0}={1!r} is not a validation mode; it should be one of {2}.  '
+            'falls back to {3!r}'.format(
+                ENVIRON_KEY, value,
+                ', '.join(repr(m.value) for m in ValidationMode),
+                ValidationMode.strict.value
+            ),
+            RuntimeWarning
+        )
+        return ValidationMode.strict
+
+
+_mode = _mode_from_environ()
+
+
+def get_validation_mode() -> ValidationMode:
+    """Get the current :class:`ValidationMode`.
+
+    :return: the current validation mode
+    :rtype: :class:`ValidationMode`
+
+    """
+    return _mode
+
+
+def set_validation_mode(mode) -> ValidationMode:
+    """Change the :class:`ValidationMode`.  It affects the process globally.
+
+    :param mode: the mode to change to.  its value string e.g.
+                 ``'declaration-only'`` is also accepted
+    :type mode: :class:`ValidationMode`, :class:`str`
+    :return: the previous mode
+    :rtype: :class:`ValidationMode`
+    :raise ValueError: when ``mode`` is an unknown mode
+
+    """
+    global _mode
+    previous = _mode
+    _mode = ValidationMode(mode)
+    return previous
+
+
+def typechecked(func):
+    """Lazy version of :func:`typeguard.typechecked`.  Importing
+    :mod:`typeguard` is expensive (it pulls :mod:`unittest.mock` and
+    :mod:`asyncio`), so the actual type checking wrapper is made on the first
+    call of the decorated ``func`` instead of at import time.
+
+    Unless the mode is :attr:`ValidationMode.strict` when it's decorated,
+    ``func`` itself is returned so that calls cost nothing; changing
+    the mode to strict later doesn't make it checked.  Otherwise
+    the decorated function checks the mode on each call, and directly calls
+    ``func`` without any checks if it has been changed.
+
+    """
+    if _mode is not ValidationMode.strict:
+        return func
+    checked = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal checked
+        if _mode is not ValidationMode.strict:
+            return func(*args, **kwargs)
+        if checked is None:
+            from typeguard import typechecked as typeguard_typechecked
+            checked = typeguard_typechecked(func)
+        return checked(*args, **kwargs)
+    return wrapper
+
+
+def check_argument_type(name: str, value, expected: type,
+                        optional: bool = False) -> None:
+    """Cheap replacement of :func:`typeguard.check_argument_types` for
+    plain classes, used by declarations running at import time.
+    It does nothing if the mode is :attr:`ValidationMode.off`.
+
+    :raise TypeError: when ``value`` is not an instance of ``expected``
+
+    """
+    if _mode is ValidationMode.off or optional and value is None:
+        return
+    if expected is callable:
+        ok = callable(value)
+        expected_name = 'a callable'
+    else:
+        ok = isinstance(value, expected)
+        expected_name = expected.__qualname__
+    if not ok:
+        raise TypeError(
+            'type of argument "{0}" must be {1}{2}; got {3} instead'.format(
+                name, expected_name, ' or None' if optional else '',
+                type(value).__qualname__
+            )
+        )
+
+
+#: (:class:`typing.MutableMapping`\\ [:class:`object`,
+#: :class:`collections.abc.Callable`]) The cache of compiled validators
+#: by their types.
+_validators = {}
+
+
+def _get_origin_and_args(type_) -> typing.Tuple[object, typing.Tuple]:
+    origin = getattr(type_, '__origin__', None)
+    if origin is None:
+        return None, ()
+    # Before Python 3.7, the origin of List[int] is List, and its runtime
+    # class is kept in __extra__.
+    origin = getattr(origin, '__extra__', None) or origin
+    return origin, tuple(getattr(type_, '__args__', None) or ())
+
+
+def _compile_each(validator, cls: typing.Optional[type]):
+    if cls is None:
+        return lambda values: all(map(validator, values))
+
+    # A homogeneous path: the distinct types of thousands of elements are
+    # usually only a few, so they are checked instead of each element.
+    def validate_each(values) -> bool:
+        return all(issubclass(t, cls) for t in set(map(type, values)))
+    return validate_each
+
+
+def _compile(type_) -> typing.Tuple[
+    typing.Callable[[object], bool], typing.Optional[type]
+]:
+    # Return the validator, and the plain class if the type is a plain
+    # class so that containers of it can take the homogeneous path.
+    if type_ is typing.Any or type_ is object:
+        return (lambda value: True), None
+    elif type_ is None or type_ is type(None):
+        return (lambda value: value is None), None
+    elif isinstance(type_, type) and \
+            getattr(type_, '__origin__', None) is None:
+        return (lambda value: isinstance(value, type_)), type_
+    from .base import get_union_types
+    union_types = get_union_types(type_)
+    if union_types is not None:
+        validators = tuple(compile_validator(t) for t in union_types)
+        return (lambda value: any(v(value) for v in validators)), None
+    origin, args = _get_origin_and_args(type_)
+    if any(isinstance(arg, typing.TypeVar) for arg in args):
+        args = ()  # unparameterized generics, e.g. typing.List
+    if not isinstance(origin, type):
+        if type_ is typing.Callable or origin is collections.abc.Callable:
+            return callable, None
+        raise TypeError('unsupported type: ' + typing._type_repr(type_))
+    if issubclass(origin, tuple) and args and args[-1] is not Ellipsis \
+            and args != ((),):
+        items = tuple(compile_validator(t) for t in args)
+
+        def validate_tuple(value) -> bool:
+            return isinstance(value, tuple) and len(value) == len(items) and \
+                all(v(item) for v, item in zip(items, value))
+        return validate_tuple, None
+    elif issubclass(origin, collections.abc.Mapping) and len(args) == 2:
+        keys = _compile_each(*_compile(args[0]))
+        values = _compile_each(*_compile(args[1]))
+
+        def validate_mapping(value) -> bool:
+            return isinstance(value, origin) and keys(value.keys()) and \
+                values(value.values())
+        return validate_mapping, None
+    elif issubclass(origin, collections.abc.Iterable) and \
+            not issubclass(origin, (str, bytes)) and args and \
+            args != ((),):
+        elements = _compile_each(*_compile(args[0]))
+
+        def validate_collection(value) -> bool:
+            return isinstance(value, origin) and elements(value)
+        return validate_collection, None
+    return (lambda value: isinstance(value, origin)), None
+
+
+def compile_validator(type_) -> typing.Callable[[object], bool]:
+    """Compile a function which tells whether a value is of the given
+    ``type_``.  Unlike :func:`typeguard.check_type`, the type is
+    introspected only once, and the compiled validator is cached.
+
+    Besides plain classes, the following types are supported:
+
+    - :data:`typing.Any`, :data:`typing.Optional`, and :data:`typing.Union`
+    - collections like ``typing.List[int]``, ``typing.Sequence[str]``, and
+      ``typing.Tuple[str, ...]``
+    - fixed-length tuples like ``typing.Tuple[str, int]``
+    - mappings like ``typing.Dict[str, float]`` and
+      ``typing.Mapping[str, SomeEnum]``
+
+    Elements of collections of plain classes are checked by their distinct
+    types, so that homogeneous lists having thousands of elements are
+    checked fast.
+
+    :param type_: the type to validate
+    :return: the validator which takes a value and returns whether it's
+             of the ``type_``
+    :rtype: :class:`collections.abc.Callable`
+    :raise TypeError: when the ``type_`` is not supported
+
+    .. versionadded:: 0.7.4
+
+    """
+    try:
+        return _validators[type_]
+    except KeyError:
+        pass
+    except TypeError:
+        return _compile(type_)[0]  # unhashable types cannot be cached
+    validator = _validators[type_] = _compile(type_)[0]
+    return validator
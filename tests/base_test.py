@@ -1,3 +1,4 @@
+import concurrent.futures
 import enum
 import pathlib
 import typing  # noqa
@@ -6,10 +7,11 @@ import warnings
 from pytest import mark, raises
 
 from .utils import os_environ
-from settei.base import (ConfigKeyError, ConfigTypeError,
-                         Configuration, ConfigValueError, ConfigWarning,
-                         config_object_property, config_property,
-                         get_union_types)
+from settei.base import (ConfigKeyError, ConfigLoadError, ConfigTypeError,
+                         ConfigValidationError, Configuration,
+                         ConfigValueError, ConfigWarning, Section,
+                         ValidationReport, config_object_property,
+                         config_property, get_union_types)
 
 
 class Enum1(enum.Enum):
@@ -338,6 +340,50 @@ def test_app_from_path(tmpdir):
     assert cfg.database_url == 'sqlite:///b.db'
 
 
+def write_tenant_configs(tmpdir, count: int) -> typing.List[pathlib.Path]:
+    paths = []
+    for i in range(count):
+        path = tmpdir.join('tenant{0}.toml'.format(i))
+        path.write('[database]\nurl = "sqlite:///{0}.db"\n'.format(i))
+        paths.append(pathlib.Path(path.strpath))
+    return paths
+
+
+def test_app_load_many(tmpdir):
+    paths = write_tenant_configs(tmpdir, 5)
+    cfgs = TestAppConfig.load_many(paths)
+    assert [c.database_url for c in cfgs] == [
+        'sqlite:///{0}.db'.format(i) for i in range(5)
+    ]
+    assert all(isinstance(c, TestAppConfig) for c in cfgs)
+
+
+def test_app_iter_load_many(tmpdir):
+    paths = write_tenant_configs(tmpdir, 20)
+    broken = tmpdir.join('broken.toml')
+    broken.write('[database\n')
+    paths.insert(3, pathlib.Path(broken.strpath))
+    paths.insert(7, str(tmpdir.join('missing.toml')))
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        results = list(TestAppConfig.iter_load_many(paths, executor,
+                                                    max_pending=2))
+    assert [r.path for r in results] == [pathlib.Path(p) for p in paths]
+    assert results[3].configuration is None
+    assert results[3].error is not None
+    assert isinstance(results[7].error, FileNotFoundError)
+    oks = [r for i, r in enumerate(results) if i not in (3, 7)]
+    assert all(r.error is None for r in oks)
+    assert [r.configuration.database_url for r in oks] == [
+        'sqlite:///{0}.db'.format(i) for i in range(20)
+    ]
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        with raises(ConfigLoadError) as ex:
+            TestAppConfig.load_many(paths, executor)
+    assert [r.path for r in ex.value.errors] == [
+        pathlib.Path(paths[3]), pathlib.Path(paths[7])
+    ]
+
+
 def test_config_object_property_cached():
     c = TestAppConfigObject(sample={
         'a': {
@@ -516,3 +562,196 @@ def test_config_property_overlay_env():
     }):
         c = TestEnvAppConfig(foo={'overlay_env': {'bar': '3'}})
         assert c.overlay_with_env == {'foo': '1', 'bar': '3'}
+
+
+class ValidatedConfig(Configuration):
+    url = config_property('database.url', str)
+    port = config_property('database.port', int, default=5432)
+    debug = config_property('web.debug', bool)
+    cache = config_object_property('cache', SampleInterface)
+
+
+def test_configuration_validate():
+    c = ValidatedConfig(
+        database={'url': 'sqlite://'},
+        cache={'class': __name__ + ':Impl'},
+        environ={'WEB__DEBUG': 'true', 'DATABASE__PORT': 'wrong'},
+    )
+    with raises(ConfigValidationError) as exc_info:
+        c.validate()
+    errors = exc_info.value.errors
+    assert list(errors) == ['port']
+    assert isinstance(errors['port'], ConfigValueError)
+    report = exc_info.value.report
+    assert list(report.timings) == ['url', 'port', 'debug', 'cache']
+    c = ValidatedConfig(
+        database={'url': 'sqlite://'},
+        web={'debug': True},
+        cache={'class': __name__ + ':Impl'},
+        environ={},
+    )
+    report = c.validate()
+    assert isinstance(report, ValidationReport)
+    assert report.errors == {}
+    assert report.elapsed >= 0
+
+
+def test_configuration_validate_collects_errors():
+    c = ValidatedConfig(database={'port': 'wrong'},
+                        cache={'class': 'nonexistent_module:Impl'},
+                        environ={})
+    with raises(ConfigValidationError) as exc_info:
+        c.validate()
+    errors = exc_info.value.errors
+    assert sorted(errors) == ['cache', 'debug', 'port', 'url']
+    assert isinstance(errors['cache'], ConfigValueError)
+    assert isinstance(errors['cache'].__cause__, ImportError)
+    assert isinstance(errors['debug'], ConfigKeyError)
+    assert isinstance(errors['port'], ConfigTypeError)
+    assert isinstance(errors['url'], ConfigKeyError)
+    assert 'port' in str(exc_info.value)
+
+
+def broken_default(configuration):
+    return configuration.no_such_attribute
+
+
+class BrokenDefaultConfig(ValidatedConfig):
+    broken = config_property('broken', str, default_func=broken_default)
+
+
+def test_configuration_validate_propagates_bugs():
+    c = BrokenDefaultConfig(database={'url': 'sqlite://'},
+                            web={'debug': True},
+                            cache={'class': __name__ + ':Impl'},
+                            environ={})
+    with raises(AttributeError):
+        c.validate()
+
+
+def test_configuration_validate_env_tree(monkeypatch):
+    trees = []
+    transform = config_property._transform_env_to_dict
+
+    def counting_transform(self, env):
+        tree = transform(self, env)
+        trees.append(tree)
+        return tree
+    monkeypatch.setattr(config_property, '_transform_env_to_dict',
+                        counting_transform)
+    c = ValidatedConfig(cache={'class': __name__ + ':Impl'}, environ={
+        'DATABASE__URL': 'sqlite://', 'DATABASE__PORT': '5433',
+        'WEB__DEBUG': 'true', 'UNRELATED': '1',
+    })
+    c.validate()
+    assert trees == [{'database': {'url': 'sqlite://', 'port': '5433'},
+                      'web': {'debug': 'true'}}]
+    c = ValidatedConfig(cache={'class': __name__ + ':Impl'}, environ={
+        'DATABASE__URL': 'sqlite://', 'WEB__DEBUG': 'true',
+        'WEB__DEBUG__X': '1',
+    })
+    with raises(ConfigValidationError) as exc_info:
+        c.validate()
+    assert list(exc_info.value.errors) == ['debug']
+
+
+class PropertyMixin:
+    mixed = config_property('mixed.value', str)
+    shadowed = config_property('shadowed', str)
+
+
+class RegistryConfig(PropertyMixin, ValidatedConfig):
+    shadowed = None
+    alias = config_property('database.url', str)
+
+
+def test_config_properties_registry():
+    assert list(ValidatedConfig.config_properties) == [
+        'url', 'port', 'debug', 'cache',
+    ]
+    props = RegistryConfig.config_properties
+    assert list(props) == ['url', 'port', 'debug', 'cache', 'mixed', 'alias']
+    assert props['url'] is ValidatedConfig.url
+    assert props['mixed'] is PropertyMixin.mixed
+    with raises(TypeError):
+        props['new'] = config_property('new', str)
+    by_key = RegistryConfig.config_properties_by_key
+    assert by_key['database.url'] == (RegistryConfig.url, RegistryConfig.alias)
+    assert by_key['cache'] == (RegistryConfig.cache,)
+    assert 'shadowed' not in by_key
+    assert Configuration.config_properties == {}
+
+
+class TypedEnvConfig(Configuration):
+    port = config_property('web.port', int)
+    debug = config_property('web.debug', bool)
+    ratio = config_property('web.ratio', typing.Optional[float])
+    hosts = config_property('web.hosts', typing.List[int])
+    enum = config_property('web.enum', Enum1)
+    explicit = config_property('web.explicit', int,
+                               parse_env=lambda v: int(v) * 2)
+
+
+def test_config_property_derived_parse_env():
+    c = TypedEnvConfig(environ={
+        'WEB__PORT': '8080',
+        'WEB__DEBUG': 'true',
+        'WEB__RATIO': '0.5',
+        'WEB__HOSTS__SETTEIENVLIST__0': '1',
+        'WEB__HOSTS__SETTEIENVLIST__1': '2',
+        'WEB__ENUM': 'apple',
+        'WEB__EXPLICIT': '2',
+    })
+    assert c.port == 8080
+    assert c.debug is True
+    assert c.ratio == 0.5
+    assert c.hosts == [1, 2]
+    assert c.enum is Enum1.apple
+    assert c.explicit == 4
+    assert TypedEnvConfig.port.env_parser is TypedEnvConfig.port.env_parser
+    c = TypedEnvConfig(environ={'WEB__PORT': 'http'})
+    with raises(ConfigValueError):
+        c.port
+
+
+class PoolSection(Section):
+    size = config_property('size', int)
+
+
+class DatabaseSection(Section):
+    url = config_property('url', str)
+    timeout = config_property('timeout', int, default=30)
+
+
+def test_configuration_section():
+    document = {'database': {'url': 'sqlite://', 'pool': {'size': 5}}}
+    c = TestAppConfig(document, environ={
+        'DATABASE__TIMEOUT': '10',
+        'DATABASE__POOL__OVERFLOW': '3',
+    })
+    db = c.section('database', DatabaseSection)
+    assert isinstance(db, DatabaseSection)
+    assert db.parent is c
+    assert db.conf is c.conf['database']
+    assert db.url == 'sqlite://'
+    assert db.timeout == 10
+    assert db['url'] == 'sqlite://'
+    assert db.get_path('pool.size') == 5
+    assert list(db) == ['url', 'pool']
+    pool = db.section('pool', PoolSection)
+    assert pool.size == 5
+    assert pool['overflow'] == '3'
+    assert c.section('database.pool', PoolSection).size == 5
+    env_only = c.section('cache')
+    assert env_only.conf == {}
+    with raises(ConfigKeyError):
+        env_only.get_path('host')
+    with raises(TypeError):
+        c.section('database', dict)
+
+
+def test_configuration_section_validate():
+    c = TestAppConfig({'database': {'url': 1}}, environ={})
+    with raises(ConfigValidationError) as exc_info:
+        c.section('database', DatabaseSection).validate()
+    assert list(exc_info.value.errors) == ['url']
@@ -0,0 +1,522 @@
+import copy
+import datetime
+import enum
+import pathlib
+import pickle
+import subprocess
+import sys
+import threading
+import typing
+
+from pytest import raises
+from pytoml import loads
+
+from settei.base import (ConfigCallbackError, ConfigKeyError, Configuration,
+                         config_object_property, config_property)
+from settei.document import (DigestCache, FrozenDict, Overlay, PathIndex,
+                             diff, flatten, freeze, merge_trees,
+                             override_tree, share_unchanged)
+from settei.sources import DirectorySource, Source
+
+
+def test_flatten():
+    assert dict(flatten({
+        'a': {'b': {'c': 1}, 'd': [{'e': 2}]},
+        'f': 3,
+        'g.h': 4,
+    })) == {
+        'a': {'b': {'c': 1}, 'd': [{'e': 2}]},
+        'a.b': {'c': 1},
+        'a.b.c': 1,
+        'a.d': [{'e': 2}],
+        'f': 3,
+    }
+
+
+def test_path_index():
+    document = {'a': {'b': {'c': 1}}}
+    index = PathIndex(document)
+    assert index.document is document
+    assert index['a.b.c'] == 1
+    assert 'a.b' in index
+    assert 'a.x' not in index
+    assert index.get('a.x', 2) == 2
+    assert len(index) == 3
+
+
+class SwappableSource(Source):
+
+    def __init__(self, document: typing.Mapping[str, object]) -> None:
+        self._document = document
+
+    @property
+    def document(self) -> typing.Mapping[str, object]:
+        return self._document
+
+    def __getitem__(self, key: str):
+        return self._document[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._document)
+
+    def __len__(self) -> int:
+        return len(self._document)
+
+
+class PathConfig(Configuration):
+    size = config_property('database.pool.size', int)
+
+
+def test_configuration_get_path():
+    conf = PathConfig({'database': {'pool': {'size': 5}}, 'debug': False},
+                      environ={'WEB__HOST': 'localhost'})
+    assert conf.get_path('database.pool.size') == 5
+    assert conf.get_path('debug') is False
+    assert conf.get_path('web.host') == 'localhost'
+    assert conf.get_path('database.pool.timeout', None) is None
+    with raises(ConfigKeyError):
+        conf.get_path('database.pool.timeout')
+    assert conf.get_many(['database.pool.size', 'web.host', 'x'], 0) == [
+        5, 'localhost', 0,
+    ]
+    assert conf.path_index is conf.path_index
+    assert conf.size == 5
+
+
+def test_configuration_path_index_reload():
+    source = SwappableSource({'database': {'pool': {'size': 5}}})
+    conf = PathConfig(source, environ={})
+    assert conf.get_path('database.pool.size') == 5
+    index = conf.path_index
+    source._document = {'database': {'pool': {'size': 10}}}
+    assert conf.get_path('database.pool.size') == 10
+    assert conf.size == 10
+    assert conf.path_index is not index
+
+
+def test_override_tree():
+    assert override_tree({'a.b': 1, 'a': {'c': 2}, 'd': 3}) == {
+        'a': {'b': 1, 'c': 2}, 'd': 3,
+    }
+    a = {'x': {'y': 1}, 'z': {'w': 2}}
+    merged = merge_trees(a, {'x': {'v': 3}})
+    assert merged == {'x': {'y': 1, 'v': 3}, 'z': {'w': 2}}
+    assert merged['z'] is a['z']
+    assert a == {'x': {'y': 1}, 'z': {'w': 2}}
+
+
+def test_overlay():
+    base = {'a': {'b': 1, 'c': {'d': 2}}, 'e': 3}
+    overlay = Overlay(base, {'a': {'b': 10}, 'f': 4})
+    assert overlay['a']['b'] == 10
+    assert overlay['a']['c'] is base['a']['c']
+    assert overlay['a'] is overlay['a']
+    assert overlay['e'] == 3
+    assert overlay['f'] == 4
+    assert list(overlay) == ['a', 'e', 'f']
+    assert len(overlay) == 3
+    assert dict(overlay['a']) == {'b': 10, 'c': {'d': 2}}
+    assert base['a']['b'] == 1
+
+
+def test_configuration_derive():
+    conf = PathConfig({'database': {'pool': {'size': 5}, 'url': 'sqlite://'}},
+                      environ={'WEB__HOST': 'localhost'})
+    derived = conf.derive({'database.pool.size': 20})
+    assert isinstance(derived, PathConfig)
+    assert derived.size == 20
+    assert derived['database']['url'] == 'sqlite://'
+    assert derived.get_path('web.host') == 'localhost'
+    assert conf.size == 5
+    again = derived.derive({'database.url': 'mysql://'})
+    assert again.conf.base is conf.conf
+    assert again.size == 20
+    assert again.get_path('database.url') == 'mysql://'
+    section = conf.section('database').derive({'pool.size': 30})
+    assert section.get_path('pool.size') == 30
+    assert section.parent.conf.base is conf.conf
+
+
+def test_frozen_dict():
+    d = FrozenDict({'a': 1, 'b': (2, 3)})
+    assert isinstance(d, dict)
+    assert d == {'a': 1, 'b': (2, 3)}
+    assert hash(d) == hash(FrozenDict({'b': (2, 3), 'a': 1}))
+    assert {d: 1}[FrozenDict(a=1, b=(2, 3))] == 1
+    assert copy.copy(d) is d
+    assert copy.deepcopy(d) is d
+    assert pickle.loads(pickle.dumps(d)) == d
+    for mutate in [lambda: d.__setitem__('a', 2), lambda: d.pop('a'),
+                   lambda: d.update(c=3), lambda: d.setdefault('c', 3),
+                   lambda: d.clear(), lambda: d.popitem(),
+                   lambda: d.__delitem__('a')]:
+        with raises(TypeError):
+            mutate()
+    assert d == {'a': 1, 'b': (2, 3)}
+
+
+def test_freeze():
+    document = {'a': {'b': [1, {'c': 2}]}, 'd': {3}}
+    frozen = freeze(document)
+    assert frozen == {'a': {'b': (1, {'c': 2})}, 'd': frozenset({3})}
+    assert isinstance(frozen['a'], FrozenDict)
+    assert isinstance(frozen['a']['b'][1], FrozenDict)
+    assert freeze(frozen) is frozen
+    hash(frozen)
+
+
+class FrozenConfig(Configuration):
+    table = config_property('database', dict)
+    hosts = config_property('web.hosts', typing.Sequence[str])
+
+
+def test_configuration_frozen(tmpdir):
+    path = tmpdir.join('config.toml')
+    path.write('[database]\nurl = "sqlite://"\n[web]\nhosts = ["a", "b"]\n')
+    conf = FrozenConfig.from_path(pathlib.Path(str(path)), frozen=True,
+                                  environ={'DATABASE__POOL': '3'})
+    assert isinstance(conf.conf, FrozenDict)
+    assert conf.hosts == ('a', 'b')
+    assert conf.table == {'url': 'sqlite://', 'pool': '3'}
+    assert conf.conf['database'] == {'url': 'sqlite://'}
+    assert FrozenConfig(conf.conf).conf is conf.conf
+    assert FrozenConfig(conf.conf, extra=1).conf is not conf.conf
+
+
+class UntraversableDict(dict):
+
+    def __iter__(self):
+        raise AssertionError('shared tables must not be traversed')
+
+
+def test_diff():
+    shared = UntraversableDict(x=1)
+    old = {'a': {'b': 1, 'c': 2}, 'd': 3, 'shared': shared,
+           'frozen': freeze({'y': [1, 2]}), 'table': {'z': 1}}
+    new = {'a': {'b': 1, 'c': 4}, 'e': 5, 'shared': shared,
+           'frozen': freeze({'y': [1, 2]}), 'table': 'scalar'}
+    assert diff(old, new) == ['a.c', 'd', 'e', 'table']
+    assert diff(new, new) == []
+    assert diff({}, {'a': {'b': 1}}) == ['a']
+
+
+class ReloadConfig(Configuration):
+    size = config_property('database.pool.size', int)
+    url = config_property('database.url', str)
+    debug = config_property('web.debug', bool, default=False)
+    namespace = config_object_property('web.namespace', object, cached=True)
+
+
+def test_configuration_reload():
+    conf = ReloadConfig({
+        'database': {'pool': {'size': 5}, 'url': 'sqlite://'},
+        'web': {'namespace': {'class': 'types:SimpleNamespace', 'a': 1}},
+    })
+    namespace = conf.namespace
+    calls = []
+    conf.on_change('database.*', lambda c, keys: calls.append(('db', keys)))
+    unsubscribe = conf.on_change('web.*',
+                                 lambda c, keys: calls.append(('web', keys)))
+    changes = conf.reload({
+        'database': {'pool': {'size': 10}, 'url': 'sqlite://'},
+        'web': conf.conf['web'],
+    })
+    assert changes == ['database.pool.size']
+    assert conf.size == 10
+    assert calls == [('db', ['database.pool', 'database.pool.size'])]
+    assert conf.namespace is namespace
+    del calls[:]
+    conf.reload({
+        'database': conf.conf['database'],
+        'web': {'debug': True,
+                'namespace': {'class': 'types:SimpleNamespace', 'a': 2}},
+    })
+    assert calls == [('web', ['web.debug', 'web.namespace',
+                              'web.namespace.a'])]
+    assert conf.debug
+    assert conf.namespace is not namespace
+    assert conf.namespace.a == 2
+    del calls[:]
+    unsubscribe()
+    conf.reload({'database': {'url': 'mysql://'}})
+    assert calls == [('db', ['database.pool', 'database.pool.size',
+                             'database.url'])]
+    assert conf.url == 'mysql://'
+    with raises(TypeError):
+        conf.on_change('database.*', None)
+    with raises(TypeError):
+        conf.section('database').reload({})
+
+
+def test_digest_cache():
+    cache = DigestCache()
+    shared = {'x': [1, 2.5, 'a'], 'y': {'z': True}}
+    document = {'a': shared, 'b': {3, 1, 2}}
+    digest = cache.digest(document)
+    assert digest == DigestCache().digest({'b': {1, 2, 3}, 'a': {
+        'y': {'z': True}, 'x': [1, 2.5, 'a']
+    }})
+    assert digest != DigestCache().digest({'a': shared, 'b': {1, 2}})
+    assert DigestCache().digest({'a': 1}) != DigestCache().digest({'a': '1'})
+    assert len(cache) == 4
+    assert cache.digest(document) == digest
+    shared['x'] = UntraversableDict()  # cached by identity; not rehashed
+    changed = {'a': shared, 'c': 1}
+    cache.digest(changed)
+    assert len(cache) == 4  # the root of the old document is dropped
+    cache.digest({'c': 2})
+    assert len(cache) == 1
+
+
+class Color(enum.Enum):
+    red = 'red'
+
+
+def scalar_document():
+    document = loads('at = 2018-01-02T03:04:05+09:00')
+    document.update(day=datetime.date(2018, 1, 2), color=Color.red)
+    return document
+
+
+def test_digest_cache_scalars():
+    document = scalar_document()
+    digest = DigestCache().digest(document)
+    # Digests must not depend on memory addresses, e.g. of tzinfo objects.
+    output = subprocess.check_output([
+        sys.executable, '-c',
+        'from settei.document import DigestCache\n'
+        'from tests.document_test import scalar_document\n'
+        'print(DigestCache().digest(scalar_document()))'
+    ], cwd=str(pathlib.Path(__file__).parent.parent))
+    assert output.decode().strip() == digest
+    utc = datetime.datetime(2018, 1, 1, 18, 4, 5, tzinfo=datetime.timezone.utc)
+    assert DigestCache().digest(dict(document, at=utc)) != digest
+    assert DigestCache().digest(True) != DigestCache().digest(1)
+    with raises(TypeError):
+        DigestCache().digest({'a': object()})
+
+
+class FingerprintConfig(Configuration):
+    size = config_property('database.pool.size', int, default=5)
+    url = config_property('database.url', str)
+    debug = config_property('web.debug', bool, default=False)
+
+
+def test_configuration_fingerprint_default_func():
+    calls = []
+
+    class DefaultFuncConfig(Configuration):
+        color = config_property('color', Color, default=Color.red)
+        items = config_property(
+            'items', list, default_func=lambda c: calls.append(c) or []
+        )
+
+    fingerprint = DefaultFuncConfig({}, environ={}).fingerprint()
+    assert fingerprint == DefaultFuncConfig({}, environ={}).fingerprint()
+    assert calls == []
+    assert fingerprint != DefaultFuncConfig(
+        {'items': []}, environ={}
+    ).fingerprint()
+
+
+def test_configuration_fingerprint():
+    document = {'database': {'url': 'sqlite://'}, 'web': {'host': 'a'}}
+    conf = FingerprintConfig(document, environ={})
+    fingerprint = conf.fingerprint()
+    assert fingerprint == FingerprintConfig(
+        {'web': {'host': 'a'}, 'database': {'url': 'sqlite://'}},
+        environ={'UNRELATED': '1'}
+    ).fingerprint()
+    assert fingerprint == conf.fingerprint()
+    assert FingerprintConfig(document, environ={'WEB__DEBUG': 'true'}) \
+        .fingerprint() != fingerprint
+    assert FingerprintConfig(document, environ={'WEB__DEBUG': 'false'}) \
+        .fingerprint() != fingerprint
+
+    class OtherDefault(FingerprintConfig):
+        size = config_property('database.pool.size', int, default=10)
+
+    assert OtherDefault(document, environ={}).fingerprint() != fingerprint
+    explicit = {'database': {'url': 'sqlite://', 'pool': {'size': 10}},
+                'web': document['web']}
+    assert OtherDefault(explicit, environ={}).fingerprint() == \
+        FingerprintConfig(explicit, environ={}).fingerprint()
+
+    database = conf.fingerprint('database')
+    web = conf.fingerprint('web')
+    assert conf.section('database').fingerprint() == \
+        conf.section('database').fingerprint()
+    conf.reload({'database': document['database'], 'web': {'host': 'b'}})
+    assert conf.fingerprint() != fingerprint
+    assert conf.fingerprint('database') == database
+    assert conf.fingerprint('web') != web
+    assert conf.fingerprint('missing') == conf.fingerprint('missing')
+
+
+def test_share_unchanged():
+    old = {'a': {'b': [1, 2], 'c': {'d': 'x'}}, 'e': {'f': 1}}
+    new = share_unchanged(old, {'a': {'b': [1, 2], 'c': {'d': 'y'}},
+                                'e': {'f': 1}, 'g': 2})
+    assert new == {'a': {'b': [1, 2], 'c': {'d': 'y'}}, 'e': {'f': 1},
+                   'g': 2}
+    assert new['e'] is old['e']
+    assert new['a']['b'] is old['a']['b']
+    assert old['a']['c'] == {'d': 'x'}
+    assert share_unchanged(old, copy.deepcopy(old)) is old
+    assert share_unchanged(old, {'e': {'f': True}})['e'] == {'f': True}
+    old = freeze(old)
+    frozen = share_unchanged(old, freeze({'a': {'b': [1, 2], 'c': {'d': 'x'}},
+                                         'e': {}}))
+    assert isinstance(frozen, FrozenDict)
+    assert frozen['a'] is old['a']
+
+
+def test_configuration_rollback():
+    conf = ReloadConfig({
+        'database': {'pool': {'size': 5}, 'url': 'sqlite://'},
+        'web': {'namespace': {'class': 'types:SimpleNamespace', 'a': 1}},
+    })
+    namespace = conf.namespace
+    calls = []
+    conf.on_change('*', lambda c, keys: calls.append(keys))
+    first = conf.conf
+    assert conf.history == ()
+    with raises(ValueError):
+        conf.rollback()
+    conf.reload(copy.deepcopy(first))
+    assert conf.history == ()
+    conf.reload({'database': {'pool': {'size': 10}, 'url': 'sqlite://'},
+                 'web': copy.deepcopy(first['web'])})
+    assert conf.history == (first,)
+    assert conf.conf['web'] is first['web']
+    second = conf.conf
+    conf.reload({'database': {'pool': {'size': 20}, 'url': 'mysql://'},
+                 'web': copy.deepcopy(first['web'])})
+    assert conf.history == (first, second)
+    assert conf.size == 20
+    assert conf.namespace is namespace
+    del calls[:]
+    assert conf.rollback(2) == ['database.pool.size', 'database.url']
+    assert conf.conf is first
+    assert conf.size == 5
+    assert conf.url == 'sqlite://'
+    assert conf.namespace is namespace
+    assert calls == [['database', 'database.pool', 'database.pool.size',
+                      'database.url']]
+    assert conf.history == ()
+    with raises(TypeError):
+        conf.section('database').rollback()
+
+
+def test_configuration_on_change_undeclared():
+    conf = ReloadConfig({'logging': {'root': 'INFO'}})
+    calls = []
+    conf.on_change('logging', lambda c, keys: calls.append(keys))
+    assert conf.reload({'logging': {'root': 'DEBUG'}}) == ['logging.root']
+    assert calls == [['logging']]
+
+
+def test_configuration_on_change_views():
+    conf = ReloadConfig({'database': {'url': 'sqlite://'}})
+    with raises(TypeError):
+        conf.section('database').on_change('*', print)
+    with raises(TypeError):
+        conf.derive({'database.url': 'mysql://'}).on_change('*', print)
+
+
+def test_configuration_on_change_reentrant():
+    conf = ReloadConfig({'database': {'url': 'sqlite://'}})
+    thread_calls = []
+
+    def reload_from_thread(c, keys):
+        # The lock must be released while callbacks are called.
+        unsubscribe()
+        thread = threading.Thread(target=lambda: thread_calls.append(
+            c.reload({'database': {'url': 'final://'}})
+        ))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+
+    unsubscribe = conf.on_change('database.url', reload_from_thread)
+    conf.reload({'database': {'url': 'mysql://'}})
+    assert thread_calls == [['database.url']]
+    assert conf.url == 'final://'
+
+
+def test_configuration_on_change_errors():
+    conf = ReloadConfig({'database': {'url': 'sqlite://'}})
+    calls = []
+
+    def fail(c, keys):
+        raise ValueError(keys[0])
+
+    conf.on_change('database', fail)
+    conf.on_change('database.url', fail)
+    conf.on_change('*', lambda c, keys: calls.append(keys))
+    with raises(ConfigCallbackError) as e:
+        conf.reload({'database': {'url': 'mysql://'}})
+    assert [str(error) for error in e.value.errors] == [
+        'database', 'database.url'
+    ]
+    assert isinstance(e.value.__cause__, ValueError)
+    assert calls == [['database', 'database.url']]
+    assert conf.url == 'mysql://'
+
+
+class ShortHistoryConfig(ReloadConfig):
+    history_size = 2
+
+
+def test_configuration_history_size():
+    conf = ShortHistoryConfig({'database': {'pool': {'size': 0}}})
+    for size in range(1, 5):
+        conf.reload({'database': {'pool': {'size': size}}})
+    assert [d['database']['pool']['size'] for d in conf.history] == [2, 3]
+    conf.rollback()
+    assert conf.size == 3
+
+
+def test_configuration_rollback_directory_source(tmpdir):
+    good = tmpdir.mkdir('good')
+    good.mkdir('database').join('url').write('sqlite://')
+    other = tmpdir.mkdir('other')
+    other.mkdir('database').join('url').write('mysql://')
+    conf = ReloadConfig(DirectorySource(str(good)))
+    assert conf.url == 'sqlite://'
+    assert conf.reload(DirectorySource(str(other))) == ['database.url']
+    assert conf.url == 'mysql://'
+    good.join('database', 'url').write('mysql://bad')
+    assert conf.rollback() == ['database.url']
+    assert conf.url == 'sqlite://'
+
+
+def test_configuration_rollback_derived():
+    base = loads('''
+[database]
+url = "sqlite://"
+[schedule]
+start = 2018-01-02T03:04:05+09:00
+''')
+    derived = ReloadConfig(base).derive({'database.pool.size': 10})
+    overlay = derived.conf
+    base = overlay.base
+    reloaded = Overlay(base, {'database': {'pool': {'size': 20}}})
+    assert derived.reload(reloaded) == ['database.pool.size']
+    assert derived.history == (overlay,)
+    assert derived.history[0] is overlay
+    assert derived.rollback() == ['database.pool.size']
+    assert derived.size == 10
+    assert derived['schedule']['start'] is base['schedule']['start']
+
+
+def test_configuration_rollback_overlay_directory_source(tmpdir):
+    tmpdir.mkdir('database').join('url').write('sqlite://')
+    conf = ReloadConfig(DirectorySource(str(tmpdir))).derive(
+        {'database.pool.size': 10}
+    )
+    conf.reload({'database': {'pool': {'size': 20}, 'url': 'mysql://'}})
+    tmpdir.join('database', 'url').write('mysql://bad')
+    assert conf.rollback() == ['database.pool.size', 'database.url']
+    assert conf.url == 'sqlite://'
+    assert conf.size == 10
@@ -0,0 +1,103 @@
+import io
+import os
+import pathlib
+
+from pytest import raises
+
+from settei.base import Configuration, config_property
+from settei.dotenv import DotEnvSyntaxError, iter_dotenv, load_dotenv
+from settei.environ import FrozenEnvironment
+from settei.parse_env import EnvReader, parse_int
+
+DOTENV = r'''
+# comment
+DATABASE__URL=postgresql://localhost/app
+export WEB__DEBUG = true   # inline comment
+WEB__FRAGMENT=a#b
+EMPTY=
+COMMENT_ONLY= # nothing
+SINGLE='literal \n $x'  # comment
+DOUBLE="tab\there \"quoted\" \\"
+MULTI="first line
+second line"
+MULTI_SINGLE='a
+b'
+NUMBERS__LIST__SETTEIENVLIST__0=1
+NUMBERS__LIST__SETTEIENVLIST__1=2
+'''
+
+
+class DotEnvConfig(Configuration):
+
+    url = config_property('database.url', str)
+    debug = config_property('web.debug', str)
+    multi = config_property('multi', str)
+    numbers = config_property(
+        'numbers.list', list,
+        parse_env=lambda values: [parse_int(v) for v in values]
+    )
+
+
+def test_iter_dotenv():
+    assert list(iter_dotenv(io.StringIO(DOTENV))) == [
+        ('DATABASE__URL', 'postgresql://localhost/app'),
+        ('WEB__DEBUG', 'true'),
+        ('WEB__FRAGMENT', 'a#b'),
+        ('EMPTY', ''),
+        ('COMMENT_ONLY', ''),
+        ('SINGLE', 'literal \\n $x'),
+        ('DOUBLE', 'tab\there "quoted" \\'),
+        ('MULTI', 'first line\nsecond line'),
+        ('MULTI_SINGLE', 'a\nb'),
+        ('NUMBERS__LIST__SETTEIENVLIST__0', '1'),
+        ('NUMBERS__LIST__SETTEIENVLIST__1', '2'),
+    ]
+
+
+def test_iter_dotenv_streaming():
+    def lines():
+        yield 'A=1\n'
+        raise AssertionError('read too much')
+    assert next(iter_dotenv(lines())) == ('A', '1')
+
+
+def test_iter_dotenv_syntax_error():
+    with raises(DotEnvSyntaxError) as ex:
+        list(iter_dotenv(['A=1\n', 'not a pair\n']))
+    assert ex.value.lineno == 2
+    with raises(DotEnvSyntaxError) as ex:
+        list(iter_dotenv(['A="unterminated\n', 'value\n']))
+    assert ex.value.lineno == 1
+    with raises(DotEnvSyntaxError):
+        list(iter_dotenv(['A="quoted" trailing\n']))
+
+
+def test_load_dotenv(tmpdir):
+    path = tmpdir.join('.env')
+    path.write('A=1\nA=2\nB=3\n')
+    expected = {'A': '2', 'B': '3'}
+    assert load_dotenv(path.strpath) == expected
+    assert load_dotenv(pathlib.Path(path.strpath)) == expected
+    with path.open() as f:
+        assert load_dotenv(f) == expected
+    environ = load_dotenv(path.strpath)
+    assert isinstance(environ, FrozenEnvironment)
+    assert list(environ.keys_with_prefix('A')) == ['A']
+
+
+def test_dotenv_environ():
+    environ = load_dotenv(io.StringIO(DOTENV))
+    before = dict(os.environ)
+    reader = EnvReader(environ=environ)
+    assert reader['database']['url'] == 'postgresql://localhost/app'
+    assert reader['database'] is reader['database'], 'cached'
+    assert reader['numbers']['list'] == ['1', '2']
+    c1 = DotEnvConfig(environ=environ)
+    c2 = DotEnvConfig({'web': {'debug': 'false'}}, environ=environ)
+    assert c1.url == c2.url == 'postgresql://localhost/app'
+    assert c1.debug == 'true'
+    assert c2.debug == 'false'
+    assert c1.multi == 'first line\nsecond line'
+    assert c1.numbers == [1, 2]
+    assert dict(os.environ) == before
+    assert 'url' not in DotEnvConfig({}, environ={})
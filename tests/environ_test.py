@@ -0,0 +1,123 @@
+import os
+
+from .utils import os_environ
+from settei.base import Configuration, config_property
+from settei.environ import (Environment, FrozenEnvironment, LiveEnvironment,
+                            PrefixedEnvironment, as_environment)
+from settei.parse_env import EnvReader
+
+
+class EnvironConfig(Configuration):
+
+    url = config_property('database.url', str)
+    hosts = config_property('database.hosts', list)
+
+
+def synthetic_environ(size: int):
+    environ = {
+        'UNRELATED{0:05d}__KEY'.format(i): str(i) for i in range(size)
+    }
+    environ.update({
+        'DATABASE__URL': 'sqlite://',
+        'DATABASE__HOSTS__SETTEIENVLIST__0': 'a',
+        'DATABASE__HOSTS__SETTEIENVLIST__1': 'b',
+    })
+    return environ
+
+
+def test_as_environment():
+    assert isinstance(as_environment(None), LiveEnvironment)
+    assert as_environment(None).environ is os.environ
+    frozen = FrozenEnvironment({})
+    assert as_environment(frozen) is frozen
+    live = as_environment({'A': '1'})
+    assert isinstance(live, Environment)
+    assert live['A'] == '1'
+
+
+def test_live_environment():
+    environ = LiveEnvironment()
+    with os_environ({'SETTEI_TEST__A': '1', 'SETTEI_TEST__B': '2'}):
+        assert sorted(environ.keys_with_prefix('SETTEI_TEST__')) == [
+            'SETTEI_TEST__A', 'SETTEI_TEST__B',
+        ]
+        assert environ['SETTEI_TEST__A'] == '1'
+    assert 'SETTEI_TEST__A' not in environ
+
+
+def test_frozen_environment():
+    environ = FrozenEnvironment({'AB': '1', 'A': '2', 'B': '3', 'AC': '4',
+                                 'A\uffff': '5'})
+    assert list(environ) == ['A', 'AB', 'AC', 'A\uffff', 'B']
+    assert environ.keys_with_prefix('A') == ['A', 'AB', 'AC', 'A\uffff']
+    assert environ.keys_with_prefix('AB') == ['AB']
+    assert environ.keys_with_prefix('C') == []
+    assert environ.snapshot() is environ
+    with os_environ({'SETTEI_TEST__A': '1'}):
+        snapshot = LiveEnvironment().snapshot()
+    assert snapshot['SETTEI_TEST__A'] == '1'
+    assert 'SETTEI_TEST__A' not in os.environ
+
+
+def test_configuration_frozen_environment():
+    with os_environ({'DATABASE__URL': 'postgresql://'}):
+        conf = EnvironConfig(environ=FrozenEnvironment())
+    with os_environ({'DATABASE__URL': 'mysql://'}):
+        assert conf.url == 'postgresql://'
+        assert EnvironConfig().url == 'mysql://'
+
+
+def test_synthetic_environment():
+    environ = FrozenEnvironment(synthetic_environ(50000))
+    conf = EnvironConfig(environ=environ)
+    assert conf.url == 'sqlite://'
+    assert conf.hosts == ['a', 'b']
+    assert EnvReader(environ=environ)['database']['url'] == 'sqlite://'
+    assert 'DATABASE__URL' not in os.environ
+
+
+class PrefixedConfig(EnvironConfig):
+
+    env_prefix = 'MYAPP'
+
+
+def test_env_prefix():
+    environ = synthetic_environ(1000)
+    environ.update({
+        'MYAPP__DATABASE__URL': 'postgresql://',
+        'MYAPP__DATABASE__HOSTS__SETTEIENVLIST__0': 'c',
+    })
+    conf = PrefixedConfig(environ=environ)
+    assert len(conf.environ) == 2
+    assert conf.url == 'postgresql://'
+    assert conf.hosts == ['c']
+    assert conf['database']['url'] == 'postgresql://'
+    unprefixed = EnvironConfig(environ=environ)
+    assert unprefixed.url == 'sqlite://'
+    assert PrefixedConfig({'database': {'url': 'mysql://'}},
+                          environ={'DATABASE__URL': 'sqlite://'}).url == \
+        'mysql://'
+
+
+def test_env_prefix_live():
+    environ = {'MYAPP__DATABASE__URL': 'postgresql://'}
+    conf = PrefixedConfig(environ=environ)
+    assert isinstance(conf.environ, PrefixedEnvironment)
+    assert conf.url == 'postgresql://'
+    environ['MYAPP__DATABASE__URL'] = 'mysql://'
+    assert conf.url == 'mysql://'
+    frozen = PrefixedConfig(environ=FrozenEnvironment(environ))
+    assert isinstance(frozen.environ, FrozenEnvironment)
+    environ['MYAPP__DATABASE__URL'] = 'sqlite:///changed'
+    assert frozen.url == 'mysql://'
+
+
+def test_env_prefix_delimiter():
+    class DelimitedConfig(EnvironConfig):
+        env_prefix = 'myapp__'
+    conf = DelimitedConfig(environ=FrozenEnvironment({
+        'MYAPP__DATABASE__URL': 'postgresql://',
+    }))
+    assert conf.url == 'postgresql://'
+    assert FrozenEnvironment({'A__B': '1', 'AB': '2'}).with_prefix('A__') == \
+        {'B': '1'}
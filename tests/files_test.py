@@ -0,0 +1,97 @@
+import os
+import typing
+
+from pytest import raises
+
+from settei.base import (ConfigTypeError, Configuration, ConfigValueError,
+                         config_property)
+from settei.files import FileReference
+
+
+class FileConfig(Configuration):
+
+    cert = config_property('tls.cert', str, file_ref=True)
+    key = config_property('tls.key', bytes, file_ref=True)
+    blob = config_property('blob', typing.Union[memoryview, str],
+                           file_ref=True)
+    not_ref = config_property('not_ref', str)
+    wrong_type = config_property('wrong_type', int, file_ref=True)
+
+
+def test_file_reference(tmpdir):
+    path = tmpdir.join('small.txt')
+    path.write_binary('안녕'.encode('utf-8'))
+    ref = FileReference(path.strpath)
+    assert not ref.mmapped
+    assert ref.as_text() == '안녕'
+    assert ref.as_text() is ref.as_text()
+    assert ref.as_bytes() == '안녕'.encode('utf-8')
+    assert ref.as_memoryview().readonly
+    assert ref.as_memoryview().tobytes() == ref.as_bytes()
+    path.write_binary(b'changed!')
+    os.utime(path.strpath, ns=(0, 0))
+    assert ref.as_text() == 'changed!'
+
+
+def test_file_reference_mmap(tmpdir):
+    path = tmpdir.join('large.bin')
+    path.write_binary(b'x' * 4096)
+    ref = FileReference(path.strpath, mmap_threshold=1024)
+    assert ref.mmapped
+    view = ref.as_memoryview()
+    assert view.readonly
+    assert len(view) == 4096
+    assert ref.as_bytes() == b'x' * 4096
+    assert ref.as_bytes() is ref.as_bytes()
+    assert ref.load(str) == 'x' * 4096
+    new_path = tmpdir.join('large.bin.new')
+    new_path.write_binary(b'y' * 2048)
+    os.replace(new_path.strpath, path.strpath)
+    assert ref.as_bytes() == b'y' * 2048
+    assert view[0] == ord('x'), 'views made before are still valid'
+
+
+def test_config_property_file_ref(tmpdir):
+    cert = tmpdir.join('cert.pem')
+    cert.write('CERT')
+    key = tmpdir.join('key.pem')
+    key.write_binary(b'KEY')
+    conf = FileConfig({
+        'tls': {
+            'cert': 'file:' + cert.strpath,
+            'key': 'file:' + key.strpath,
+        },
+        'blob': 'file:' + key.strpath,
+        'not_ref': 'file:' + cert.strpath,
+        'wrong_type': 'file:' + cert.strpath,
+    })
+    assert conf.cert == 'CERT'
+    assert conf.key == b'KEY'
+    assert isinstance(conf.blob, memoryview)
+    assert conf.blob.tobytes() == b'KEY'
+    assert conf.not_ref == 'file:' + cert.strpath
+    with raises(ConfigTypeError):
+        conf.wrong_type
+    cert.write('RENEWED')
+    os.utime(cert.strpath, ns=(0, 0))
+    assert conf.cert == 'RENEWED'
+    inline = FileConfig({'tls': {'cert': 'INLINE'}})
+    assert inline.cert == 'INLINE'
+    missing_path = tmpdir.join('missing.pem').strpath
+    missing = FileConfig({'tls': {'cert': 'file:' + missing_path}})
+    with raises(ConfigValueError):
+        missing.cert
+    binary = FileConfig({'tls': {'cert': 'file:' + key.strpath}})
+    key.write_binary(b'\xff\xfe')
+    with raises(ConfigValueError):
+        binary.cert
+
+
+def test_config_property_file_ref_cache(tmpdir):
+    prop = FileConfig.cert
+    for i in range(prop.FILE_REF_CACHE_SIZE + 10):
+        path = tmpdir.join('{0}.pem'.format(i))
+        path.write(str(i))
+        conf = FileConfig({'tls': {'cert': 'file:' + path.strpath}})
+        assert conf.cert == str(i)
+    assert len(prop._file_references) == prop.FILE_REF_CACHE_SIZE
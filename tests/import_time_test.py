@@ -0,0 +1,57 @@
+import subprocess
+import sys
+import typing
+
+from pytest import mark
+
+#: Modules which are heavy to import, and have to be imported only when
+#: the feature depending on them is used.
+HEAVY_MODULES = frozenset({
+    'celery', 'kombu', 'logging.config', 'pytoml', 'typeguard', 'werkzeug',
+})
+
+#: (:class:`float`) The import time budget in seconds.  It's intentionally
+#: generous to not be flaky on slow CI machines; what it's guarding is not
+#: a few milliseconds but heavy dependencies sneaking into the import graph.
+IMPORT_TIME_BUDGET = 0.15
+
+
+def import_times(module: str) -> typing.Mapping[str, int]:
+    """Import the given ``module`` in a fresh interpreter and return its
+    ``-X importtime`` report as a mapping of module names to cumulative
+    microseconds.
+
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True
+    )
+    result = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        try:
+            result[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # the header line
+    return result
+
+
+@mark.skipif(sys.version_info < (3, 7), reason='-X importtime is 3.7+')
+@mark.parametrize('module', [
+    'settei',
+    'settei.presets.celery',
+    'settei.presets.flask',
+    'settei.presets.logging',
+])
+def test_import_time(module: str):
+    times = import_times(module)
+    assert module in times
+    heavy = {
+        name for name in times
+        if name in HEAVY_MODULES or name.split('.', 1)[0] in HEAVY_MODULES
+    }
+    assert not heavy, 'imported eagerly: ' + ', '.join(sorted(heavy))
+    assert times[module] / 1e6 < IMPORT_TIME_BUDGET
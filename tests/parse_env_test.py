@@ -1,12 +1,18 @@
+import array
+import enum
 import os
+import time
+import typing
 import uuid
 
 from pytest import mark, raises
 from typeguard import typechecked
 
 from .utils import os_environ
+from settei.environ import FrozenEnvironment
 from settei.parse_env import (
-    EnvReader, parse_bool, parse_float, parse_int, parse_uuid,
+    EnvReader, derive_parser, parse_bool, parse_csv, parse_float, parse_int,
+    parse_json, parse_list, parse_mapping, parse_uuid,
 )
 
 
@@ -164,3 +170,161 @@ def test_env_reader_asterisk_setteienvlist():
         }
     ):
         assert d['a'] == ((['arg1'],), 'arg2')
+
+
+def test_env_reader_list_numeric_order():
+    environ = {
+        'A__SETTEIENVLIST__{0}'.format(i): str(i) for i in range(12)
+    }
+    environ['B__ASTERISK__10'] = 'y'
+    environ['B__ASTERISK__2'] = 'x'
+    environ['C__SETTEIENVLIST__0__HOST'] = 'a'
+    environ['C__SETTEIENVLIST__0__PORTS__SETTEIENVLIST__0'] = '1'
+    environ['C__SETTEIENVLIST__1__HOST'] = 'b'
+    d = EnvReader(environ=environ)
+    assert d['a'] == [str(i) for i in range(12)]
+    assert d['b'] == ('x', 'y')
+    assert d['c'] == [{'host': 'a', 'ports': ['1']}, {'host': 'b'}]
+
+
+@mark.parametrize('environ', [
+    {'A__SETTEIENVLIST__X': 'a'},
+    {'A__SETTEIENVLIST__-1': 'a'},
+    {'A__SETTEIENVLIST__': 'a'},
+    {'A__SETTEIENVLIST__1': 'a', 'A__SETTEIENVLIST__01': 'b'},
+    {'A__SETTEIENVLIST__0': 'a', 'A__SETTEIENVLIST__0__B': 'b'},
+    {'A__SETTEIENVLIST__0__ASTERISK__0': 'a',
+     'A__SETTEIENVLIST__0__B': 'b'},
+])
+def test_env_reader_list_invalid_index(environ: typing.Mapping[str, str]):
+    with raises(ValueError):
+        EnvReader(environ=environ)['a']
+
+
+#: (:class:`float`) The time budget in seconds to build a 10k-element list.
+#: It's intentionally generous to not be flaky on slow CI machines.
+LARGE_LIST_BUDGET = 0.5
+
+
+@mark.parametrize('marker', ['SETTEIENVLIST', 'ASTERISK'])
+def test_env_reader_large_list_benchmark(marker: str):
+    size = 10000
+    environ = FrozenEnvironment({
+        'A__{0}__{1}'.format(marker, i): str(i) for i in range(size)
+    })
+    reader = EnvReader(environ=environ)
+    started = time.perf_counter()
+    result = reader['a']
+    elapsed = time.perf_counter() - started
+    assert list(result) == [str(i) for i in range(size)]
+    assert elapsed < LARGE_LIST_BUDGET
+
+
+def test_env_reader_cached_children():
+    environ = FrozenEnvironment({
+        'A__B__C': 'c',
+        'A__B__D__SETTEIENVLIST__0': 'd',
+    })
+    reader = EnvReader(environ=environ)
+    child = reader['a']
+    assert reader['a'] is child
+    assert child['b'] is child['b']
+    assert child['b']['c'] == 'c'
+    assert child['b']['d'] == ['d']
+    live = EnvReader(environ={'A__B__C': 'c'})
+    assert live['a'] is not live['a']
+    assert live['a']['b']['c'] == 'c'
+
+
+class Level(enum.Enum):
+    low = 1
+    high = 2
+
+
+@mark.parametrize('type_, value, expected', [
+    (int, '42', 42),
+    (float, '0.5', 0.5),
+    (bool, 'yes', True),
+    (uuid.UUID, '4a7d2e7a-6b5c-4b5e-8c9a-0e7f9c1f3e2d',
+     uuid.UUID('4a7d2e7a-6b5c-4b5e-8c9a-0e7f9c1f3e2d')),
+    (Level, '2', Level.high),
+    (Level, 'low', Level.low),
+    (typing.Optional[int], '1', 1),
+    (typing.Union[int, float], '1.5', 1.5),
+    (typing.Union[int, str], 'abc', 'abc'),
+    (typing.List[int], ['1', '2'], [1, 2]),
+    (typing.Sequence[float], ('1', '2.5'), (1.0, 2.5)),
+    (typing.Tuple[int, ...], ['1', '2'], (1, 2)),
+    (typing.List[typing.Optional[Level]], ['1'], [Level.low]),
+])
+def test_derive_parser(type_, value, expected):
+    assert derive_parser(type_)(value) == expected
+
+
+@mark.parametrize('type_', [
+    str, dict, typing.List[str], typing.Dict[str, int],
+    typing.Tuple[int, str], typing.Optional[str],
+])
+def test_derive_parser_none(type_):
+    assert derive_parser(type_) is None
+
+
+def test_derive_parser_error():
+    with raises(ValueError):
+        derive_parser(int)('abc')
+    with raises(ValueError):
+        derive_parser(typing.Union[int, float])('abc')
+
+
+def test_parse_list():
+    assert parse_list()('a, b,c') == ['a', 'b', 'c']
+    assert parse_list()('') == []
+    assert parse_list(parse_int)('1, 2,3') == [1, 2, 3]
+    assert parse_list(parse_int)(['1', '2']) == [1, 2]
+    assert parse_list(parse_bool, separator=':')('yes:no') == [True, False]
+    assert parse_list(float, container=tuple)('0.5,1') == (0.5, 1.0)
+    ports = parse_list(parse_int, typecode='l')('80,443')
+    assert isinstance(ports, array.array)
+    assert ports == array.array('l', [80, 443])
+    with raises(ValueError):
+        parse_list(parse_int)('1,a')
+    with raises(ValueError):
+        parse_list(typecode='?')
+    with raises(TypeError):
+        parse_list(container=set)
+
+
+def test_parse_list_large():
+    size = 5000
+    parse = parse_list(parse_int, typecode='l')
+    started = time.perf_counter()
+    ports = parse(','.join(str(i) for i in range(size)))
+    assert time.perf_counter() - started < LARGE_LIST_BUDGET
+    assert list(ports) == list(range(size))
+
+
+def test_parse_csv():
+    assert parse_csv()('"a, b",c') == ['a, b', 'c']
+    assert parse_csv(parse_int, delimiter=';')('1;2') == [1, 2]
+    assert parse_csv()('') == []
+
+
+def test_parse_mapping():
+    parse = parse_mapping(parse_value=parse_float)
+    assert parse('a=1, b=2.5,') == {'a': 1.0, 'b': 2.5}
+    assert parse({'a': '1'}) == {'a': 1.0}
+    assert parse_mapping(parse_int, separator=';', key_separator=':')(
+        '1:a;2:b'
+    ) == {1: 'a', 2: 'b'}
+    with raises(ValueError):
+        parse('a')
+
+
+def test_parse_json():
+    assert parse_json()('{"a": [1, 2]}') == {'a': [1, 2]}
+    parse = parse_json(typing.Mapping[str, float])
+    assert parse('{"a": 1.5}') == {'a': 1.5}
+    with raises(ValueError):
+        parse('{"a": "b"}')
+    with raises(ValueError):
+        parse('{')
@@ -36,6 +36,15 @@ def test_worker_config_without_result_backend():
             conf.worker_result_backend is None)
 
 
+def test_worker_config_reload():
+    conf = WorkerConfiguration({'worker': {'broker_url': 'redis://'}})
+    assert conf.worker_config['BROKER_URL'] == 'redis://'
+    conf.reload({'worker': {'broker_url': 'amqp://'}})
+    assert conf.worker_config['BROKER_URL'] == 'amqp://'
+    conf.rollback()
+    assert conf.worker_config['BROKER_URL'] == 'redis://'
+
+
 def test_worker_on_loaded():
     conf = WorkerConfiguration({
         'worker': {
@@ -33,6 +33,27 @@ def test_web_config():
     assert conf.web_config['SECRET_KEY'] == 'asdf'
 
 
+def test_web_config_reload():
+    conf = WebConfiguration({'web': {'secret_key': 'old'}})
+    assert conf.web_config['SECRET_KEY'] == 'old'
+    conf.reload({'web': {'secret_key': 'new'}})
+    assert conf.web_config['SECRET_KEY'] == 'new'
+    conf.rollback()
+    assert conf.web_config['SECRET_KEY'] == 'old'
+
+
+def test_web_config_on_change():
+    conf = WebConfiguration({'web': {'secret_key': 'old'}})
+    assert conf.web_config['SECRET_KEY'] == 'old'
+    seen = []
+    conf.on_change('web', lambda c, keys: seen.append(
+        c.web_config['SECRET_KEY']
+    ))
+    conf.reload({'web': {'secret_key': 'new'}})
+    conf.rollback()
+    assert seen == ['new', 'old']
+
+
 def test_web_on_loaded():
     conf = WebConfiguration({
         'web': {
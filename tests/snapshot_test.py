@@ -0,0 +1,175 @@
+import datetime
+import enum
+import importlib.util
+import pathlib
+import types
+import uuid
+
+from pytest import mark, raises
+
+from .utils import os_environ
+from settei.__main__ import main
+from settei.base import Configuration, config_object_property, config_property
+from settei.parse_env import parse_int
+from settei.snapshot import (compile_snapshot, load_snapshot,
+                             render_snapshot_value)
+
+
+class Color(enum.Enum):
+    red = 'red'
+    blue = 'blue'
+
+
+class OffsetTimezone(datetime.tzinfo):
+    """Like TOML parsers' time zones, it cannot be deep-copied."""
+
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=9)
+
+    def __deepcopy__(self, memo):
+        raise TypeError('cannot be copied')
+
+
+class Impl:
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+class SnapshotConfig(Configuration):
+
+    url = config_property('database.url', str)
+    pool = config_property('database.pool', int, parse_env=parse_int)
+    color = config_property('color', Color)
+    debug = config_property('debug', bool, default=False)
+    obj = config_object_property('obj', Impl)
+
+
+def load_module(path: pathlib.Path) -> types.ModuleType:
+    spec = importlib.util.spec_from_file_location('snapshot_mod', str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_render_snapshot_value():
+    for value in [None, True, 1, 1.5, 'a', b'b', [1, (2,)], {'a': {'b': ()}},
+                  uuid.uuid4(), datetime.date(2020, 1, 2),
+                  datetime.datetime(2020, 1, 2, 3, 4, 5),
+                  datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.
+                                    timezone(datetime.timedelta(hours=9)))]:
+        assert eval(render_snapshot_value(value)) == value
+    with raises(ValueError):
+        render_snapshot_value(object())
+    with raises(ValueError):
+        render_snapshot_value(float('nan'))
+
+
+def test_compile_snapshot():
+    with os_environ({'DATABASE__POOL': '5'}):
+        conf = SnapshotConfig({
+            'database': {'url': 'sqlite://'},
+            'color': 'red',
+            'obj': {'class': __name__ + ':Impl', 'a': 1},
+        })
+        document, values, errors = compile_snapshot(conf)
+    assert not errors
+    assert document == {
+        'database': {'url': 'sqlite://', 'pool': 5},
+        'color': 'red',
+        'obj': {'class': __name__ + ':Impl', 'a': 1},
+    }
+    assert values == {
+        'url': 'sqlite://', 'pool': 5, 'color': Color.red, 'debug': False,
+    }
+    loaded = load_snapshot(__name__ + ':SnapshotConfig', document, values)
+    with os_environ({'DATABASE__POOL': '6', 'DEBUG': 'true'}):
+        assert loaded.pool == 5
+        assert 'debug' not in loaded, 'runtime environ is ignored'
+    assert loaded.color is Color.red
+    assert loaded.obj.kwargs == {'a': 1}
+
+
+def test_compile_snapshot_errors():
+    conf = SnapshotConfig({
+        'database': {'pool': 'five'},
+        'color': 'green',
+        'obj': {'class': 'not a path'},
+    })
+    _, _, errors = compile_snapshot(conf)
+    assert len(errors) == 4
+
+
+def test_compile_command(tmpdir, capsys):
+    config = tmpdir.join('config.toml')
+    config.write('''
+    color = "blue"
+
+    [database]
+    url = "postgresql:///app"
+    pool = 3
+
+    [obj]
+    class = "{0}:Impl"
+    '''.format(__name__))
+    output = tmpdir.join('settings_snapshot.py')
+    assert main([
+        'compile', config.strpath, '--class', __name__ + ':SnapshotConfig',
+        '-o', output.strpath,
+    ]) == 0
+    module = load_module(pathlib.Path(output.strpath))
+    conf = module.configuration
+    assert isinstance(conf, SnapshotConfig)
+    assert conf.url == 'postgresql:///app'
+    assert conf.pool == 3
+    assert conf.color is Color.blue
+    assert conf.__dict__['color'] is Color.blue
+    assert isinstance(conf.obj, Impl)
+
+
+def test_compile_command_error(tmpdir, capsys):
+    config = tmpdir.join('config.toml')
+    config.write('color = "green"\n')
+    assert main([
+        'compile', config.strpath, '--class', __name__ + ':SnapshotConfig',
+    ]) == 1
+    err = capsys.readouterr().err
+    assert 'ConfigKeyError' in err
+    assert 'ConfigTypeError' in err
+
+
+def test_compile_snapshot_shares_tables():
+    at = datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=OffsetTimezone())
+    document = {
+        'database': {'url': 'sqlite://'},
+        'color': 'red',
+        'obj': {'class': __name__ + ':Impl'},
+        'schedule': {'at': at},
+    }
+    with os_environ({'DATABASE__POOL': '5'}):
+        conf = SnapshotConfig(document)
+        compiled, _, errors = compile_snapshot(conf)
+    assert not errors
+    assert compiled['database'] == {'url': 'sqlite://', 'pool': 5}
+    assert document['database'] == {'url': 'sqlite://'}, 'not mutated'
+    assert compiled['schedule'] is document['schedule']
+    assert compiled['schedule']['at'] is at
+
+
+@mark.parametrize('content', ['color = ', b'color = "\xff"'])
+def test_compile_command_invalid_file(tmpdir, capsys, content):
+    config = tmpdir.join('config.toml')
+    config.write(content, mode='wb' if isinstance(content, bytes) else 'w')
+    assert main([
+        'compile', config.strpath, '--class', __name__ + ':SnapshotConfig',
+    ]) == 2
+    assert capsys.readouterr().err.startswith('error: failed to load ')
+
+
+def test_compile_command_missing_file(tmpdir, capsys):
+    assert main([
+        'compile', tmpdir.join('missing.toml').strpath,
+        '--class', __name__ + ':SnapshotConfig',
+    ]) == 2
+    assert capsys.readouterr().err.startswith('error: failed to load ')
@@ -0,0 +1,217 @@
+import http.server
+import os
+import pathlib
+import socketserver
+import threading
+import time
+
+from pytest import fixture, raises
+
+from settei.base import Configuration, config_property
+from settei.sources import DirectorySource, RemoteSource
+
+
+class DirectoryConfig(Configuration):
+
+    debug = config_property('debug', str)
+    url = config_property('database.url', str)
+    pool_size = config_property('database.pool_size', str, default='5')
+
+
+def make_tree(root: pathlib.Path) -> None:
+    (root / 'database').mkdir()
+    (root / 'debug').write_text('true\n')
+    (root / 'database' / 'url').write_text('sqlite://')
+    (root / '.hidden').write_text('hidden')
+
+
+def test_directory_source(tmpdir):
+    root = pathlib.Path(tmpdir.strpath)
+    make_tree(root)
+    source = DirectorySource(root)
+    assert source['debug'] == 'true'
+    assert isinstance(source['database'], DirectorySource)
+    assert source['database']['url'] == 'sqlite://'
+    assert list(source) == ['database', 'debug']
+    assert len(source) == 2
+    assert 'debug' in source
+    assert '.hidden' not in source
+    assert 'missing' not in source
+    for key in '.hidden', 'missing', '../debug', '':
+        with raises(KeyError):
+            source[key]
+    assert DirectorySource(root, strip=False)['debug'] == 'true\n'
+
+
+def test_directory_source_reread_on_change(tmpdir):
+    root = pathlib.Path(tmpdir.strpath)
+    make_tree(root)
+    source = DirectorySource(root)
+    path = root / 'debug'
+    assert source['debug'] == 'true'
+    path.write_text('false')
+    os.utime(str(path), ns=(0, 0))
+    assert source['debug'] == 'false'
+    path.unlink()
+    with raises(KeyError):
+        source['debug']
+
+
+def swap_data(root: pathlib.Path, version: str, value: str) -> None:
+    data = root / ('..' + version)
+    data.mkdir()
+    (data / 'key').write_text(value)
+    tmp_link = root / '..data_tmp'
+    tmp_link.symlink_to(data.name)
+    os.replace(str(tmp_link), str(root / '..data'))
+
+
+def test_directory_source_watch(tmpdir):
+    root = pathlib.Path(tmpdir.strpath)
+    swap_data(root, 'v1', 'one')
+    (root / 'key').symlink_to('..data/key')
+    source = DirectorySource(root, watch=True, interval=0)
+    assert list(source) == ['key']
+    assert source['key'] == 'one'
+    swap_data(root, 'v2', 'two')
+    assert source['key'] == 'two'
+    slow = DirectorySource(root, watch=True, interval=3600)
+    assert slow['key'] == 'two'
+    swap_data(root, 'v3', 'three')
+    assert slow['key'] == 'two', 'not checked until the interval passes'
+    slow._checked_at = time.monotonic() - 3600
+    assert slow['key'] == 'three'
+
+
+def test_configuration_from_directory(tmpdir):
+    root = pathlib.Path(tmpdir.strpath)
+    make_tree(root)
+    conf = DirectoryConfig.from_directory(root)
+    assert isinstance(conf.conf, DirectorySource)
+    assert conf.debug == 'true'
+    assert conf.url == 'sqlite://'
+    assert conf.pool_size == '5'
+    (root / 'database' / 'pool_size').write_text('10')
+    assert conf.pool_size == '10'
+
+
+class ConfigServiceHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.client_address, dict(self.headers)))
+        if server.fail:
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = '"{0}"'.format(server.version)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = server.body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', server.content_type)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ConfigServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ConfigServiceHandler)
+        self.requests = []
+        self.fail = False
+        self.version = 1
+        self.content_type = 'application/toml'
+        self.body = '[database]\nurl = "sqlite://"\n'
+
+    @property
+    def url(self) -> str:
+        return 'http://{0}:{1}/config'.format(*self.server_address)
+
+
+@fixture
+def config_server():
+    server = ConfigServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_source(config_server: ConfigServer):
+    with RemoteSource(config_server.url, interval=None) as source:
+        assert source['database']['url'] == 'sqlite://'
+        assert not source.refresh(), 'not modified'
+        assert config_server.requests[-1][1]['If-None-Match'] == '"1"'
+        config_server.version = 2
+        config_server.content_type = 'application/json; charset=utf-8'
+        config_server.body = '{"database": {"url": "postgresql://"}}'
+        assert source.refresh()
+        assert source['database']['url'] == 'postgresql://'
+        assert len(config_server.requests) == 3
+        clients = {address for address, _ in config_server.requests}
+        assert len(clients) == 1, 'the connection is reused'
+        config_server.fail = True
+        assert not source.refresh()
+        assert source.last_error is not None
+        assert source['database']['url'] == 'postgresql://'
+
+
+def test_remote_source_cache(config_server: ConfigServer, tmpdir):
+    cache_path = tmpdir.join('cache.json').strpath
+    with RemoteSource(config_server.url, cache_path=cache_path,
+                      interval=None) as source:
+        assert source['database']['url'] == 'sqlite://'
+    config_server.fail = True
+    with RemoteSource(config_server.url, cache_path=cache_path,
+                      interval=None) as source:
+        assert source['database']['url'] == 'sqlite://'
+        assert source.last_error is not None
+        config_server.fail = False
+        assert not source.refresh(), 'validators are restored from the cache'
+        assert config_server.requests[-1][1]['If-None-Match'] == '"1"'
+    config_server.fail = True
+    with raises(ConnectionError):
+        RemoteSource(config_server.url, interval=None)
+    with raises(ConnectionError):
+        # The cache of another URL is not used.
+        RemoteSource(config_server.url + '?other', cache_path=cache_path,
+                     interval=None)
+    config_server.fail = False
+    config_server.version = 2
+    config_server.body = '[database]\nurl = "mysql://"\n'
+    with RemoteSource(config_server.url, cache_path=cache_path,
+                      interval=None) as source:
+        # The cache is not used when the service is reachable.
+        assert source['database']['url'] == 'mysql://'
+        assert 'If-None-Match' not in config_server.requests[-1][1]
+
+
+def test_remote_source_background_refresh(config_server: ConfigServer):
+    conf = DirectoryConfig.from_url(config_server.url, interval=0.01)
+    try:
+        assert conf.url == 'sqlite://'
+        config_server.version = 2
+        config_server.body = '[database]\nurl = "mysql://"\n'
+        for _ in range(500):
+            if conf.url == 'mysql://':
+                break
+            time.sleep(0.01)
+        assert conf.url == 'mysql://'
+    finally:
+        conf.conf.close()
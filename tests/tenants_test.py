@@ -0,0 +1,169 @@
+import gc
+import threading
+import tracemalloc
+import typing
+
+from pytest import raises
+
+from settei.base import Configuration, config_property
+from settei.tenants import Interner, TenantRegistry, TenantStats
+
+
+class TenantConfig(Configuration):
+    url = config_property('database.url', str)
+
+
+def tenant_document(tenant: str) -> typing.Mapping[str, object]:
+    return {
+        'database': {'url': 'postgresql://db/' + tenant,
+                     'pool': {'size': 5, 'timeout': 30}},
+        'features': ['a', 'b'],
+        'web': {'debug': False, 'hosts': ['localhost']},
+    }
+
+
+def test_interner():
+    interner = Interner()
+    a, a_memory = interner.intern(tenant_document('a'))
+    b, b_memory = interner.intern(tenant_document('b'))
+    assert a == tenant_document('a')
+    assert a['database']['pool'] is b['database']['pool']
+    assert a['web'] is b['web']
+    assert a['features'] is b['features']
+    assert a['database'] is not b['database']
+    assert 0 < b_memory < a_memory
+    c, _ = interner.intern({'x': 1, 'y': 1.0, 'z': True})
+    d, _ = interner.intern({'x': True, 'y': 1, 'z': 1.0})
+    assert c is not d
+    assert type(c['x']) is int and type(d['x']) is bool
+    size = len(interner)
+    del a, b, c, d
+    gc.collect()
+    assert len(interner) < size
+
+
+def test_tenant_registry():
+    loaded = []
+
+    def loader(tenant: str) -> typing.Mapping[str, object]:
+        loaded.append(tenant)
+        return tenant_document(tenant)
+    registry = TenantRegistry(loader, TenantConfig, environ={})
+    assert registry['a'].url == 'postgresql://db/a'
+    assert registry['a'] is registry['a']
+    assert registry['b'].url == 'postgresql://db/b'
+    assert loaded == ['a', 'b']
+    assert list(registry) == ['a', 'b']
+    stats = registry.stats('a')
+    assert isinstance(stats, TenantStats)
+    assert stats.hits == 2 and stats.misses == 1
+    assert stats.hit_rate == 2 / 3
+    assert stats.memory > 0 and registry.stats('b').memory > 0
+    assert abs(registry.memory -
+               stats.memory - registry.stats('b').memory) <= 1
+    memory = registry.memory
+    assert registry.evict('a')
+    assert not registry.evict('a')
+    assert 'a' not in registry
+    assert registry.stats('a').memory == 0
+    # Objects shared with b are still counted.
+    assert memory / 2 < registry.memory < memory
+    assert abs(registry.memory - registry.stats('b').memory) <= 1
+    registry['a']
+    assert loaded == ['a', 'b', 'a']
+    assert TenantStats(0, 0, 0).hit_rate == 0.0
+
+
+def test_tenant_registry_eviction():
+    registry = TenantRegistry(tenant_document, TenantConfig, environ={},
+                              memory_budget=1)
+    registry['a']
+    registry['b']
+    assert list(registry) == ['b']
+    registry = TenantRegistry(tenant_document, TenantConfig, environ={})
+    for tenant in 'abc':
+        registry[tenant]
+    registry['a']
+    registry.memory_budget = registry.memory - 1
+    registry['d']
+    assert 'b' not in registry
+    assert 'a' in registry and 'd' in registry
+
+
+def test_tenant_registry_cls():
+    with raises(TypeError):
+        TenantRegistry(tenant_document, dict)
+
+
+def test_tenant_registry_load_outside_lock():
+    started = threading.Event()
+    release = threading.Event()
+    loaded = []
+
+    def loader(tenant: str) -> typing.Mapping[str, object]:
+        loaded.append(tenant)
+        if tenant == 'slow':
+            started.set()
+            assert release.wait(5)
+        return tenant_document(tenant)
+    registry = TenantRegistry(loader, TenantConfig, environ={})
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry['slow']))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    # Other tenants are not blocked by the slow load.
+    assert registry['fast'].url == 'postgresql://db/fast'
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(results) == 3
+    assert results[0] is results[1] is results[2]
+    assert loaded.count('slow') == 1
+    assert registry.stats('slow').misses == 1
+    assert registry.stats('slow').hits == 2
+
+
+def test_tenant_registry_load_error():
+    def loader(tenant: str) -> typing.Mapping[str, object]:
+        raise IOError(tenant)
+    registry = TenantRegistry(loader, TenantConfig, environ={})
+    with raises(IOError):
+        registry['a']
+    with raises(IOError):
+        registry['a']
+    assert 'a' not in registry
+    assert registry.memory == 0
+
+
+def large_tenant_document(tenant: str) -> typing.Mapping[str, object]:
+    return {
+        'tables': {
+            't{0}'.format(i): {'value': '{0}-{1}'.format(tenant, i),
+                               'shared': i}
+            for i in range(200)
+        },
+    }
+
+
+def test_tenant_registry_memory_growth():
+    registry = TenantRegistry(large_tenant_document, TenantConfig,
+                              environ={}, memory_budget=1 << 40)
+    registry['warmup']
+    registry.evict('warmup')
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        configurations = [registry[str(i)] for i in range(20)]
+        for configuration in configurations:
+            # Neither the document nor the index is copied later.
+            assert configuration.conf is configuration.path_index.document
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert growth / 2 < registry.memory < growth * 1.5
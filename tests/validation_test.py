@@ -0,0 +1,200 @@
+import contextlib
+import enum
+import time
+import typing
+
+from pytest import mark, raises, warns
+
+from settei.base import ConfigTypeError, Configuration, config_property
+from settei.parse_env import parse_int
+from settei.validation import (ENVIRON_KEY, ValidationMode, _mode_from_environ,
+                               check_argument_type, compile_validator,
+                               get_validation_mode, set_validation_mode,
+                               typechecked)
+
+
+@contextlib.contextmanager
+def validation_mode(mode: str):
+    previous = set_validation_mode(mode)
+    try:
+        yield
+    finally:
+        set_validation_mode(previous)
+
+
+@typechecked
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def test_default_validation_mode():
+    assert get_validation_mode() is ValidationMode.strict
+
+
+def test_set_validation_mode():
+    previous = set_validation_mode('off')
+    try:
+        assert previous is ValidationMode.strict
+        assert get_validation_mode() is ValidationMode.off
+        set_validation_mode(ValidationMode.declaration_only)
+        assert get_validation_mode() is ValidationMode.declaration_only
+        with raises(ValueError):
+            set_validation_mode('unknown')
+    finally:
+        set_validation_mode(previous)
+
+
+def test_typechecked_strict():
+    assert add(1, 2) == 3
+    with raises(TypeError):
+        add('a', 'b')
+    with raises(TypeError):
+        parse_int(1)
+
+
+def test_typechecked_declaration_only():
+    with validation_mode('declaration-only'):
+        assert add('a', 'b') == 'ab'
+        assert parse_int(1) == 1
+        with raises(TypeError):
+            config_property(1, int)
+
+
+def test_mode_from_environ(monkeypatch):
+    monkeypatch.setenv(ENVIRON_KEY, 'off')
+    assert _mode_from_environ() is ValidationMode.off
+    monkeypatch.delenv(ENVIRON_KEY)
+    assert _mode_from_environ() is ValidationMode.strict
+    monkeypatch.setenv(ENVIRON_KEY, 'bogus')
+    with warns(RuntimeWarning, match='SETTEI_VALIDATION'):
+        assert _mode_from_environ() is ValidationMode.strict
+
+
+def test_typechecked_plain_function():
+    def sub(a: int, b: int) -> int:
+        return a - b
+    with validation_mode('off'):
+        assert typechecked(sub) is sub
+    with validation_mode('declaration-only'):
+        assert typechecked(sub) is sub
+    assert typechecked(sub) is not sub
+
+
+def test_typechecked_off():
+    with validation_mode('off'):
+        assert add('a', 'b') == 'ab'
+        prop = config_property('key', int, lookup_env='yes')
+        assert prop.lookup_env == 'yes'
+
+
+def test_check_argument_type():
+    check_argument_type('a', 1, int)
+    check_argument_type('a', None, int, optional=True)
+    check_argument_type('f', len, callable)
+    with raises(TypeError) as ex:
+        check_argument_type('a', 'x', int)
+    assert ex.value.args[0] == \
+        'type of argument "a" must be int; got str instead'
+    with raises(TypeError):
+        check_argument_type('a', None, int)
+    with raises(TypeError):
+        check_argument_type('f', 1, callable, optional=True)
+
+
+def test_typechecked_wraps():
+    assert add.__name__ == 'add'
+    assert typing.get_type_hints(add)['return'] is int
+
+
+class Color(enum.Enum):
+    red = 'red'
+    blue = 'blue'
+
+
+@mark.parametrize('type_, value, expected', [
+    (int, 1, True),
+    (int, '1', False),
+    (typing.Any, object(), True),
+    (typing.Optional[int], None, True),
+    (typing.Union[int, str], 1.0, False),
+    (typing.List[int], [1, 2, 3], True),
+    (typing.List[int], [1, '2', 3], False),
+    (typing.List[int], (1, 2), False),
+    (typing.List, ['a', 1], True),
+    (typing.Sequence[str], ('a', 'b'), True),
+    (typing.List[typing.Optional[int]], [1, None], True),
+    (typing.List[typing.List[int]], [[1], [2, 'x']], False),
+    (typing.Tuple[str, ...], ('a', 'b'), True),
+    (typing.Tuple[str, ...], ('a', 1), False),
+    (typing.Tuple[str, int], ('a', 1), True),
+    (typing.Tuple[str, int], ('a', 1, 2), False),
+    (typing.Dict[str, float], {'a': 1.0}, True),
+    (typing.Dict[str, float], {'a': '1.0'}, False),
+    (typing.Dict[str, float], {1: 1.0}, False),
+    (typing.Mapping[str, Color], {'a': Color.red}, True),
+    (typing.Mapping[str, Color], {'a': 'red'}, False),
+    (typing.Callable[[], int], len, True),
+])
+def test_compile_validator(type_, value, expected: bool):
+    assert compile_validator(type_)(value) is expected
+
+
+def test_compile_validator_cache():
+    assert compile_validator(typing.List[int]) is \
+        compile_validator(typing.List[int])
+
+
+#: (:class:`float`) The time budget in seconds to check a list of 100k
+#: integers.  It's intentionally generous to not be flaky on slow CI machines.
+LARGE_LIST_BUDGET = 0.5
+
+
+def test_compile_validator_large_list():
+    validator = compile_validator(typing.List[int])
+    value = list(range(100000))
+    started = time.perf_counter()
+    assert validator(value)
+    assert time.perf_counter() - started < LARGE_LIST_BUDGET
+    value.append('x')
+    assert not validator(value)
+
+
+class GenericConfig(Configuration):
+    ports = config_property('ports', typing.List[int])
+    weights = config_property('weights', typing.Dict[str, float])
+    colors = config_property('colors', typing.Optional[typing.List[Color]])
+    palette = config_property('palette', typing.Mapping[str, Color])
+    pair = config_property('pair', typing.Tuple[Color, int])
+    either = config_property('either', (int, str))
+
+
+def test_config_property_generic_types():
+    c = GenericConfig(ports=[80, 443], weights={'a': 0.5},
+                      colors=[Color.red], environ={})
+    assert c.ports == [80, 443]
+    assert c.weights == {'a': 0.5}
+    assert c.colors == [Color.red]
+    c = GenericConfig(ports=[80, '443'], weights={'a': 1},
+                      colors=['red', 'blue'], palette={'a': 'red'},
+                      pair=['red', 1], either='x', environ={})
+    with raises(ConfigTypeError):
+        c.ports
+    with raises(ConfigTypeError):
+        c.weights
+    assert c.colors == [Color.red, Color.blue]
+    assert c.palette == {'a': Color.red}
+    assert c.either == 'x'
+    with raises(ConfigTypeError):
+        c.pair  # arrays are lists, not tuples
+    c = GenericConfig(colors=['purple'], palette={'a': 'purple'},
+                      pair=('blue', 2), either=1.5,
+                      environ={'COLORS__SETTEIENVLIST__0': 'blue'})
+    assert c.pair == (Color.blue, 2)
+    with raises(ConfigTypeError):
+        c.colors
+    with raises(ConfigTypeError):
+        c.palette
+    with raises(ConfigTypeError):
+        c.either
+    assert GenericConfig(environ={'COLORS__SETTEIENVLIST__0': 'blue'}) \
+        .colors == [Color.blue]